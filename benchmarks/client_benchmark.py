@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+"""
+Throughput, latency percentiles, retained objects and peak RSS of ``Demandware``
+methods and transport/caching modes against a local ``MockServer``.
+
+Every scenario runs in its own process, so peak RSS is not inherited from
+previous scenarios, and the server runs in another process.
+
+Run:
+
+    $ python -m benchmarks.client_benchmark
+    $ python -m benchmarks.client_benchmark --seconds 5 --threads 8 --latency 0.01 get_product
+
+"""
+import gc
+import sys
+import time
+import Queue
+import argparse
+import resource
+import threading
+import multiprocessing
+from itertools import islice
+
+from dw.cache import MemoryCache
+from dw.client import Demandware
+from dw.metrics import MetricsHook
+from benchmarks.server import MockServer
+
+###############################################################
+# Scenarios
+###############################################################
+def sku(i):
+    return 'sku-%06d' % (i % 1000)
+
+
+def login(conn, i):
+    if conn.login('customer@example.com', 'secret') and conn.logout():
+        return True
+
+
+SCENARIOS = (
+    # Methods
+    ('get_product', {}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product expanded', {}, lambda conn, i: conn.get_product(sku(i), expand=['images', 'variations', 'prices'])),
+    ('get_product 24 ids', {}, lambda conn, i: conn.get_product([sku(i + n) for n in xrange(24)])),
+    ('get_products_bulk 200 ids', {}, lambda conn, i: conn.get_products_bulk([sku(i + n) for n in xrange(200)])),
+    ('search_product', {}, lambda conn, i: conn.search_product('shirt')),
+    ('iter_search_products 500 hits', {}, lambda conn, i: list(islice(
+        conn.iter_search_products('shirt', page_size=100), 500))),
+    ('search_category', {}, lambda conn, i: conn.search_category(levels=2)),
+    ('get_user', {}, lambda conn, i: conn.get_user()),
+    ('get_basket', {}, lambda conn, i: conn.get_basket()),
+    ('login and logout', {}, login),
+    # Modes
+    ('get_product no compress', {'compress': False}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product raw json', {'raw': True}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product raw bytes', {'raw': 'bytes'}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product cache', {'cache': MemoryCache}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product revalidate', {'revalidate': True}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product coalesce', {'coalesce': True}, lambda conn, i: conn.get_product(sku(i % 8))),
+    ('get_product batch', {'batch_window': 0.002}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product hooks', {'hooks': MetricsHook}, lambda conn, i: conn.get_product(sku(i))),
+    ('get_product 24 ids stream', {}, lambda conn, i: list(conn.get_product(
+        [sku(i + n) for n in xrange(24)], stream=True))),
+    ('search_product stream', {}, lambda conn, i: list(conn.search_product('shirt', stream=True))),
+)
+
+###############################################################
+# Benchmark
+###############################################################
+def percentile(values, rate):
+    """Returns the value below which rate of sorted values fall."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * rate))]
+
+
+def measure(conn, fn, seconds=1.0, threads=1):
+    """
+    Call fn from threads until seconds elapse, calls that raise an exception
+    or return None, as failed client methods do, are counted as errors.
+
+    Returns:
+
+    Dictionary with calls, errors, throughput, p50 and p99 latency in seconds.
+
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.time() + seconds
+
+    def worker(offset):
+        local = []
+        i = offset
+        while time.time() < deadline:
+            start = time.time()
+            try:
+                if fn(conn, i) is None:
+                    errors.append(None)
+            except Exception as e:
+                errors.append(e)
+            local.append(time.time() - start)
+            i += threads
+        with lock:
+            latencies.extend(local)
+
+    started = time.time()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in xrange(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'errors': len(errors),
+        'throughput': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+    }
+
+
+def retained(conn, fn, calls=200):
+    """
+    Returns the number of objects tracked by the garbage collector that
+    remain alive per call, it reveals leaks and unbounded caches.
+
+    """
+    gc.collect()
+    before = len(gc.get_objects())
+    for i in xrange(calls):
+        fn(conn, i)
+    gc.collect()
+    return float(len(gc.get_objects()) - before) / calls
+
+
+def run_scenario(settings, fn, seconds, threads, queue):
+    """Run a scenario in the current process and put its results in queue."""
+    params = dict(settings)
+    for key in ('cache', 'hooks'):
+        if key in params:
+            # Instances are created in the child process
+            params[key] = params[key]() if key == 'cache' else [params[key]()]
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn = Demandware(params)
+
+    # Warm up connections and caches
+    for i in xrange(threads * 2):
+        fn(conn, i)
+    results = measure(conn, fn, seconds, threads)
+    results['objects'] = retained(conn, fn)
+    results['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results['rss_delta'] = results['rss'] - rss
+    queue.put(results)
+
+
+def wait_results(process, queue, timeout):
+    """
+    Returns results of a scenario process, None if it exits without results
+    or they are not ready after timeout seconds.
+
+    """
+    deadline = time.time() + timeout
+    while True:
+        alive = process.is_alive()
+        try:
+            return queue.get(timeout=min(1.0, max(0.0, deadline - time.time())))
+        except Queue.Empty:
+            if not alive or time.time() >= deadline:
+                return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark Demandware client against a local OCAPI server.')
+    parser.add_argument('names', nargs='*', help='run scenarios whose name starts with any of these')
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0, help='server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--variations', type=int, default=20)
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=120.0, help='seconds a scenario may take')
+    args = parser.parse_args(argv)
+
+    server = MockServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        variations=args.variations,
+        images=args.images,
+        seed=0,
+    ).start(process=True)
+
+    sys.stdout.write('%-32s %9s %9s %9s %8s %9s %9s %9s\n' % (
+        'scenario', 'calls/s', 'p50 ms', 'p99 ms', 'errors', 'objs/call', 'rss KB', 'rss +KB'))
+    try:
+        for name, settings, fn in SCENARIOS:
+            if args.names and not any(name.startswith(n) for n in args.names):
+                continue
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=run_scenario,
+                args=(server.settings(pool_maxsize=args.threads, **settings), fn, args.seconds, args.threads, queue),
+            )
+            process.start()
+            results = wait_results(process, queue, args.timeout)
+            if results is None:
+                # A crashed or hung scenario must not stop the others
+                timed_out = process.is_alive()
+                if timed_out:
+                    process.terminate()
+                process.join()
+                sys.stdout.write('%-32s %s\n' % (
+                    name,
+                    'timed out' if timed_out else 'crashed with exit code %s' % process.exitcode,
+                ))
+                continue
+            process.join()
+            sys.stdout.write('%-32s %9.1f %9.2f %9.2f %8d %9.1f %9d %9d\n' % (
+                name,
+                results['throughput'],
+                results['p50'] * 1000,
+                results['p99'] * 1000,
+                results['errors'],
+                results['objects'],
+                results['rss'],
+                results['rss_delta'],
+            ))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
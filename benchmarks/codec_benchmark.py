@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+"""
+Decode throughput of installed JSON codecs on OCAPI like payloads.
+
+Run:
+
+    $ python -m benchmarks.codec_benchmark
+
+"""
+import sys
+import time
+import random
+
+from dw.codec import CODECS, get_codec
+
+###############################################################
+# Payloads
+###############################################################
+def product(sku, variations=20, images=8):
+    """Returns a product document expanded with variations, images and prices."""
+    rnd = random.Random(sku)
+    return {
+        '_type': 'product',
+        'id': sku,
+        'name': u'Product %s édition' % sku,
+        'brand': 'Brand %d' % rnd.randint(1, 50),
+        'currency': 'USD',
+        'price': round(rnd.uniform(1, 500), 2),
+        'prices': dict(('list-prices-%d' % i, round(rnd.uniform(1, 500), 2)) for i in xrange(3)),
+        'short_description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 3,
+        'long_description': '<p>%s</p>' % ('Sed ut perspiciatis unde omnis iste natus error. ' * 20),
+        'inventory': {'ats': rnd.randint(0, 100), 'orderable': True, 'stock_level': rnd.randint(0, 100)},
+        'image_groups': [{
+            'view_type': view,
+            'images': [{
+                'alt': 'Product %s' % sku,
+                'link': 'http://changeme.demandware.net/on/demandware.static/%s/%s_%d.jpg' % (view, sku, i),
+                'title': 'Product %s' % sku,
+            } for i in xrange(images)],
+        } for view in ('large', 'medium', 'small', 'swatch')],
+        'variants': [{
+            'product_id': '%s-%d' % (sku, i),
+            'price': round(rnd.uniform(1, 500), 2),
+            'orderable': bool(i % 2),
+            'variation_values': {'color': 'C%02d' % (i % 7), 'size': 'S%02d' % (i % 5)},
+        } for i in xrange(variations)],
+        'variation_attributes': [{
+            'id': attribute,
+            'name': attribute.title(),
+            'values': [{'name': '%s %d' % (attribute, i), 'orderable': True, 'value': '%d' % i} for i in xrange(7)],
+        } for attribute in ('color', 'size')],
+    }
+
+
+def search(count=200):
+    """Returns a product search document."""
+    return {
+        '_type': 'product_search_result',
+        'count': count,
+        'start': 0,
+        'total': count * 10,
+        'query': 'shirt',
+        'hits': [{
+            '_type': 'product_search_hit',
+            'product_id': 'sku-%06d' % i,
+            'product_name': 'Product %d' % i,
+            'link': 'http://changeme.demandware.net/s/SiteGenesis/dw/shop/v13_1/products/sku-%06d' % i,
+            'price': 10.0 + i,
+            'currency': 'USD',
+            'image': {'link': 'http://changeme.demandware.net/images/sku-%06d.jpg' % i},
+        } for i in xrange(count)],
+        'refinements': [{
+            'attribute_id': 'c_refinementColor',
+            'label': 'Colour',
+            'values': [{'label': 'Color %d' % i, 'value': 'c%d' % i, 'hit_count': i} for i in xrange(12)],
+        }],
+    }
+
+###############################################################
+# Benchmark
+###############################################################
+def measure(codec, data, seconds=1.0):
+    """
+    Decode data repeatedly.
+
+    Returns:
+
+    Tuple with decoded documents per second and megabytes per second.
+
+    """
+    loads = codec.loads
+    runs = 0
+    started = time.time()
+    elapsed = 0
+    while elapsed < seconds:
+        for _ in xrange(10):
+            loads(data)
+        runs += 10
+        elapsed = time.time() - started
+    return runs / elapsed, runs * len(data) / elapsed / 1024 / 1024
+
+
+def main(seconds=1.0):
+    reference = get_codec('json')
+    payloads = (
+        ('product', reference.dumps(product('sku-000001'))),
+        ('search', reference.dumps(search())),
+    )
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            sys.stdout.write('%-12s not installed\n' % name)
+
+    for label, data in payloads:
+        sys.stdout.write('\n%s payload, %d bytes\n' % (label, len(data)))
+        for codec in codecs:
+            docs, mbytes = measure(codec, data, seconds)
+            sys.stdout.write('%-12s %10.1f docs/s %8.1f MB/s\n' % (codec.name, docs, mbytes))
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
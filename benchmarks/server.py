@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+"""
+Local stand-in of the OCAPI Shop API used to benchmark the client offline.
+
+Serves products, product_search, categories, account and basket resources
+with configurable latency, payload size and error injection.
+
+Run:
+
+    $ python -m benchmarks.server --port 8080 --latency 0.02 --error-rate 0.01
+
+"""
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import urllib
+import hashlib
+import argparse
+import threading
+import multiprocessing
+import BaseHTTPServer
+import SocketServer
+
+from dw.transport import ConnectionPool
+from benchmarks.codec_benchmark import product
+
+###############################################################
+# Handler
+###############################################################
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Routes OCAPI requests, settings are read from the server."""
+    protocol_version = 'HTTP/1.1'
+
+    routes = (
+        ('GET', re.compile(r'/products/\(([^)]*)\)$'), 'products'),
+        ('GET', re.compile(r'/products/([^/]+)$'), 'product'),
+        ('GET', re.compile(r'/product_search$'), 'product_search'),
+        ('GET', re.compile(r'/categories/([^/]+)$'), 'category'),
+        ('GET', re.compile(r'/account/this$'), 'account'),
+        ('POST', re.compile(r'/account/register$'), 'account'),
+        ('POST', re.compile(r'/account/login$'), 'login'),
+        ('POST', re.compile(r'/account/logout$'), 'logout'),
+        ('GET', re.compile(r'/basket/this$'), 'basket'),
+    )
+
+    # Buffer headers so a response is sent in as few packets as possible
+    wbufsize = -1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.route('POST')
+
+    def route(self, method):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failed = server.random.random() < server.error_rate
+            latency = server.latency + server.random.uniform(0, server.jitter)
+        if latency:
+            time.sleep(latency)
+        if failed:
+            return self.send(server.error_status, {'fault': {'type': 'ServiceUnavailable'}})
+
+        path, _, query = self.path.partition('?')
+        params = dict(p.partition('=')[::2] for p in query.split('&') if p)
+        match = re.match(r'/s/[^/]+/dw/shop/[^/]+(/.*)$', path)
+        for verb, pattern, name in self.routes:
+            found = pattern.match(match.group(1)) if match else None
+            if verb == method and found:
+                return getattr(self, 'do_%s' % name)(params, *found.groups())
+        self.send(404, {'fault': {'type': 'NotFoundException'}})
+
+    def send(self, status, document, headers=()):
+        """Write a JSON response, compressed and with ETag according to server settings."""
+        server = self.server
+        body = json.dumps(document) if document is not None else ''
+        headers = list(headers)
+        if body:
+            headers.append(('Content-Type', 'application/json;charset=UTF-8'))
+        if body and status == 200 and server.etag:
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            headers.append(('ETag', etag))
+            if self.headers.get('If-None-Match') == etag:
+                status, body = 304, ''
+        if body and server.compress and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            headers.append(('Content-Encoding', 'gzip'))
+        headers.append(('Content-Length', str(len(body))))
+
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def product(self, sku, params):
+        server = self.server
+        document = product(sku, server.variations, server.images)
+        document['_type'] = 'product'
+        if 'expand' not in params:
+            for key in ('image_groups', 'variants', 'variation_attributes', 'inventory', 'prices'):
+                document.pop(key)
+        return document
+
+    def do_product(self, params, sku):
+        sku = urllib.unquote_plus(sku)
+        if sku.startswith('missing'):
+            return self.send(404, {'fault': {'type': 'ProductNotFoundException'}})
+        self.send(200, self.product(sku, params))
+
+    def do_products(self, params, skus):
+        skus = [urllib.unquote_plus(sku) for sku in skus.split(',') if sku]
+        data = [self.product(sku, params) for sku in skus if not sku.startswith('missing')]
+        self.send(200, {'_type': 'result', 'count': len(data), 'data': data, 'total': len(data)})
+
+    def do_product_search(self, params):
+        start = int(params.get('start') or 0)
+        count = min(int(params.get('count') or 25), 200)
+        total = self.server.search_total
+        hits = [{
+            '_type': 'product_search_hit',
+            'product_id': 'sku-%06d' % i,
+            'product_name': 'Product %d' % i,
+            'link': 'http://localhost/s/SiteGenesis/dw/shop/v13_1/products/sku-%06d' % i,
+            'price': 10.0 + i,
+            'currency': 'USD',
+        } for i in xrange(start, min(start + count, total))]
+        self.send(200, {
+            '_type': 'product_search_result',
+            'count': len(hits),
+            'hits': hits,
+            'query': urllib.unquote_plus(params.get('q', '')),
+            'start': start,
+            'total': total,
+        })
+
+    def do_category(self, params, category):
+        def node(name, level):
+            document = {'_type': 'category', 'id': name, 'name': name.title()}
+            if level > 0:
+                document['categories'] = [node('%s-%d' % (name, i), level - 1) for i in xrange(8)]
+            return document
+        self.send(200, node(category, int(params.get('levels') or 1)))
+
+    def do_account(self, params):
+        self.send(200, {
+            '_type': 'customer',
+            'customer_no': '00001',
+            'email': 'customer@example.com',
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+        })
+
+    def do_login(self, params):
+        self.send(204, None, [('Set-Cookie', 'dwsid=%s; Path=/' % hashlib.sha1(str(time.time())).hexdigest())])
+
+    def do_logout(self, params):
+        self.send(204, None)
+
+    def do_basket(self, params):
+        self.send(200, {
+            '_type': 'basket',
+            'currency': 'USD',
+            'product_items': [{'product_id': 'sku-%06d' % i, 'quantity': 1} for i in xrange(3)],
+            'product_total': 30.0,
+        })
+
+###############################################################
+# Server
+###############################################################
+class _HTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class PlainConnectionPool(ConnectionPool):
+    """
+    Connection pool that sends https requests over plain HTTP, so secure
+    resources (account, basket) can be served by ``MockServer``.
+
+    """
+    def _new_conn(self, key):
+        return super(PlainConnectionPool, self)._new_conn(('http',) + key[1:])
+
+    def _connect(self, key, conn, timeout=None, stats=None):
+        return super(PlainConnectionPool, self)._connect(('http',) + key[1:], conn, timeout, stats)
+
+
+class MockServer(object):
+    """
+    OCAPI stand-in server, runs in a background thread or in its own process
+    so it does not disturb measurements of the client.
+
+    Examples:
+
+    with MockServer(latency=0.01, error_rate=0.05) as server:
+        conn = Demandware(server.settings())
+        conn.get_product('sku-000001')
+
+    """
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 variations=20, images=8, search_total=1000, compress=True, etag=True, seed=None):
+        """
+        Args:
+
+        ``port``: Integer, port to listen on, 0 picks a free one.
+
+        ``latency``: Float, seconds added to every response.
+
+        ``jitter``: Float, maximum random seconds added to latency.
+
+        ``error_rate``: Float between 0 and 1, rate of responses replaced by an error.
+
+        ``error_status``: Integer, HTTP status of injected errors.
+
+        ``variations``: Integer, variants per product, controls payload size with images.
+
+        ``images``: Integer, images per image group of a product.
+
+        ``search_total``: Integer, number of hits of every product search.
+
+        ``compress``: Boolean, if True responses are gzipped when the client accepts it.
+
+        ``etag``: Boolean, if True responses have ETag and conditional requests get 304.
+
+        ``seed``: Random seed of latency jitter and error injection.
+
+        """
+        self.port = port
+        self.options = dict(
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            error_status=error_status,
+            variations=variations,
+            images=images,
+            search_total=search_total,
+            compress=compress,
+            etag=etag,
+        )
+        self.seed = seed
+        self.__httpd = None
+        self.__process = None
+
+    def _create(self):
+        httpd = _HTTPServer(('127.0.0.1', self.port), Handler)
+        httpd.__dict__.update(self.options)
+        httpd.random = random.Random(self.seed)
+        httpd.lock = threading.Lock()
+        httpd.requests = 0
+        return httpd
+
+    def start(self, process=False):
+        """
+        Start serving in background.
+
+        Args:
+
+        ``process``: Boolean, if True the server runs in a child process.
+
+        """
+        if process:
+            ready = multiprocessing.Queue()
+            self.__process = multiprocessing.Process(target=self._serve, args=(ready,))
+            self.__process.daemon = True
+            self.__process.start()
+            self.port = ready.get(timeout=10)
+        else:
+            self.__httpd = self._create()
+            self.port = self.__httpd.server_port
+            thread = threading.Thread(target=self.__httpd.serve_forever)
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def _serve(self, ready):
+        httpd = self._create()
+        ready.put(httpd.server_port)
+        httpd.serve_forever()
+
+    def stop(self):
+        """Stop serving."""
+        if self.__httpd is not None:
+            self.__httpd.shutdown()
+            self.__httpd.server_close()
+            self.__httpd = None
+        if self.__process is not None:
+            self.__process.terminate()
+            self.__process.join()
+            self.__process = None
+
+    @property
+    def requests(self):
+        """Number of requests received, only available when running in a thread."""
+        return self.__httpd.requests if self.__httpd is not None else None
+
+    def settings(self, **params):
+        """
+        Returns ``Demandware`` settings pointing to this server, updated with params,
+        by default a ``PlainConnectionPool`` is used.
+
+        """
+        settings = {
+            'client_id': 'aaaaaaaaaaaaaaaaaaaaaaaaaaaaaa',
+            'hostname': '127.0.0.1:%d' % self.port,
+            'site': 'SiteGenesis',
+            'version': 'v13_1',
+        }
+        if 'pool' not in params:
+            settings['pool'] = PlainConnectionPool(
+                maxsize=params.pop('pool_maxsize', 10),
+                idle_timeout=params.pop('pool_idle_timeout', 60.0),
+            )
+        settings.update(params)
+        return settings
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local OCAPI stand-in server.')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--variations', type=int, default=20)
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--no-compress', dest='compress', action='store_false')
+    parser.add_argument('--no-etag', dest='etag', action='store_false')
+    args = parser.parse_args(argv)
+
+    server = MockServer(**vars(args))
+    httpd = server._create()
+    sys.stdout.write('Serving OCAPI on 127.0.0.1:%d\n' % httpd.server_port)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
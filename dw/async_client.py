@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+from client import Demandware
+from futures import Executor, gather
+from transport import ConnectionPool
+
+###############################################################
+# Demandware Asynchronous Library
+###############################################################
+class AsyncDemandware(object):
+    """
+    Python Demandware SDK, every resource method is executed in background
+    and returns a ``Future`` instead of the response.
+
+    Examples:
+
+    conn = AsyncDemandware(DW_API, max_workers=32)
+
+    product, categories = conn.gather(
+        conn.get_product('apple-ipod-classic'),
+        conn.search_category('root', 2),
+    )
+
+    """
+    def __init__(self, params=dict(), max_workers=8, executor=None):
+        """
+        Set a client to consume OCAPI services concurrently.
+
+        Args:
+
+        ``params``: Dictionary that contains settings to be applied, see ``Demandware``.
+
+        ``max_workers``: Integer, maximum number of requests in flight.
+
+        ``executor``: ``Executor`` to be used, by default a new one is created.
+
+        Raises:
+
+        ``ParameterInvalidError``: If an invalid parameter is detected.
+
+        ``ParameterMissedError``: If an parameter is missed.
+
+        """
+        self.__params = dict(params)
+        if self.__params.get('pool') is None:
+            self.__params['pool'] = ConnectionPool(
+                maxsize=max(self.__params.get('pool_maxsize', 0), max_workers),
+                idle_timeout=self.__params.get('pool_idle_timeout', 60.0),
+            )
+
+        self.__client = Demandware(self.__params)
+        self.__executor = executor or Executor(max_workers)
+
+    def _client(self):
+        """
+        Returns the ``Demandware`` client shared by worker threads.
+
+        """
+        return self.__client
+
+    def _submit(self, name, *args, **kwargs):
+        """
+        Schedule a ``Demandware`` resource method.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self.__executor.submit(getattr(self.__client, name), *args, **kwargs)
+
+    def gather(self, *futures):
+        """
+        Wait for several requests.
+
+        Returns:
+
+        List of responses in the same order of futures.
+
+        """
+        return gather(futures)
+
+    def close(self):
+        """
+        Wait for requests in flight and stop worker threads.
+
+        """
+        self.__executor.shutdown(wait=True)
+
+    def get_product(self, ids, arrayify=False, **kwargs):
+        """
+        Access products resource, see ``Demandware.get_product``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('get_product', ids, arrayify, **kwargs)
+
+    def search_product(self, query, **kwargs):
+        """
+        Search products, see ``Demandware.search_product``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('search_product', query, **kwargs)
+
+    def search_category(self, category='root', levels=2, raw=None, deadline=None):
+        """
+        Get online categories, see ``Demandware.search_category``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('search_category', category, levels, raw=raw, deadline=deadline)
+
+    def get_user(self, raw=None, deadline=None):
+        """
+        Get current customer data, see ``Demandware.get_user``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('get_user', raw=raw, deadline=deadline)
+
+    def register(self, username, password, profile={}, raw=None, deadline=None):
+        """
+        Register an account, see ``Demandware.register``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('register', username, password, profile, raw=raw, deadline=deadline)
+
+    def login(self, username, password, deadline=None):
+        """
+        Login a customer, see ``Demandware.login``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('login', username, password, deadline=deadline)
+
+    def logout(self, deadline=None):
+        """
+        Logout a customer, see ``Demandware.logout``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('logout', deadline=deadline)
+
+    def get_basket(self, raw=None, deadline=None):
+        """
+        Get basket, see ``Demandware.get_basket``.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        return self._submit('get_basket', raw=raw, deadline=deadline)
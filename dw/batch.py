@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import sys
+import threading
+
+from futures import Future
+
+###############################################################
+# Micro-batching
+###############################################################
+class Batcher(object):
+    """
+    Collect single loads that arrive within a short window and resolve them
+    with one call to a batch function.
+
+    Examples:
+
+    def fetch(skus):
+        return dict((p['id'], p) for p in conn.get_product(skus, raw=True) or [])
+
+    batcher = Batcher(fetch, window=0.005, max_size=24)
+    product = batcher.load('apple-ipod-classic').result()
+
+    """
+    def __init__(self, fn, window=0.005, max_size=24):
+        """
+        Args:
+
+        ``fn``: Function called with a list of keys, returns a dictionary with a value per key,
+        missing keys resolve to None.
+
+        ``window``: Float, seconds to wait for more keys after the first one arrives.
+
+        ``max_size``: Integer, maximum number of keys per call, a full batch is sent at once.
+
+        """
+        self.fn = fn
+        self.window = window
+        self.max_size = int(max_size)
+
+        self.__pending = {}
+        self.__order = []
+        self.__timer = None
+        self.__lock = threading.Lock()
+
+    def load(self, key):
+        """
+        Schedule key to be loaded in the next batch.
+
+        Returns:
+
+        ``Future`` object resolved with the value for key.
+
+        """
+        future = Future()
+        with self.__lock:
+            if key not in self.__pending:
+                self.__pending[key] = []
+                self.__order.append(key)
+            self.__pending[key].append(future)
+
+            full = len(self.__order) >= self.max_size
+            if not full and self.__timer is None:
+                self.__timer = threading.Timer(self.window, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+        if full:
+            self.flush()
+        return future
+
+    def flush(self):
+        """
+        Send pending keys now.
+
+        """
+        with self.__lock:
+            keys, self.__order = self.__order[:self.max_size], self.__order[self.max_size:]
+            pending = dict((key, self.__pending.pop(key)) for key in keys)
+            timer, self.__timer = self.__timer, None
+            if self.__order:
+                # Keys beyond max_size wait for the next window
+                self.__timer = threading.Timer(self.window, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+        if timer is not None:
+            timer.cancel()
+        if not keys:
+            return
+
+        try:
+            results = self.fn(keys) or {}
+        except BaseException:
+            exc_info = sys.exc_info()
+            for key in keys:
+                for future in pending[key]:
+                    future.set_exception(exc_info)
+            return
+        for key in keys:
+            value = results.get(key)
+            for future in pending[key]:
+                future.set_result(value)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import time
+import warnings
+import threading
+from collections import deque
+
+###############################################################
+# Circuit Breaker
+###############################################################
+class CircuitBreaker(object):
+    """
+    Stop sending requests to a failing service for a while.
+
+    The breaker is closed while the rate of failed or slow calls within the
+    last ``window_size`` calls stays below the thresholds, once exceeded it
+    opens and calls fail fast during ``reset_timeout`` seconds, then it is
+    half-open and lets ``half_open_calls`` probes through, it closes again
+    if all of them succeed.
+
+    Examples:
+
+    breaker = CircuitBreaker(failure_rate=0.5, slow_call_duration=2.0)
+    if breaker.allow():
+        start = time.time()
+        success = send()
+        breaker.record(success, time.time() - start)
+
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate=0.5, slow_call_duration=None, slow_call_rate=0.5,
+                 min_calls=10, window_size=50, reset_timeout=30.0, half_open_calls=1):
+        """
+        Args:
+
+        ``failure_rate``: Float between 0 and 1, rate of failed calls that opens the breaker.
+
+        ``slow_call_duration``: Float, seconds after which a call is slow, None ignores latency.
+
+        ``slow_call_rate``: Float between 0 and 1, rate of slow calls that opens the breaker.
+
+        ``min_calls``: Integer, calls recorded before rates are evaluated.
+
+        ``window_size``: Integer, number of most recent calls used to compute rates.
+
+        ``reset_timeout``: Float, seconds that the breaker stays open.
+
+        ``half_open_calls``: Integer, probes allowed while half-open.
+
+        """
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = int(min_calls)
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = int(half_open_calls)
+
+        self.__calls = deque(maxlen=int(window_size))
+        self.__state = self.CLOSED
+        self.__opened = None
+        self.__probes = 0
+        self.__successes = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Current state, ``CLOSED``, ``OPEN`` or ``HALF_OPEN``."""
+        with self.__lock:
+            self.__update(time.time())
+            return self.__state
+
+    def __update(self, now):
+        """Move from open to half-open once reset_timeout expired, caller must hold the lock."""
+        if self.__state == self.OPEN and now - self.__opened >= self.reset_timeout:
+            self.__state = self.HALF_OPEN
+            self.__probes = 0
+            self.__successes = 0
+
+    def __open(self, now):
+        self.__state = self.OPEN
+        self.__opened = now
+        self.__calls.clear()
+
+    def allow(self):
+        """
+        Returns True if a call can be sent, every allowed call must be
+        followed by ``record``.
+
+        """
+        with self.__lock:
+            self.__update(time.time())
+            if self.__state == self.CLOSED:
+                return True
+            if self.__state == self.HALF_OPEN and self.__probes < self.half_open_calls:
+                self.__probes += 1
+                return True
+            return False
+
+    def record(self, success, duration=0.0):
+        """
+        Record the outcome of a call.
+
+        Args:
+
+        ``success``: Boolean, False if the call failed.
+
+        ``duration``: Float, seconds spent by the call.
+
+        """
+        slow = self.slow_call_duration is not None and duration >= self.slow_call_duration
+        now = time.time()
+        with self.__lock:
+            if self.__state == self.HALF_OPEN:
+                if not success or slow:
+                    self.__open(now)
+                else:
+                    self.__successes += 1
+                    if self.__successes >= self.half_open_calls:
+                        self.__state = self.CLOSED
+                return
+            if self.__state == self.OPEN:
+                return
+
+            calls = self.__calls
+            calls.append((success, slow))
+            if len(calls) < self.min_calls:
+                return
+            failures = sum(1 for ok, _ in calls if not ok)
+            slows = sum(1 for _, is_slow in calls if is_slow)
+            if failures >= self.failure_rate * len(calls) or \
+                    (self.slow_call_duration is not None and slows >= self.slow_call_rate * len(calls)):
+                self.__open(now)
+
+    def reset(self):
+        """Close the breaker and forget recorded calls."""
+        with self.__lock:
+            self.__state = self.CLOSED
+            self.__calls.clear()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(key, **kwargs):
+    """
+    Circuit breaker shared by every caller that uses the same key, created
+    with kwargs the first time it is requested. Later callers get the same
+    breaker, a ``RuntimeWarning`` is issued if they ask for other kwargs.
+
+    Args:
+
+    ``key``: Hashable value, e.g. a tuple with hostname and resource.
+
+    Returns:
+
+    ``CircuitBreaker`` object.
+
+    """
+    with _breakers_lock:
+        item = _breakers.get(key)
+        if item is None:
+            item = _breakers[key] = (CircuitBreaker(**kwargs), kwargs)
+    breaker, created = item
+    if created != kwargs:
+        warnings.warn(
+            'Circuit breaker %r exists with %r, %r is ignored' % (key, created, kwargs),
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    return breaker
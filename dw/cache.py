@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import os
+import math
+import time
+import errno
+import hashlib
+import cPickle
+import tempfile
+import threading
+
+###############################################################
+# Response Cache
+###############################################################
+class Cache(object):
+    """
+    Interface for cache backends used to store OCAPI responses.
+
+    Values are stored with a time to live, once expired they are never
+    returned again.
+
+    """
+    def get(self, key):
+        """
+        Returns value for key, None if key does not exist or expired.
+
+        """
+        raise NotImplementedError()
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value for key.
+
+        Args:
+
+        ``ttl``: Float, seconds while value is valid, if None never expires.
+
+        """
+        raise NotImplementedError()
+
+    def delete(self, key):
+        """Remove key."""
+        raise NotImplementedError()
+
+    def clear(self):
+        """Remove all keys."""
+        raise NotImplementedError()
+
+
+# Fields of a link of the recently used list
+_PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3
+
+
+class MemoryCache(Cache):
+    """
+    In-process cache bounded by number of keys, least recently used keys
+    are evicted first.
+
+    Keys are kept in a circular doubly linked list ordered by use, so it
+    works on Python 2.6 where ``OrderedDict`` is not available.
+
+    Examples:
+
+    conn = Demandware(dict(DW_API, cache=MemoryCache(maxsize=1000)))
+
+    """
+    def __init__(self, maxsize=1024):
+        """
+        Args:
+
+        ``maxsize``: Integer, maximum number of keys.
+
+        """
+        self.maxsize = int(maxsize)
+
+        self.__data = {}
+        self.__root = []
+        self.__root[:] = [self.__root, self.__root, None, None]
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __unlink(self, link):
+        link[_PREV][_NEXT] = link[_NEXT]
+        link[_NEXT][_PREV] = link[_PREV]
+
+    def __append(self, link):
+        """Put link at the most recently used position."""
+        root = self.__root
+        last = root[_PREV]
+        link[_PREV] = last
+        link[_NEXT] = root
+        last[_NEXT] = root[_PREV] = link
+
+    def get(self, key):
+        with self.__lock:
+            link = self.__data.get(key)
+            if link is None:
+                return None
+            self.__unlink(link)
+            value, expires = link[_VALUE]
+            if expires is not None and expires < time.time():
+                del self.__data[key]
+                return None
+            self.__append(link)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl is not None else None
+        with self.__lock:
+            link = self.__data.get(key)
+            if link is not None:
+                self.__unlink(link)
+            link = self.__data[key] = [None, None, key, (value, expires)]
+            self.__append(link)
+            while len(self.__data) > self.maxsize:
+                oldest = self.__root[_NEXT]
+                self.__unlink(oldest)
+                del self.__data[oldest[_KEY]]
+
+    def delete(self, key):
+        with self.__lock:
+            link = self.__data.pop(key, None)
+            if link is not None:
+                self.__unlink(link)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+            self.__root[:] = [self.__root, self.__root, None, None]
+
+
+class FileCache(Cache):
+    """
+    Cache stored in a local directory, so it can be shared between processes.
+    When there are more than ``maxsize`` keys, the least recently used are removed
+    until ``EVICT_RATIO`` of maxsize are left.
+
+    Keys are counted by this object, keys written by other processes are
+    noticed on the next eviction, when the directory is listed.
+
+    Examples:
+
+    conn = Demandware(dict(DW_API, cache=FileCache('/var/cache/dw')))
+
+    """
+    # Fraction of maxsize kept by an eviction, so the directory is not listed on every write
+    EVICT_RATIO = 0.9
+
+    def __init__(self, path, maxsize=10000):
+        """
+        Args:
+
+        ``path``: String, directory where values are stored, created if it does not exist.
+
+        ``maxsize``: Integer, maximum number of keys.
+
+        """
+        self.path = path
+        self.maxsize = int(maxsize)
+
+        self.__count = None
+        self.__lock = threading.Lock()
+
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def _filename(self, key):
+        """Returns file name used to store key."""
+        return os.path.join(self.path, '%s.cache' % hashlib.sha1(key).hexdigest())
+
+    def get(self, key):
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as fp:
+                stored, expires, value = cPickle.load(fp)
+        except (IOError, EOFError, ValueError, cPickle.UnpicklingError):
+            return None
+        if stored != key or (expires is not None and expires < time.time()):
+            return None
+        try:
+            # Access time is tracked with mtime
+            os.utime(filename, None)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl is not None else None
+        filename = self._filename(key)
+        added = not os.path.exists(filename)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            cPickle.dump((key, expires, value), fp, cPickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, filename)
+        if added:
+            self.__added()
+
+    def __files(self):
+        return [os.path.join(self.path, name) for name in os.listdir(self.path) if name.endswith('.cache')]
+
+    def __added(self):
+        """Count a new key, evict keys if there are too many."""
+        with self.__lock:
+            if self.__count is None:
+                self.__count = len(self.__files())
+            else:
+                self.__count += 1
+            if self.__count > self.maxsize:
+                self.__count = self.__evict()
+
+    def __evict(self):
+        """
+        Remove least recently used keys.
+
+        Returns:
+
+        Integer, number of keys left.
+
+        """
+        aged = []
+        for filename in self.__files():
+            try:
+                aged.append((os.path.getmtime(filename), filename))
+            except OSError:
+                pass
+        keep = int(math.ceil(self.maxsize * self.EVICT_RATIO))
+        if len(aged) <= self.maxsize:
+            return len(aged)
+        aged.sort()
+        for _, filename in aged[:len(aged) - keep]:
+            self.__remove(filename)
+        return keep
+
+    def __remove(self, filename):
+        """
+        Returns True if the file was removed, False if it did not exist.
+
+        """
+        try:
+            os.remove(filename)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return False
+        return True
+
+    def delete(self, key):
+        if self.__remove(self._filename(key)):
+            with self.__lock:
+                if self.__count is not None:
+                    self.__count -= 1
+
+    def clear(self):
+        for filename in self.__files():
+            self.__remove(filename)
+        with self.__lock:
+            self.__count = 0
@@ -20,15 +20,60 @@
 # Authors:
 #   Moises Brenes <mbrenes@weareconflict.com>
 
-import json
+import time
 import httplib
 import urllib
 import urllib2
 import cookielib
+import random
+import logging
+import threading
+from collections import deque
 
 from . import __version__
-from objects import Object
-from errors import ParameterInvalidError, ParameterMissedError
+from batch import Batcher
+from cache import MemoryCache
+from codec import dumps_prefix, get_codec
+from objects import Object, clone, wrap
+from stream import ArrayStream
+from futures import Executor, SingleFlight, TimeoutError
+from breaker import get_breaker
+from throttle import get_throttle
+from transport import ConnectionPool, Retry
+from errors import DeadlineError, ParameterInvalidError, ParameterMissedError, TransportError
+
+logger = logging.getLogger(__name__)
+
+###############################################################
+# Demandware Request
+###############################################################
+class Request(object):
+    """Data used to request a service, every call gets its own instance."""
+    def __init__(self, client_id, user_agent):
+        self.client_id = client_id
+        self.user_agent = user_agent
+        self.secure = False
+        self.method = 'GET'
+
+        self.headers = {
+            'User-Agent': user_agent,
+            'x-dw-client-id': client_id,
+        }
+
+        self.get = {
+            'format': 'json',
+            'client_id': client_id
+        }
+
+        self.post = {
+        }
+
+    def is_default(self):
+        """Returns True if nothing was set since the request was created."""
+        default = Request(self.client_id, self.user_agent)
+        return (self.secure == default.secure and self.method == default.method and
+                self.headers == default.headers and self.get == default.get and
+                self.post == default.post)
 
 ###############################################################
 # Demandware Library
@@ -37,6 +82,11 @@ class Demandware(object):
     """
     Python Demandware SDK.
 
+    A client can be shared between threads, values set with ``set_get``, ``set_post``
+    and ``set_header`` apply to the next request of the calling thread only, as well
+    as ``debug``, ``get_request`` and ``get_response`` returns data about the last
+    request of the calling thread.
+
     https://documentation.demandware.com/display/DOC131/Open+Commerce+API
 
     """
@@ -44,8 +94,6 @@ class Demandware(object):
 
     __cookie = None
 
-    __last_call = Object()
-
     __required = set((
         'client_id',
         'hostname',
@@ -53,6 +101,35 @@ class Demandware(object):
         'version',
     ))
 
+    __optional = dict({
+        'batch_size': 24,
+        'batch_window': None,
+        'cache': None,
+        'cache_ttl': None,
+        'circuit_breaker': None,
+        'coalesce': False,
+        'codec': None,
+        'compress': True,
+        'connect_timeout': 10.0,
+        'cookie_jar': None,
+        'debug': False,
+        'history': None,
+        'history_body_limit': 1024,
+        'history_sample_rate': 1.0,
+        'hooks': None,
+        'max_in_flight': None,
+        'pool': None,
+        'pool_maxsize': 10,
+        'pool_idle_timeout': 60.0,
+        'rate_burst': None,
+        'rate_limit': None,
+        'raw': False,
+        'read_timeout': 30.0,
+        'retries': 3,
+        'revalidate': None,
+        'throttle': None,
+    })
+
     EXPAND_AVAILABILITY = 'availability'
     EXPAND_BUNDLED_PRODUCTS = 'bundled_products'
     EXPAND_LINKS = 'links'
@@ -63,6 +140,50 @@ class Demandware(object):
     EXPAND_VARIATIONS = 'variations'
     EXPAND_SET_PRODUCTS = 'set_products'
 
+    # Maximum number of ids accepted by products/(id1,id2,...)
+    MAX_PRODUCT_IDS = 24
+
+    # Raw response modes, decoded JSON or undecoded body
+    RAW_JSON = 'json'
+    RAW_BYTES = 'bytes'
+
+    # Maximum number of hits accepted by product_search count parameter
+    MAX_SEARCH_COUNT = 200
+
+    # Seconds that responses are cached per resource
+    CACHE_TTL = dict({
+        'products': 300,
+        'product_search': 60,
+        'categories': 900,
+    })
+
+    # Keys of request stats that are not durations
+    __stats_keys = frozenset((
+        'bytes',
+        'cache',
+        'retries',
+    ))
+
+    # Headers and POST values kept in history as ``***``, matched by substring
+    __history_redacted = (
+        'authorization',
+        'cookie',
+        'password',
+        'secret',
+    )
+
+    # Resources bound to the session cookie, responses are never shared
+    __session_resources = frozenset((
+        'account',
+        'basket',
+    ))
+
+    # Headers that do not change the response of a resource, any other one does,
+    # e.g. Authorization of a customer
+    __cache_ignore = frozenset((
+        'user-agent',
+    ))
+
 
 
     __expand = set((
@@ -93,7 +214,96 @@ class Demandware(object):
         Args:
 
         ``params``: Dictionary that contains settings to be applied,
-        all keys are required.
+        client_id, hostname, site and version keys are required.
+
+        ``params batch_size``: Integer, maximum number of SKUs per batched request,
+        capped to ``MAX_PRODUCT_IDS``.
+
+        ``params batch_window``: Float, seconds that single product lookups wait to be
+        merged into one products/(id1,id2,...) request, by default lookups are not batched.
+
+        ``params cache``: ``dw.cache.Cache`` backend where responses of read-only resources
+        are stored, by default responses are not cached. Raw results of cached, revalidated
+        or coalesced responses are copies, so they can be changed by the caller. Responses
+        are kept per URL and request headers, e.g. calls with the ``Authorization`` header
+        of other customer do not share them.
+
+        ``params cache_ttl``: Dictionary, seconds that responses are cached per resource,
+        updates ``CACHE_TTL`` values, a resource set to None is not cached.
+
+        ``params circuit_breaker``: True or Dictionary of ``dw.breaker.CircuitBreaker``
+        arguments, if set requests to a resource of a hostname that keeps failing are
+        not sent for a while, the last validated response is returned when available.
+        Breakers are shared per hostname and resource by every client in the process,
+        arguments of the first client are kept, other clients with different arguments
+        get a ``RuntimeWarning``.
+
+        ``params coalesce``: Boolean, if True concurrent identical GET requests share a
+        single request to the OCAPI host, basket and account requests are never shared.
+
+        ``params codec``: ``dw.codec.Codec`` or JSON module name used to encode and
+        decode bodies, by default the fastest installed module.
+
+        ``params compress``: Boolean, if True responses are requested with gzip or deflate
+        compression, enabled by default.
+
+        ``params connect_timeout``: Float, seconds to wait for a connection to the OCAPI host,
+        None waits forever.
+
+        ``params cookie_jar``: ``cookielib.CookieJar`` to be shared with other clients,
+        so they keep the same customer session.
+
+        ``params debug``: Boolean, if True request and response of the last call of every
+        thread are kept to be inspected with ``debug``, ``get_request`` and ``get_response``.
+
+        ``params history``: Integer, number of recent calls kept from every thread to be
+        inspected with ``get_history``, older calls are discarded, None keeps none.
+        Passwords, authorization and cookie headers are kept as ``***``.
+
+        ``params history_body_limit``: Integer, characters of the response body kept in history,
+        decoded bodies are kept as JSON text encoded up to the limit, None keeps the whole
+        decoded body, streamed bodies are not kept.
+
+        ``params history_sample_rate``: Float between 0 and 1, fraction of calls kept in history.
+
+        ``params hooks``: List of functions called after every request with a dictionary
+        of metrics, see ``add_hook``.
+
+        ``params max_in_flight``: Integer, maximum concurrent requests per client_id and
+        hostname, shared by every client in the process. Limits of the first client are
+        kept, other clients with different rate_limit, rate_burst or max_in_flight get
+        a ``RuntimeWarning``, pass a ``throttle`` to use other limits.
+
+        ``params pool``: ``ConnectionPool`` to be shared with other clients,
+        by default every client opens its own pool.
+
+        ``params pool_maxsize``: Integer, maximum number of keep-alive connections per host.
+
+        ``params pool_idle_timeout``: Float, seconds before an idle connection is closed.
+
+        ``params rate_burst``: Integer, requests that can be sent at once when ``rate_limit`` is set.
+
+        ``params rate_limit``: Float, maximum requests per second per client_id and hostname,
+        shared by every client in the process, see ``max_in_flight``.
+
+        ``params raw``: Default response mode of resource methods, False returns objects,
+        True or ``RAW_JSON`` returns decoded JSON as dictionaries, ``RAW_BYTES`` returns
+        the response body without decoding it.
+
+        ``params read_timeout``: Float, seconds to wait for data from the OCAPI host,
+        None waits forever.
+
+        ``params retries``: ``dw.transport.Retry`` object or Integer, number of times that
+        GET requests failed with a connection error, 429, 502, 503 or 504 are retried with
+        exponential backoff, False disables retries.
+
+        ``params revalidate``: ``dw.cache.Cache`` backend where ETag and Last-Modified of
+        responses are stored to send conditional requests, True uses a ``MemoryCache``,
+        by default conditional requests are not sent. Basket and account responses are
+        bound to the session cookie and are not stored.
+
+        ``params throttle``: ``dw.throttle.Throttle`` used instead of rate_limit and
+        max_in_flight, e.g. with a ``FileTokenBucket`` shared between processes.
 
         Raises:
 
@@ -108,7 +318,7 @@ class Demandware(object):
         for arg in diff:
             if arg in self.__required:
                 raise ParameterMissedError('%s' % arg)
-            elif arg in args:
+            elif arg in args and arg not in self.__optional:
                 raise ParameterInvalidError('%s' % arg)
 
         self.__client_id = params.get('client_id')
@@ -116,6 +326,75 @@ class Demandware(object):
         self.__site = params.get('site')
         self.__version = params.get('version')
 
+        settings = dict(self.__optional)
+        settings.update((k, v) for k, v in params.iteritems() if k in self.__optional)
+
+        self.__pool = settings['pool']
+        if self.__pool is None:
+            self.__pool = ConnectionPool(
+                maxsize=settings['pool_maxsize'],
+                idle_timeout=settings['pool_idle_timeout'],
+            )
+
+        self.__cache = settings['cache']
+        self.__cache_ttl = dict(self.CACHE_TTL)
+        self.__cache_ttl.update(settings['cache_ttl'] or {})
+
+        self.__breaker = settings['circuit_breaker']
+        if self.__breaker is True:
+            self.__breaker = {}
+
+        self.__throttle = settings['throttle']
+        if self.__throttle is None and (settings['rate_limit'] or settings['max_in_flight']):
+            self.__throttle = get_throttle(
+                (self.__client_id, self.__hostname),
+                rate=settings['rate_limit'],
+                burst=settings['rate_burst'],
+                max_in_flight=settings['max_in_flight'],
+            )
+
+        self.__retries = Retry.from_value(settings['retries']) or False
+        self.__timeout = (settings['connect_timeout'], settings['read_timeout'])
+
+        self.__raw = settings['raw']
+        self.__compress = settings['compress']
+        self.__flight = SingleFlight() if settings['coalesce'] else None
+
+        self.__batch_window = settings['batch_window']
+        self.__batch_size = min(settings['batch_size'], self.MAX_PRODUCT_IDS)
+        self.__batchers = {}
+        self.__batch_lock = threading.Lock()
+
+        self.__codec = settings['codec']
+        if self.__codec is None or isinstance(self.__codec, basestring):
+            self.__codec = get_codec(self.__codec)
+
+        self.__validators = settings['revalidate']
+        if self.__validators is True:
+            self.__validators = MemoryCache()
+
+        self.__hooks = tuple(settings['hooks'] or ())
+        self.__debug_enabled = settings['debug']
+
+        self.__history = None
+        if settings['history']:
+            self.__history = deque(maxlen=int(settings['history']))
+        self.__history_body_limit = settings['history_body_limit']
+        self.__history_sample_rate = float(settings['history_sample_rate'])
+
+        # Values that do not change between calls
+        self.__url_prefix = dict((secure, '%s://%s/s/%s/dw/shop/%s/' % (
+            'https' if secure else 'http',
+            self.__hostname,
+            self.__site,
+            self.__version,
+        )) for secure in (False, True))
+        self.__default_request = Request(self.__client_id, self.__USER_AGENT)
+        self.__default_query = urllib.urlencode(sorted(self.__default_request.get.items()))
+
+        self.__cookie = settings['cookie_jar']
+        self.__local = threading.local()
+
         self._reset()
         self._debug()
         self._set_cookie()
@@ -125,10 +404,8 @@ class Demandware(object):
         Store cookie.
 
         """
-        self.__cookie = cookielib.CookieJar()
-        opener = urllib2.build_opener(urllib2.HTTPCookieProcessor(self.__cookie))
-        opener.addheaders = [('User-agent', self.__USER_AGENT)]
-        urllib2.install_opener(opener)
+        if self.__cookie is None:
+            self.__cookie = cookielib.CookieJar()
 
     def _unset_cookie(self):
         """
@@ -143,37 +420,49 @@ class Demandware(object):
         Restore default values used to request a service.
 
         """
-        self.__secure = False
-        self.__method = 'GET'
+        self.__local.request = None
 
-        self.__headers = {
-            'User-Agent': self.__USER_AGENT,
-            'x-dw-client-id': self.__client_id,
-        }
+    def _request(self):
+        """
+        Returns values used to request a service from the calling thread,
+        they are created the first time a value is set.
 
-        self.__get = {
-            'format': 'json',
-            'client_id': self.__client_id
-        }
+        """
+        request = getattr(self.__local, 'request', None)
+        if request is None:
+            request = self.__local.request = Request(self.__client_id, self.__USER_AGENT)
+        return request
 
-        self.__post = {
-        }
+    def _pristine(self):
+        """
+        Returns True if no value was set for the next call of the calling thread.
+
+        """
+        request = getattr(self.__local, 'request', None)
+        return request is None or request.is_default()
 
-    def _debug(self):
+    def _debug(self, request=None, params=None):
         """
         Lets inspect request and response data.
 
+        Args:
+
+        ``request``: ``Request`` object, by default the one of the calling thread.
+
+        ``params``: Dictionary, GET parameters sent, by default the ones of request.
+
         Returns:
 
         Dictionary with request and response keys.
 
         """
-        self.__debug = {
+        request = request or getattr(self.__local, 'request', None) or self.__default_request
+        self.__local.debug = {
             'request': {
-                'headers': self.__headers,
-                'get': self.__get,
-                'post': self.__post,
-                'method': self.__method,
+                'headers': request.headers,
+                'get': request.get if params is None else params,
+                'post': request.post,
+                'method': request.method,
             },
             'response': {
                 'info': {},
@@ -181,8 +470,69 @@ class Demandware(object):
                 'body': {},
             },
         }
+        self.__local.last_call = None
+        return self.__local.debug
+
+    def _debug_data(self):
+        """
+        Returns last call of the calling thread as dictionary.
+
+        """
+        if getattr(self.__local, 'debug', None) is None:
+            self._debug()
+        return self.__local.debug
+
+    def _last_call(self):
+        """
+        Returns last call of the calling thread as object.
+
+        """
+        if getattr(self.__local, 'last_call', None) is None:
+            self.__local.last_call = Object(self._debug_data())
+        return self.__local.last_call
+
+    def _cache_ttl(self, uri, request):
+        """
+        Returns seconds that response for uri can be cached, None if it should not be cached.
 
-    def _call(self, uri, extra_params=None):
+        """
+        if self.__cache is None or request.method != 'GET' or request.secure:
+            return None
+        return self.__cache_ttl.get(uri.split('/', 1)[0])
+
+    def _cache_key(self, url, request):
+        """
+        Returns cache key for an URL and the headers that change its response,
+        it is also the key of coalesced and revalidated requests.
+
+        """
+        headers = sorted(
+            (str(name).lower(), value) for name, value in request.headers.iteritems()
+            if str(name).lower() not in self.__cache_ignore
+        )
+        return '\n'.join([url] + ['%s: %s' % header for header in headers])
+
+    def _raw(self, raw=None):
+        """
+        Returns response mode for a call, by default the one of the client.
+
+        """
+        if raw is None:
+            raw = self.__raw
+        if raw is True:
+            raw = self.RAW_JSON
+        return raw or False
+
+    def _result(self, body, raw):
+        """
+        Returns response body according to response mode.
+
+        """
+        if raw:
+            return body
+        return wrap(body)
+
+    def _call(self, uri, extra_params=None, raw=False, stream=None, deadline=None):
         """
         Execute a request and save last response data.
 
@@ -190,52 +540,418 @@ class Demandware(object):
 
         ``uri``: String that represents resource path.
 
+        ``extra_params``: Dictionary, GET parameters merged for this call.
+
+        ``raw``: Response mode, if ``RAW_BYTES`` the body is not decoded.
+
+        ``stream``: String, name of an array in the response, if set the body is
+        a generator that parses items while they are received, responses are not cached.
+
+        ``deadline``: Float, ``time.time()`` value after which the request is abandoned.
+
+        Returns:
+
+        Response of this call as dictionary with info, headers and body keys.
+
         """
-        params = self.__get
-        if extra_params is not None:
+        # Detach request, so the next one starts clean
+        request = getattr(self.__local, 'request', None)
+        self.__local.request = None
+        if request is None:
+            # Nothing was set for this call, defaults are shared and never modified
+            request = self.__default_request
+
+        start = time.time()
+        stats = {} if self.__hooks else None
+
+        params = request.get
+        if extra_params:
+            params = dict(params)
             params.update(extra_params)
-        protocol = 'https' if self.__secure else 'http'
-        url = '%s://%s/s/%s/dw/shop/%s/%s?&%s' % (
-            protocol,
-            self.__hostname,
-            self.__site,
-            self.__version,
-            uri,
-            urllib.urlencode(params),
-        )
+            query = urllib.urlencode(sorted(params.items()))
+        elif request is self.__default_request:
+            query = self.__default_query
+        else:
+            query = urllib.urlencode(sorted(params.items()))
+        url = '%s%s?&%s' % (self.__url_prefix[request.secure], uri, query)
+
+        debug = self._debug(request, params) if self.__debug_enabled else None
+
+        ttl = self._cache_ttl(uri, request) if stream is None else None
+        shareable = request.method == 'GET' and not request.secure and stream is None and \
+            uri.split('/', 1)[0] not in self.__session_resources
+        revalidate = self.__validators is not None and shareable
+        coalesce = self.__flight is not None and shareable
+
+        cache_key = None
+        if ttl is not None or revalidate or coalesce:
+            cache_key = self._cache_key(url, request)
+            if raw == self.RAW_BYTES:
+                cache_key += '\n%s' % raw
+        # Decoded bodies kept by cache, validators or other callers are not given away
+        shared_body = cache_key is not None and raw == self.RAW_JSON
+
+        if ttl is not None:
+            cached = self.__cache.get(cache_key)
+            if stats is not None:
+                stats['cache'] = 'hit' if cached is not None else 'miss'
+            if cached is not None:
+                response = {
+                    'info': {'code': httplib.OK, 'url': url, 'cached': True},
+                    'headers': cached['headers'],
+                    'body': cached['body'],
+                }
+                return self._finish(uri, url, request, params, response, debug, stats, start, shared_body)
+
+        breaker = None
+        if self.__breaker is not None:
+            breaker = get_breaker((self.__hostname, uri.split('/', 1)[0]), **self.__breaker)
+            if not breaker.allow():
+                response = self._circuit_open(url, cache_key if revalidate else None)
+                return self._finish(uri, url, request, params, response, debug, stats, start, shared_body)
+
+        sent = time.time()
+        shared = False
+        try:
+            if coalesce:
+                # Identical requests in flight share a single response
+                try:
+                    response, shared = self.__flight.do_until(
+                        deadline, cache_key, self._send, request, url, raw, stream, cache_key, ttl,
+                        revalidate, deadline, stats
+                    )
+                except TimeoutError:
+                    # Outcome of the shared request is recorded by the caller that sent it
+                    response = {
+                        'info': {'code': None, 'reason': 'Deadline exceeded', 'unsent': True},
+                        'headers': {},
+                        'body': {},
+                    }
+                    shared = True
+                else:
+                    if shared:
+                        response = dict(response, info=dict(response['info'], coalesced=True))
+            else:
+                response = self._send(request, url, raw, stream, cache_key, ttl, revalidate, deadline, stats)
+        except BaseException:
+            if breaker is not None:
+                breaker.record(False, time.time() - sent)
+            raise
+        if breaker is not None and not shared and not response['info'].get('unsent'):
+            code = response['info']['code']
+            breaker.record(code is not None and code < httplib.INTERNAL_SERVER_ERROR, time.time() - sent)
+
+        return self._finish(uri, url, request, params, response, debug, stats, start, shared_body)
+
+    def _finish(self, uri, url, request, params, response, debug, stats, start, shared_body=False):
+        """
+        Keep response of a call for inspection and call hooks.
 
-        self._debug()
+        Args:
+
+        ``shared_body``: Boolean, if True the body is also referenced by cache, validators
+        or coalesced calls and the caller gets a copy, so changes are not seen by other calls.
+
+        Returns:
+
+        Response of the call.
+
+        """
+        if shared_body and response['info'].get('code') == httplib.OK:
+            response = dict(response, body=clone(response['body']))
+        if debug is not None:
+            debug['response'] = response
+        if self.__history is not None:
+            rate = self.__history_sample_rate
+            if rate >= 1 or random.random() < rate:
+                self._record(url, request, params, response, start)
+        if stats is not None:
+            self._emit(uri, request, response, stats, start)
+        return response
+
+    def _record(self, url, request, params, response, start):
+        """
+        Add a call to history, the oldest one is discarded when it is full.
+
+        """
+        body = response['body']
+        limit = self.__history_body_limit
+        if isinstance(body, ArrayStream):
+            # Streamed bodies are consumed by the caller
+            body = None
+        elif limit is not None:
+            if isinstance(body, (dict, list)):
+                body = dumps_prefix(body, limit)
+            elif len(body) > limit:
+                body = body[:limit] + '...'
+
+        # Appending to a bounded deque is atomic, no lock is needed
+        self.__history.append({
+            'time': start,
+            'duration': time.time() - start,
+            'request': {
+                'url': url,
+                'method': request.method,
+                'headers': self._redact(request.headers),
+                'get': params,
+                'post': self._redact(request.post),
+            },
+            'response': {
+                'info': response['info'],
+                'headers': self._redact(response['headers']),
+                'body': body,
+            },
+        })
+
+    def _redact(self, value):
+        """
+        Returns a copy of value where values of credential keys, e.g. passwords
+        sent by ``login`` and ``register`` or the session cookie, are replaced by ``***``.
+
+        """
+        if isinstance(value, dict):
+            redacted = {}
+            for key, item in value.iteritems():
+                name = str(key).lower()
+                if any(word in name for word in self.__history_redacted):
+                    redacted[key] = '***'
+                else:
+                    redacted[key] = self._redact(item)
+            return redacted
+        if isinstance(value, list):
+            return [self._redact(item) for item in value]
+        return value
+
+    def _emit(self, uri, request, response, stats, start):
+        """
+        Call hooks with the metrics of a call.
+
+        Args:
+
+        ``stats``: Dictionary with cache result, retries, bytes and seconds per phase.
+
+        ``start``: Float, ``time.time()`` value when the call started.
+
+        """
+        info = response['info']
+        timings = dict((k, v) for k, v in stats.iteritems() if k not in self.__stats_keys)
+        timings['total'] = time.time() - start
+        event = {
+            'resource': uri.split('/', 1)[0],
+            'method': request.method,
+            'url': info.get('url'),
+            'status': info['code'],
+            'reason': info.get('reason'),
+            'cache': stats.get('cache'),
+            'coalesced': info.get('coalesced', False),
+            'revalidated': info.get('revalidated', False),
+            'stale': info.get('stale', False),
+            'retries': stats.get('retries', 0),
+            'bytes': stats.get('bytes', 0),
+            'timings': timings,
+        }
+        for hook in self.__hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception('Hook %r failed', hook)
+
+    def add_hook(self, hook):
+        """
+        Register a function called after every request of this client.
+
+        The function receives a dictionary with resource, method, url, status, reason,
+        cache (hit, miss or None if the resource is not cached), coalesced, revalidated,
+        stale, retries, bytes (received from the host) and timings keys, timings holds
+        seconds spent in queue (rate limit), dns, connect, tls, ttfb (time to first byte),
+        download, decode and total phases, only phases that happened are present.
+
+        Examples:
+
+        from dw.metrics import LoggingHook, MetricsHook
+        conn.add_hook(LoggingHook())
+
+        Args:
 
-        request = urllib2.Request(url=url, headers=self.__headers)
+        ``hook``: Function that receives a dictionary.
 
-        if self.__method == 'POST':
-            request.add_data(json.dumps(self.__post))
+        """
+        self.__hooks += (hook,)
+
+    def remove_hook(self, hook):
+        """
+        Unregister a function added with ``add_hook``.
+
+        """
+        self.__hooks = tuple(h for h in self.__hooks if h is not hook)
+
+    def _circuit_open(self, url, cache_key=None):
+        """
+        Response of a call that was not sent because its circuit breaker is open.
+
+        Args:
+
+        ``cache_key``: String, key of the last validated response, returned instead if stored.
+
+        Returns:
+
+        Dictionary with info, headers and body keys.
+
+        """
+        validated = self.__validators.get(cache_key) if cache_key is not None else None
+        if validated is not None:
+            return {
+                'info': {'code': httplib.OK, 'url': url, 'stale': True},
+                'headers': validated['headers'],
+                'body': validated['body'],
+            }
+        return {
+            'info': {'code': None, 'reason': 'Circuit open', 'circuit_open': True},
+            'headers': {},
+            'body': {},
+        }
+
+    def _send(self, request, url, raw=False, stream=None, cache_key=None, ttl=None, revalidate=False,
+              deadline=None, stats=None):
+        """
+        Send a request to the OCAPI host.
+
+        Args:
+
+        ``request``: ``Request`` object.
+
+        ``url``: String, absolute URL.
+
+        ``raw``: Response mode, if ``RAW_BYTES`` the body is not decoded.
+
+        ``stream``: String, name of an array in the response to be parsed while it is received.
+
+        ``cache_key``: String, key used to store the response.
+
+        ``ttl``: Float, seconds that response is cached, if None it is not cached.
+
+        ``revalidate``: Boolean, if True a conditional request is sent.
+
+        ``deadline``: Float, ``time.time()`` value after which the request is abandoned.
+
+        ``stats``: Dictionary where retries, bytes and seconds per phase are stored.
+
+        Returns:
+
+        Dictionary with info, headers and body keys.
+
+        """
+        result = {
+            'info': {},
+            'headers': {},
+            'body': {},
+        }
+
+        http_request = urllib2.Request(url=url, headers=request.headers)
+        if self.__compress:
+            http_request.add_unredirected_header('Accept-Encoding', 'gzip, deflate')
+
+        validated = self.__validators.get(cache_key) if revalidate else None
+        if validated is not None:
+            if validated['etag'] is not None:
+                http_request.add_unredirected_header('If-None-Match', validated['etag'])
+            if validated['last_modified'] is not None:
+                http_request.add_unredirected_header('If-Modified-Since', validated['last_modified'])
+
+        if request.method == 'POST':
+            http_request.add_data(self.__codec.dumps(request.post))
+        self.__cookie.add_cookie_header(http_request)
+        throttle = self.__throttle
         try:
-            response = urllib2.urlopen(request)
-        except urllib2.URLError as e:
-            errno = e.code if hasattr(e, 'code') else None
-            errstr = str(e.msg) if hasattr(e, 'msg') else (str(e.reason) if hasattr(e, 'reason') else None)
-            self.__debug['response']['info'] = {'code': errno, 'reason': errstr}
-        except urllib2.HTTPError as e:
-            errno = e.code if hasattr(e, 'code') else None
-            errstr = str(e.msg) if hasattr(e, 'msg') else (str(e.reason) if hasattr(e, 'reason') else None)
-            self.__debug['response']['info'] = {'code': errno, 'reason': errstr}
+            # Every attempt waits for the throttle, the slot of the response is kept
+            response = self.__pool.urlopen(
+                http_request.get_method(),
+                url,
+                body=http_request.get_data(),
+                headers=dict(http_request.header_items()),
+                retries=self.__retries,
+                timeout=self.__timeout,
+                deadline=deadline,
+                stats=stats,
+                throttle=throttle,
+            )
+        except TransportError as e:
+            result['info'] = {'code': None, 'reason': str(e)}
+            if isinstance(e, DeadlineError):
+                # Expired in a local queue, the host is not to blame
+                result['info']['unsent'] = True
+            return result
+        try:
+            self.__cookie.extract_cookies(response, http_request)
+            if stream is None or response.getcode() != httplib.OK:
+                read = time.time()
+                data = response.read()
+                if stats is not None:
+                    stats['download'] = time.time() - read
+                    stats['bytes'] = response.bytes_read
+        except TransportError as e:
+            result['info'] = {'code': None, 'reason': str(e)}
+            return result
+        finally:
+            if throttle is not None:
+                # Streamed bodies are read after the slot is released
+                throttle.release()
+
+        if response.getcode() >= httplib.BAD_REQUEST:
+            result['info'] = {'code': response.getcode(), 'reason': str(response.reason)}
+        elif response.getcode() == httplib.NOT_MODIFIED and validated is not None:
+            # Stored copy is still valid
+            result = {
+                'info': {'code': httplib.OK, 'url': response.geturl(), 'revalidated': True},
+                'headers': validated['headers'],
+                'body': validated['body'],
+            }
+            if ttl is not None:
+                self.__cache.set(cache_key, {
+                    'headers': validated['headers'],
+                    'body': validated['body'],
+                }, ttl)
         else:
-            self.__debug['response']['info'] = {
+            result['info'] = {
                 'code': response.getcode(),
                 'url': response.geturl()
             }
-            self.__debug['response']['headers'] = dict(response.info())
+            headers = result['headers'] = dict(response.info())
+
+            if stream is not None:
+                loads = None
+                if raw == self.RAW_JSON:
+                    loads = self.__codec.loads
+                elif not raw:
+                    codec_loads = self.__codec.loads
+                    loads = lambda text: wrap(codec_loads(text))
+                # Owns the connection until the last item is read or it is dropped
+                result['body'] = ArrayStream(response, stream, loads)
+                return result
 
             try:
-                self.__debug['response']['body'] = json.loads(response.read())
+                decode = time.time()
+                result['body'] = self.__codec.loads(data) if raw != self.RAW_BYTES else data
+                if stats is not None and raw != self.RAW_BYTES:
+                    stats['decode'] = time.time() - decode
             except ValueError:
-                self.__debug['response']['body'] = json.loads(str(dict()))
-
-
-        self.__last_call = Object(self.__debug)
-
-        self._reset()
+                result['body'] = dict()
+            else:
+                if response.getcode() == httplib.OK:
+                    if ttl is not None:
+                        self.__cache.set(cache_key, {
+                            'headers': headers,
+                            'body': result['body'],
+                        }, ttl)
+                    if revalidate and ('etag' in headers or 'last-modified' in headers):
+                        self.__validators.set(cache_key, {
+                            'etag': headers.get('etag'),
+                            'last_modified': headers.get('last-modified'),
+                            'headers': headers,
+                            'body': result['body'],
+                        })
+
+        return result
 
     def set_header(self, key, value):
         """
@@ -248,7 +964,7 @@ class Demandware(object):
         ``value``: Value to be saved.
 
         """
-        self.__headers.update({str(key): value})
+        self._request().headers.update({str(key): value})
 
     def set_get(self, key, value):
         """
@@ -260,7 +976,7 @@ class Demandware(object):
         ``value``: Value to be saved.
 
         """
-        self.__get.update({str(key): value})
+        self._request().get.update({str(key): value})
 
     def set_post(self, key, value):
         """
@@ -273,7 +989,7 @@ class Demandware(object):
         ``value``: Value to be saved.
 
         """
-        self.__post.update({str(key): value})
+        self._request().post.update({str(key): value})
 
     def get(self, key=None):
         """
@@ -289,9 +1005,9 @@ class Demandware(object):
 
         """
         if key is not None:
-            return self.__get.get(str(key))
+            return self._request().get.get(str(key))
         else:
-            return self.__get
+            return self._request().get
 
     def post(self, key=None):
         """
@@ -307,9 +1023,9 @@ class Demandware(object):
 
         """
         if key is not None:
-            return self.__post.get(str(key))
+            return self._request().post.get(str(key))
         else:
-            return self.__post
+            return self._request().post
 
     def header(self, key=None):
         """
@@ -325,9 +1041,9 @@ class Demandware(object):
 
         """
         if key is not None:
-            return self.__headers.get(str(key))
+            return self._request().headers.get(str(key))
         else:
-            return self.__headers
+            return self._request().headers
 
     def get_response(self, as_dict=False):
         """
@@ -343,9 +1059,9 @@ class Demandware(object):
 
         """
         if as_dict:
-            return self.__debug['response']
+            return self._debug_data()['response']
         else:
-            return self.__last_call
+            return self._last_call()
 
     def get_request(self, as_dict=False):
         """
@@ -361,9 +1077,57 @@ class Demandware(object):
 
         """
         if as_dict:
-            return self.__debug['request']
+            return self._debug_data()['request']
         else:
-            return self.__last_call
+            return self._last_call()
+
+    def get_history(self, as_dict=False):
+        """
+        Lets inspect recent calls of every thread.
+
+        Args:
+
+        ``as_dict``: Boolean that indicates if should returns as objects or dictionaries.
+
+        Returns:
+
+        List of calls from the oldest to the newest, every one with time, duration,
+        request and response, empty if ``params history`` is not set.
+
+        Examples:
+
+        conn = Demandware({..., 'history': 20, 'history_body_limit': 512})
+        for call in conn.get_history():
+            print call.response.info.code, call.request.url
+
+        """
+        if self.__history is None:
+            return []
+        calls = list(self.__history)
+        if as_dict:
+            return calls
+        return [Object(call) for call in calls]
+
+    def clear_history(self):
+        """
+        Discard calls kept in history.
+
+        """
+        if self.__history is not None:
+            self.__history.clear()
+
+    def get_throttle_stats(self):
+        """
+        Lets inspect time spent waiting for rate limit and max_in_flight.
+
+        Returns:
+
+        Dictionary with requests, in_flight, wait_time and max_wait keys,
+        None if requests are not throttled.
+
+        """
+        if self.__throttle is not None:
+            return self.__throttle.stats()
 
     def debug(self):
         """
@@ -379,6 +1143,22 @@ class Demandware(object):
             'response': self.get_response(as_dict=True),
         }
 
+    def _deadline(self, seconds):
+        """
+        Returns ``time.time()`` value when a call of seconds expires, None if seconds is None.
+
+        """
+        if seconds is not None:
+            return time.time() + seconds
+
+    def _remaining(self, deadline):
+        """
+        Returns seconds left before deadline, None if deadline is None.
+
+        """
+        if deadline is not None:
+            return max(0.0, deadline - time.time())
+
     def get_product(self, ids, arrayify=False, **kwargs):
         """
         Access products resource.
@@ -392,6 +1172,17 @@ class Demandware(object):
         ``kwarg expand``: expands the result document, which may include any of the __expand values:
         https://documentation.demandware.com/display/DOC132/Product+resource
 
+        ``kwarg raw``: Response mode, see ``Demandware`` raw setting, with ``RAW_BYTES``
+        the body is returned as is.
+
+        ``kwarg stream``: Boolean, if True and ids is a list, returns a ``dw.stream.ArrayStream``
+        that parses products while they are received, with ``RAW_BYTES`` each product is
+        returned as JSON text. The connection is released once it is exhausted, closed or dropped.
+
+        ``kwarg deadline``: Float, seconds that the call may take including retries and
+        waits for a pooled connection, a throttle slot or an identical request in flight,
+        once exceeded None is returned.
+
         Returns:
 
         Product as object if SKU exists otherwise None.
@@ -400,25 +1191,161 @@ class Demandware(object):
 
         """
         expand = kwargs.get('expand', None)
-        expand_query = None
-        if not isinstance(expand, (list, tuple)):
-                expand = [expand]
-        if all(k in self.__expand for k in expand):
-            expand_query = {'expand': '%s' % ''.join(str('%s,' % q) for q in expand)}
+        expand_query = self._expand_query(expand)
+
+        raw = self._raw(kwargs.get('raw'))
+        deadline = self._deadline(kwargs.get('deadline'))
+        if (self.__batch_window and raw != self.RAW_BYTES and
+                not isinstance(ids, (list, tuple)) and self._pristine()):
+            try:
+                product = self._batcher(expand_query, expand).load(ids).result(self._remaining(deadline))
+            except TimeoutError:
+                return None
+            if product is None:
+                return None
+            if raw == self.RAW_JSON:
+                # Calls for the same SKU in a batch get the same dictionary
+                product = clone(product)
+            if arrayify:
+                return [self._result(product, raw)]
+            return self._result(product, raw)
+
+        stream = None
         if isinstance(ids, (list, tuple)):
             ids = '(%s)' % ''.join(str('%s,' % urllib.quote_plus(e)) for e in ids)
+            if kwargs.get('stream'):
+                stream = 'data'
         else:
             ids = urllib.quote_plus(ids)
 
-        self._call('products/%s' % ids, expand_query)
+        response = self._call('products/%s' % ids, expand_query, raw, stream, deadline)
 
-        if self.__last_call.response.info.code == httplib.OK:
-            if hasattr(self.__last_call.response.body, 'data'):
-                return [Object(o) for o in self.__last_call.response.body.data]
+        if response['info']['code'] == httplib.OK:
+            body = response['body']
+            if stream is not None:
+                return body
+            elif raw == self.RAW_BYTES:
+                return body
+            elif 'data' in body:
+                return list(self._result(body['data'], raw))
             elif arrayify:
-                return [self.__last_call.response.body]
+                return [self._result(body, raw)]
+            else:
+                return self._result(body, raw)
+
+    def _expand_query(self, expand):
+        """
+        Returns GET values of a products request for expand, None if expand
+        has unknown values.
+
+        """
+        if not isinstance(expand, (list, tuple)):
+            expand = [expand]
+        if all(k in self.__expand for k in expand):
+            return {'expand': '%s' % ''.join(str('%s,' % q) for q in expand)}
+
+    def _batcher(self, expand_query, expand):
+        """
+        Batcher that merges single product lookups with the same expand values.
+
+        """
+        key = expand_query and expand_query['expand']
+        with self.__batch_lock:
+            batcher = self.__batchers.get(key)
+            if batcher is None:
+                def fetch(ids):
+                    kwargs = {'raw': self.RAW_JSON}
+                    if expand_query is not None:
+                        kwargs['expand'] = expand
+                    products = self.get_product(list(ids), **kwargs)
+                    if isinstance(products, dict):
+                        products = [products]
+                    return dict((p.get('id'), p) for p in products or [])
+                batcher = Batcher(fetch, self.__batch_window, self.__batch_size)
+                self.__batchers[key] = batcher
+        return batcher
+
+    def get_products_bulk(self, ids, chunk_size=MAX_PRODUCT_IDS, max_workers=4, **kwargs):
+        """
+        Access products resource for a large list of SKUs, they are requested
+        in chunks of up to ``MAX_PRODUCT_IDS`` that run concurrently.
+
+        Args:
+
+        ``ids``: Array of Strings that represents SKU of products.
+
+        ``chunk_size``: Integer, number of SKUs per request, capped to ``MAX_PRODUCT_IDS``.
+
+        ``max_workers``: Integer, number of requests in flight.
+
+        ``kwarg expand``: expands the result document, see ``get_product``.
+
+        ``kwarg raw``: Response mode, if enabled products are returned as dictionaries.
+
+        ``kwarg deadline``: Float, seconds that all requests may take.
+
+        Values set with ``set_get`` and ``set_header`` before the call (e.g. locale)
+        are used for every chunk.
+
+        Returns:
+
+        Tuple with the list of products as objects in the same order of ids,
+        and the list of SKUs that were not found.
+
+        Raises:
+
+        ``TransportError``: If a chunk could not be retrieved, e.g. the host is
+        unavailable or deadline expired, so missing SKUs are never an outage.
+
+        """
+        chunk_size = max(1, min(int(chunk_size), self.MAX_PRODUCT_IDS))
+
+        unique = []
+        seen = set()
+        for sku in ids:
+            if sku not in seen:
+                seen.add(sku)
+                unique.append(sku)
+        chunks = [unique[i:i + chunk_size] for i in xrange(0, len(unique), chunk_size)]
+
+        raw = self._raw(kwargs.get('raw'))
+        expand_query = self._expand_query(kwargs.get('expand'))
+        deadline = self._deadline(kwargs.get('deadline'))
+        request = self._request()
+        get, headers = dict(request.get), dict(request.headers)
+        self._reset()
+
+        def fetch(chunk):
+            # Chunks run in other threads, values of the caller are set again
+            for key, value in get.iteritems():
+                self.set_get(key, value)
+            for key, value in headers.iteritems():
+                self.set_header(key, value)
+            ids = '(%s)' % ''.join(str('%s,' % urllib.quote_plus(e)) for e in chunk)
+            response = self._call('products/%s' % ids, expand_query, self.RAW_JSON, None, deadline)
+            code = response['info']['code']
+            if code == httplib.OK:
+                return response['body'].get('data') or []
+            if code == httplib.NOT_FOUND:
+                return []
+            raise TransportError('Products %s could not be retrieved: %s %s' % (
+                ids, code, response['info'].get('reason')))
+
+        found = {}
+        with Executor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+            futures = [executor.submit(fetch, chunk) for chunk in chunks]
+            for future in futures:
+                for product in future.result():
+                    found[product.get('id')] = self._result(product, raw)
+
+        products = []
+        missing = []
+        for sku in ids:
+            if sku in found:
+                products.append(found[sku])
             else:
-                return self.__last_call.response.body
+                missing.append(sku)
+        return products, missing
 
     def search_product(self, query, **kwargs):
         """
@@ -431,6 +1358,16 @@ class Demandware(object):
         ``kwarg expand``: expands the result document, which may include any of the __expand values:
         https://documentation.demandware.com/display/DOC132/Product+resource
 
+        ``kwarg raw``: Response mode, see ``Demandware`` raw setting.
+
+        ``kwarg stream``: Boolean, if True returns a ``dw.stream.ArrayStream`` that parses hits
+        while they are received, with ``RAW_BYTES`` each hit is returned as JSON text.
+        The connection is released once it is exhausted, closed or dropped.
+
+        ``kwarg deadline``: Float, seconds that the call may take including retries and
+        waits for a pooled connection, a throttle slot or an identical request in flight,
+        once exceeded None is returned.
+
         Returns:
 
         Search results as object, if an error occur then None.
@@ -444,13 +1381,105 @@ class Demandware(object):
                 expand = [expand]
         if all(k in self.__expand for k in expand):
             expand_query = {'expand': '%s' % ''.join(str('%s,' % q) for q in expand)}
-        self.set_get('q', query)
-        self._call('product_search', expand_query)
+        extra_params = {'q': query}
+        if expand_query is not None:
+            extra_params.update(expand_query)
+        raw = self._raw(kwargs.get('raw'))
+        stream = 'hits' if kwargs.get('stream') else None
+        deadline = self._deadline(kwargs.get('deadline'))
+        response = self._call('product_search', extra_params, raw, stream, deadline)
+
+        if response['info']['code'] == httplib.OK:
+            if stream is not None:
+                return response['body']
+            return self._result(response['body'], raw)
+
+    def iter_search_products(self, query, page_size=25, prefetch=1, **kwargs):
+        """
+        Iterate over all hits of a product search, pages are requested lazily
+        while hits of the current page are processed.
 
-        if self.__last_call.response.info.code == httplib.OK:
-            return self.__last_call.response.body
+        GET values set before iteration starts (e.g. refinements) are used
+        for every page.
 
-    def search_category(self, category='root', levels=2):
+        Examples:
+
+        conn.set_get('refine_1', 'cgid=mens')
+        for hit in conn.iter_search_products('shirt', page_size=100, prefetch=2):
+            print hit['product_id']
+
+        Args:
+
+        ``query``: String, the query phrase to search for.
+
+        ``page_size``: Integer, hits per request, capped to ``MAX_SEARCH_COUNT``.
+
+        ``prefetch``: Integer, number of pages requested in background ahead of
+        the current one, 0 requests every page when it is needed.
+
+        ``kwarg expand``: expands the result document, see ``search_product``.
+
+        ``kwarg raw``: Response mode, if enabled hits are returned as dictionaries.
+
+        ``kwarg deadline``: Float, seconds that retrieving all pages may take.
+
+        Returns:
+
+        Generator of hits, stops at the last page.
+
+        Raises:
+
+        ``TransportError``: If a page can not be retrieved, e.g. the host is unavailable
+        or deadline expired, so a truncated iteration is never taken as complete.
+
+        """
+        page_size = max(1, min(int(page_size), self.MAX_SEARCH_COUNT))
+        params = dict(self._request().get)
+        self._reset()
+
+        raw = self._raw(kwargs.pop('raw', None))
+        kwargs['raw'] = self.RAW_JSON
+        deadline = self._deadline(kwargs.pop('deadline', None))
+
+        def fetch(start):
+            for key, value in params.iteritems():
+                self.set_get(key, value)
+            self.set_get('start', start)
+            self.set_get('count', page_size)
+            search = self.search_product(query, deadline=self._remaining(deadline), **kwargs)
+            if search is None:
+                raise TransportError('Search page at %d could not be retrieved' % start)
+            return search
+
+        executor = Executor(max_workers=prefetch) if prefetch > 0 else None
+        pending = deque()
+        try:
+            search = fetch(0)
+            total = search.get('total', 0)
+            start = page_size
+            while search is not None:
+                # Keep next pages in flight while current one is consumed
+                while executor is not None and len(pending) < prefetch and start < total:
+                    pending.append(executor.submit(fetch, start))
+                    start += page_size
+
+                hits = search.get('hits') or []
+                for hit in hits:
+                    yield self._result(hit, raw)
+                del hits
+
+                if pending:
+                    search = pending.popleft().result()
+                elif start < total:
+                    search = fetch(start)
+                    start += page_size
+                else:
+                    search = None
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def search_category(self, category='root', levels=2, raw=None, deadline=None):
         """
         Get online categories.
 
@@ -461,6 +1490,10 @@ class Demandware(object):
         ``levels``: Integer, Specifies how many levels of nested sub-categories you want the server to return. The default
         value is 1.
 
+        ``raw``: Response mode, see ``Demandware`` raw setting.
+
+        ``deadline``: Float, seconds that the call may take including retries.
+
         Returns:
 
         Categories as object, if an error occur then None.
@@ -468,16 +1501,23 @@ class Demandware(object):
         https://documentation.demandware.com/display/DOC131/Category+resource#Categoryresource-Getcategory
 
         """
-        self.set_get('levels', levels)
-        self._call('categories/%s' % category)
+        raw = self._raw(raw)
+        response = self._call('categories/%s' % category, {'levels': levels}, raw=raw,
+                              deadline=self._deadline(deadline))
 
-        if self.__last_call.response.info.code == httplib.OK:
-            return self.__last_call.response.body
+        if response['info']['code'] == httplib.OK:
+            return self._result(response['body'], raw)
 
-    def get_user(self):
+    def get_user(self, raw=None, deadline=None):
         """
         Get current customer data.
 
+        Args:
+
+        ``raw``: Response mode, see ``Demandware`` raw setting.
+
+        ``deadline``: Float, seconds that the call may take including retries.
+
         Returns:
 
         Returns the account profile object, if an error occur then None.
@@ -485,13 +1525,14 @@ class Demandware(object):
         https://documentation.demandware.com/display/DOC131/Account+resource#Accountresource-Getaccountprofile
 
         """
-        self.__secure = True
-        self._call('account/this')
+        self._request().secure = True
+        raw = self._raw(raw)
+        response = self._call('account/this', raw=raw, deadline=self._deadline(deadline))
 
-        if self.__last_call.response.info.code == httplib.OK:
-            return self.__last_call.response.body
+        if response['info']['code'] == httplib.OK:
+            return self._result(response['body'], raw)
 
-    def register(self, username, password, profile={}):
+    def register(self, username, password, profile={}, raw=None, deadline=None):
         """
         Action to register an account.
 
@@ -503,6 +1544,10 @@ class Demandware(object):
 
         ``profile:``: Dictionary, profile properties.
 
+        ``raw``: Response mode, see ``Demandware`` raw setting.
+
+        ``deadline``: Float, seconds that the call may take including retries.
+
         Returns:
 
         Returns the account profile object, if an error occur then None.
@@ -510,8 +1555,9 @@ class Demandware(object):
         https://documentation.demandware.com/display/DOC131/Account+resource#Accountresource-Registeraccount
 
         """
-        self.__secure = True
-        self.__method = 'POST'
+        request = self._request()
+        request.secure = True
+        request.method = 'POST'
 
         self.set_header('Content-Type', 'application/json')
         self.set_post('credentials', {
@@ -519,12 +1565,13 @@ class Demandware(object):
             'password': str(password)
         })
         self.set_post('profile', profile)
-        self._call('account/register')
+        raw = self._raw(raw)
+        response = self._call('account/register', raw=raw, deadline=self._deadline(deadline))
 
-        if self.__last_call.response.info.code == httplib.OK:
-            return self.__last_call.response.body
+        if response['info']['code'] == httplib.OK:
+            return self._result(response['body'], raw)
 
-    def login(self, username, password):
+    def login(self, username, password, deadline=None):
         """
         Action to login a customer.
 
@@ -534,6 +1581,8 @@ class Demandware(object):
 
         ``password:``: String, customer password.
 
+        ``deadline``: Float, seconds that the call may take.
+
         Returns:
 
         If success then returns True otherwise False.
@@ -541,22 +1590,27 @@ class Demandware(object):
         https://documentation.demandware.com/display/DOC131/Account+resource#Accountresource-Loginaction
 
         """
-        self.__secure = True
-        self.__method = 'POST'
+        request = self._request()
+        request.secure = True
+        request.method = 'POST'
 
         self.set_header('Content-Type', 'application/json')
         self.set_post('username', str(username))
         self.set_post('password', str(password))
-        self._call('account/login')
+        response = self._call('account/login', deadline=self._deadline(deadline))
 
-        if self.__last_call.response.info.code == httplib.NO_CONTENT:
+        if response['info']['code'] == httplib.NO_CONTENT:
             return True
         return False
 
-    def logout(self):
+    def logout(self, deadline=None):
         """
         Action to logout a customer.
 
+        Args:
+
+        ``deadline``: Float, seconds that the call may take.
+
         Returns:
 
         If success then returns True otherwise False.
@@ -564,21 +1618,28 @@ class Demandware(object):
         https://documentation.demandware.com/display/DOC131/Account+resource#Accountresource-Logoutaction
 
         """
-        self.__secure = True
-        self.__method = 'POST'
+        request = self._request()
+        request.secure = True
+        request.method = 'POST'
 
         self.set_header('Content-Type', 'application/json')
-        self._call('account/logout')
+        response = self._call('account/logout', deadline=self._deadline(deadline))
 
-        if self.__last_call.response.info.code == httplib.NO_CONTENT:
+        if response['info']['code'] == httplib.NO_CONTENT:
             return True
         return False
 
-    def get_basket(self):
+    def get_basket(self, raw=None, deadline=None):
         """
         Returns a limited set of basket information. Limited means that no checkout related information
         (i.e. addresses, shipping and payment method) are returned.
 
+        Args:
+
+        ``raw``: Response mode, see ``Demandware`` raw setting.
+
+        ``deadline``: Float, seconds that the call may take including retries.
+
         Returns:
 
         If success then Basket as object otherwise None.
@@ -586,7 +1647,8 @@ class Demandware(object):
         https://documentation.demandware.com/display/DOC131/Basket+resource#Basketresource-Getbasket
 
         """
-        self._call('basket/this')
+        raw = self._raw(raw)
+        response = self._call('basket/this', raw=raw, deadline=self._deadline(deadline))
 
-        if self.__last_call.response.info.code == httplib.OK:
-            return self.__last_call.response.body
+        if response['info']['code'] == httplib.OK:
+            return self._result(response['body'], raw)
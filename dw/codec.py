@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import json
+
+###############################################################
+# JSON Codecs
+###############################################################
+class Codec(object):
+    """
+    Encode and decode request and response bodies.
+
+    Examples:
+
+    codec = get_codec()
+    codec.loads('{"foo": "bar"}')
+
+    """
+    def __init__(self, module, name=None):
+        """
+        Args:
+
+        ``module``: Module that provides ``dumps`` and ``loads`` functions.
+
+        ``name``: String, codec name, by default module name.
+
+        """
+        self.module = module
+        self.name = name or module.__name__
+
+        self.dumps = module.dumps
+        self.loads = module.loads
+
+    def __repr__(self):
+        return '<Codec %s>' % self.name
+
+
+# Modules tried by get_codec, fastest first
+CODECS = (
+    'ujson',
+    'simplejson',
+    'json',
+)
+
+
+# Pure Python encoder, its chunks are produced while the value is walked
+_encoder = json.JSONEncoder()
+
+def dumps_prefix(value, limit):
+    """
+    Encode value as JSON text up to limit characters, the rest of the value
+    is not encoded, so cost does not grow with the size of value.
+
+    Returns:
+
+    String, followed by ``...`` if value was truncated.
+
+    """
+    chunks = []
+    size = 0
+    for chunk in _encoder.iterencode(value):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return ''.join(chunks)[:limit] + '...'
+    return ''.join(chunks)
+
+
+def get_codec(name=None):
+    """
+    Returns codec for a JSON module.
+
+    Args:
+
+    ``name``: String, module name, by default the fastest installed module of ``CODECS``.
+
+    Raises:
+
+    ``ImportError``: If the module requested is not installed.
+
+    """
+    if name is not None:
+        return Codec(__import__(name))
+    for name in CODECS:
+        try:
+            return Codec(__import__(name))
+        except ImportError:
+            pass
+    return Codec(json)
@@ -34,3 +34,19 @@ class ParameterMissedError(DemandwareError):
 class ParameterInvalidError(DemandwareError):
     """Raised if an invalid parameter is detected."""
     pass
+
+class TransportError(DemandwareError):
+    """Raised if a request could not be delivered to the OCAPI host."""
+    pass
+
+class DeadlineError(TransportError):
+    """Raised if deadline expires while waiting for a pooled connection or a throttle slot."""
+    pass
+
+class ExportError(DemandwareError):
+    """Raised if a resource could not be retrieved during an export."""
+    pass
+
+class SyncError(DemandwareError):
+    """Raised if products could not be retrieved during a delta sync."""
+    pass
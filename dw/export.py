@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+
+"""
+Full catalog export, product ids are discovered by walking the category tree
+and searching every category, then products are requested in batches by a pool
+of processes and written as newline delimited JSON shards.
+
+Run:
+
+    $ dw-export settings.json /var/exports/catalog --expand images,prices --processes 8
+
+"""
+import os
+import sys
+import json
+import logging
+import multiprocessing
+from collections import deque
+
+from client import Demandware
+from codec import get_codec
+from errors import ExportError
+
+logger = logging.getLogger(__name__)
+
+# Client of a worker process, created by _init_worker
+_client = None
+
+###############################################################
+# Workers
+###############################################################
+def _init_worker(settings):
+    """
+    Create the client of a worker process.
+
+    """
+    global _client
+    pool = settings.get('pool')
+    if pool is not None:
+        # Connections opened before the fork are shared with the parent and siblings
+        pool.clear()
+    _client = Demandware(settings)
+
+
+def _search_category(args):
+    return search_category(_client, *args)
+
+
+def _export_shard(args):
+    return export_shard(_client, *args)
+
+
+def search_category(conn, category, query='', page_size=Demandware.MAX_SEARCH_COUNT):
+    """
+    Returns ids of every product found in a category.
+
+    Args:
+
+    ``conn``: ``Demandware`` object.
+
+    ``category``: String, category Id used as refinement.
+
+    ``query``: String, the query phrase to search for.
+
+    ``page_size``: Integer, hits per request, capped to ``MAX_SEARCH_COUNT``.
+
+    Raises:
+
+    ``ExportError``: If a page could not be retrieved.
+
+    """
+    page_size = max(1, min(int(page_size), Demandware.MAX_SEARCH_COUNT))
+    ids = []
+    start = 0
+    total = None
+    while total is None or start < total:
+        conn.set_get('refine_1', 'cgid=%s' % category)
+        conn.set_get('start', start)
+        conn.set_get('count', page_size)
+        search = conn.search_product(query, raw=Demandware.RAW_JSON)
+        if search is None:
+            raise ExportError('Search of category %s failed at %d' % (category, start))
+        hits = search.get('hits') or []
+        ids.extend(hit['product_id'] for hit in hits)
+        total = search.get('total', 0)
+        if not hits:
+            break
+        start += len(hits)
+    return ids
+
+
+def export_shard(conn, path, ids, expand=None, batch_size=Demandware.MAX_PRODUCT_IDS, codec=None):
+    """
+    Write products as newline delimited JSON, the file is created with another name
+    and renamed once complete, so an existing shard is always a complete one.
+
+    Args:
+
+    ``conn``: ``Demandware`` object.
+
+    ``path``: String, file name of the shard.
+
+    ``ids``: Array of Strings that represents SKU of products.
+
+    ``expand``: Array of expand values, see ``Demandware.get_product``.
+
+    ``batch_size``: Integer, SKUs per request, capped to ``MAX_PRODUCT_IDS``.
+
+    ``codec``: String, name of the codec used to encode products, see ``get_codec``.
+
+    Returns:
+
+    Tuple with the path, the number of products written and the list of SKUs that were not found.
+
+    Raises:
+
+    ``ExportError``: If a batch could not be retrieved.
+
+    """
+    batch_size = max(1, min(int(batch_size), Demandware.MAX_PRODUCT_IDS))
+    dumps = get_codec(codec).dumps
+    kwargs = {'raw': Demandware.RAW_JSON}
+    if expand:
+        kwargs['expand'] = list(expand)
+
+    found = set()
+    tmp = '%s.tmp' % path
+    with open(tmp, 'wb') as fp:
+        for i in xrange(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            products = conn.get_product(batch, **kwargs)
+            if products is None:
+                raise ExportError('Products %s could not be retrieved' % ', '.join(batch))
+            for product in products:
+                found.add(product.get('id'))
+                fp.write(dumps(product))
+                fp.write('\n')
+    os.rename(tmp, path)
+    return path, len(found), [sku for sku in ids if sku not in found]
+
+###############################################################
+# Catalog Export
+###############################################################
+class CatalogExport(object):
+    """
+    Export every product of a category tree to ``output`` directory.
+
+    The directory keeps the state of the run, ``ids.txt`` and ``manifest.json``
+    are written once discovery completes and every shard is written as
+    ``products-NNNNN.ndjson``; running again with the same directory resumes,
+    discovery and shards that already exist are skipped.
+
+    Every worker process has its own client created with settings, throttles
+    and caches are not shared between them, use ``FileTokenBucket`` to share
+    a rate limit.
+
+    Examples:
+
+    export = CatalogExport(DW_API, '/var/exports/catalog', expand=[Demandware.EXPAND_IMAGES])
+    summary = export.run()
+
+    """
+    MANIFEST = 'manifest.json'
+    IDS = 'ids.txt'
+    SHARD = 'products-%05d.ndjson'
+
+    def __init__(self, settings, output, category='root', query='', levels=2, max_depth=None,
+                 expand=None, processes=None, shard_size=1000, batch_size=Demandware.MAX_PRODUCT_IDS,
+                 page_size=Demandware.MAX_SEARCH_COUNT):
+        """
+        Args:
+
+        ``settings``: Dictionary, ``Demandware`` settings of every client.
+
+        ``output``: String, directory where shards and state are written.
+
+        ``category``: String, Id of the top category.
+
+        ``query``: String, the query phrase used to search every category.
+
+        ``levels``: Integer, levels of sub-categories per category request.
+
+        ``max_depth``: Integer, deepest level of sub-categories searched, None walks the whole tree.
+
+        ``expand``: Array of expand values, see ``Demandware.get_product``.
+
+        ``processes``: Integer, number of worker processes, by default one per CPU,
+        0 runs everything in the calling process.
+
+        ``shard_size``: Integer, products per shard, ignored when resuming.
+
+        ``batch_size``: Integer, SKUs per request, capped to ``MAX_PRODUCT_IDS``.
+
+        ``page_size``: Integer, hits per search request, capped to ``MAX_SEARCH_COUNT``.
+
+        """
+        self.settings = settings
+        self.output = output
+        self.category = category
+        self.query = query
+        self.levels = max(1, int(levels))
+        self.max_depth = max_depth
+        self.expand = expand
+        self.processes = multiprocessing.cpu_count() if processes is None else int(processes)
+        self.shard_size = max(1, int(shard_size))
+        self.batch_size = batch_size
+        self.page_size = page_size
+
+    def _path(self, name):
+        return os.path.join(self.output, name)
+
+    def _write(self, name, data):
+        """
+        Write a state file atomically.
+
+        """
+        tmp = self._path('%s.tmp' % name)
+        with open(tmp, 'wb') as fp:
+            fp.write(data)
+        os.rename(tmp, self._path(name))
+
+    def categories(self, conn):
+        """
+        Walk the category tree.
+
+        Args:
+
+        ``conn``: ``Demandware`` object.
+
+        Returns:
+
+        List of category Ids, parents first.
+
+        Raises:
+
+        ``ExportError``: If a category could not be retrieved.
+
+        """
+        ids = []
+        seen = set()
+        pending = deque([(self.category, 0)])
+        while pending:
+            category, depth = pending.popleft()
+            node = conn.search_category(category, levels=self.levels, raw=Demandware.RAW_JSON)
+            if node is None:
+                raise ExportError('Category %s could not be retrieved' % category)
+
+            nodes = [(node, depth)]
+            while nodes:
+                node, level = nodes.pop()
+                if self.max_depth is not None and level > self.max_depth:
+                    continue
+                if node['id'] not in seen:
+                    seen.add(node['id'])
+                    ids.append(node['id'])
+                children = node.get('categories')
+                if children:
+                    nodes.extend((child, level + 1) for child in reversed(children))
+                elif level == depth + self.levels:
+                    # Deepest level of this request, its sub-categories need another one
+                    pending.append((node['id'], level))
+        return ids
+
+    def discover(self, pool=None):
+        """
+        Product ids of the export, discovered the first time and read from
+        ``ids.txt`` when resuming.
+
+        Args:
+
+        ``pool``: ``multiprocessing.Pool`` used to search categories, None searches in this process.
+
+        Returns:
+
+        List of SKUs in the order they were found, without duplicates.
+
+        """
+        if os.path.exists(self._path(self.MANIFEST)):
+            with open(self._path(self.MANIFEST), 'rb') as fp:
+                self.shard_size = json.load(fp)['shard_size']
+            with open(self._path(self.IDS), 'rb') as fp:
+                return fp.read().splitlines()
+
+        conn = Demandware(self.settings)
+        categories = self.categories(conn)
+        logger.info('Searching %d categories', len(categories))
+
+        tasks = [(category, self.query, self.page_size) for category in categories]
+        if pool is None:
+            results = [search_category(conn, *task) for task in tasks]
+        else:
+            results = pool.map(_search_category, tasks)
+
+        ids = []
+        seen = set()
+        for result in results:
+            for sku in result:
+                if sku not in seen:
+                    seen.add(sku)
+                    ids.append(sku)
+
+        self._write(self.IDS, ''.join('%s\n' % sku for sku in ids))
+        self._write(self.MANIFEST, json.dumps({
+            'category': self.category,
+            'query': self.query,
+            'categories': len(categories),
+            'products': len(ids),
+            'shard_size': self.shard_size,
+        }, indent=2, sort_keys=True))
+        return ids
+
+    def run(self):
+        """
+        Discover products and write every missing shard.
+
+        Returns:
+
+        Dictionary with shards, written, products and missing keys, products and
+        missing only count shards written by this run.
+
+        Raises:
+
+        ``ExportError``: If a resource could not be retrieved, shards already
+        written are kept for the next run.
+
+        """
+        if not os.path.isdir(self.output):
+            os.makedirs(self.output)
+
+        pool = None
+        if self.processes > 0:
+            pool = multiprocessing.Pool(self.processes, _init_worker, (self.settings,))
+        try:
+            ids = self.discover(pool)
+            tasks = []
+            shards = 0
+            for shard, i in enumerate(xrange(0, len(ids), self.shard_size)):
+                shards += 1
+                path = self._path(self.SHARD % shard)
+                if not os.path.exists(path):
+                    tasks.append((path, ids[i:i + self.shard_size], self.expand, self.batch_size,
+                                  self.settings.get('codec')))
+            logger.info('Exporting %d products, %d of %d shards pending', len(ids), len(tasks), shards)
+
+            summary = {'shards': shards, 'written': 0, 'products': 0, 'missing': []}
+            if pool is None:
+                conn = Demandware(self.settings)
+                results = (export_shard(conn, *task) for task in tasks)
+            else:
+                results = pool.imap_unordered(_export_shard, tasks)
+            for path, products, missing in results:
+                logger.info('Written %s with %d products', path, products)
+                summary['written'] += 1
+                summary['products'] += products
+                summary['missing'].extend(missing)
+            return summary
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+
+def main(argv=None):
+    # Not available on Python 2.6, only the command line needs it
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export a Demandware catalog as NDJSON shards.')
+    parser.add_argument('settings', help='JSON file with Demandware settings')
+    parser.add_argument('output', help='directory of shards, an existing one is resumed')
+    parser.add_argument('--category', default='root')
+    parser.add_argument('--query', default='')
+    parser.add_argument('--levels', type=int, default=2)
+    parser.add_argument('--max-depth', type=int, default=None)
+    parser.add_argument('--expand', default='', help='comma separated expand values')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=Demandware.MAX_PRODUCT_IDS)
+    parser.add_argument('--page-size', type=int, default=Demandware.MAX_SEARCH_COUNT)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    with open(args.settings, 'rb') as fp:
+        settings = json.load(fp)
+
+    export = CatalogExport(
+        settings,
+        args.output,
+        category=args.category,
+        query=args.query,
+        levels=args.levels,
+        max_depth=args.max_depth,
+        expand=[e for e in args.expand.split(',') if e],
+        processes=args.processes,
+        shard_size=args.shard_size,
+        batch_size=args.batch_size,
+        page_size=args.page_size,
+    )
+    try:
+        summary = export.run()
+    except ExportError as e:
+        sys.stderr.write('%s, run again to resume\n' % e)
+        return 1
+    sys.stdout.write('%d products in %d shards written, %d shards total, %d not found\n' % (
+        summary['products'], summary['written'], summary['shards'], len(summary['missing'])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import sys
+import time
+import Queue
+import threading
+
+###############################################################
+# Futures
+###############################################################
+class Future(object):
+    """
+    Result of an operation that runs in background.
+
+    Examples:
+
+    future = executor.submit(conn.get_product, 'apple-ipod-classic')
+    product = future.result(timeout=5)
+
+    """
+    def __init__(self):
+        self.__done = threading.Event()
+        self.__result = None
+        self.__exc_info = None
+        self.__callbacks = []
+        self.__lock = threading.Lock()
+
+    def done(self):
+        """Returns True if the operation finished."""
+        return self.__done.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait until operation finishes.
+
+        Args:
+
+        ``timeout``: Float, seconds to wait, if None waits forever.
+
+        Returns:
+
+        Value returned by operation, if the operation raised an exception
+        then it is raised again.
+
+        Raises:
+
+        ``TimeoutError``: If operation did not finish in time.
+
+        """
+        if not self.__done.wait(timeout) and not self.__done.is_set():
+            raise TimeoutError()
+        if self.__exc_info is not None:
+            raise self.__exc_info[0], self.__exc_info[1], self.__exc_info[2]
+        return self.__result
+
+    def exception(self, timeout=None):
+        """
+        Wait until operation finishes.
+
+        Returns:
+
+        Exception raised by operation, otherwise None.
+
+        """
+        if not self.__done.wait(timeout) and not self.__done.is_set():
+            raise TimeoutError()
+        if self.__exc_info is not None:
+            return self.__exc_info[1]
+
+    def add_done_callback(self, fn):
+        """
+        Call fn with the future as argument when operation finishes.
+
+        """
+        with self.__lock:
+            if not self.__done.is_set():
+                self.__callbacks.append(fn)
+                return
+        fn(self)
+
+    def set_result(self, result):
+        """Mark operation as finished successfully."""
+        self.__result = result
+        self.__finish()
+
+    def set_exception(self, exc_info):
+        """
+        Mark operation as failed.
+
+        Args:
+
+        ``exc_info``: Tuple as returned by ``sys.exc_info()``.
+
+        """
+        self.__exc_info = exc_info
+        self.__finish()
+
+    def __finish(self):
+        with self.__lock:
+            self.__done.set()
+            callbacks, self.__callbacks = self.__callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+class TimeoutError(Exception):
+    """Raised if a future did not finish in time."""
+    pass
+
+class SingleFlight(object):
+    """
+    Suppress duplicated calls, while a call for a key is in progress other
+    callers for the same key wait and share its result.
+
+    Examples:
+
+    flight = SingleFlight()
+    result, shared = flight.do(url, fetch, url)
+
+    """
+    def __init__(self):
+        self.__calls = {}
+        self.__lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs) unless a call for key is in progress.
+
+        Returns:
+
+        Tuple with the result and a boolean that indicates if it was shared
+        from a call started by another thread.
+
+        """
+        return self.do_until(None, key, fn, *args, **kwargs)
+
+    def do_until(self, deadline, key, fn, *args, **kwargs):
+        """
+        Like ``do``, but waiting for a call started by another thread is
+        abandoned at deadline.
+
+        Args:
+
+        ``deadline``: Float, ``time.time()`` value, None waits forever.
+
+        Raises:
+
+        ``TimeoutError``: If the shared call did not finish before deadline.
+
+        """
+        with self.__lock:
+            future = self.__calls.get(key)
+            if future is None:
+                future = self.__calls[key] = Future()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            return future.result(timeout), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self.__lock:
+                del self.__calls[key]
+            future.set_exception(sys.exc_info())
+            raise
+        with self.__lock:
+            del self.__calls[key]
+        future.set_result(result)
+        return result, False
+
+###############################################################
+# Executor
+###############################################################
+class Executor(object):
+    """
+    Runs callables in a pool of worker threads.
+
+    Examples:
+
+    executor = Executor(max_workers=8)
+    futures = [executor.submit(conn.get_product, sku) for sku in skus]
+    products = gather(futures)
+
+    """
+    def __init__(self, max_workers=8):
+        """
+        Args:
+
+        ``max_workers``: Integer, number of worker threads.
+
+        """
+        self.max_workers = int(max_workers)
+
+        self.__queue = Queue.Queue()
+        self.__threads = []
+        self.__lock = threading.Lock()
+        self.__shutdown = False
+
+    def __worker(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                future.set_exception(sys.exc_info())
+            else:
+                future.set_result(result)
+            del item, future
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) to be executed.
+
+        Returns:
+
+        ``Future`` object.
+
+        """
+        with self.__lock:
+            if self.__shutdown:
+                raise RuntimeError('cannot schedule new calls after shutdown')
+            future = Future()
+            self.__queue.put((future, fn, args, kwargs))
+            if len(self.__threads) < self.max_workers:
+                thread = threading.Thread(target=self.__worker)
+                thread.daemon = True
+                thread.start()
+                self.__threads.append(thread)
+            return future
+
+    def map(self, fn, *iterables):
+        """
+        Like built-in map but calls are executed concurrently.
+
+        Returns:
+
+        List of results in the same order of iterables.
+
+        """
+        return gather([self.submit(fn, *args) for args in zip(*iterables)])
+
+    def shutdown(self, wait=True):
+        """
+        Stop worker threads once pending calls are processed.
+
+        """
+        with self.__lock:
+            self.__shutdown = True
+            threads = list(self.__threads)
+        for _ in threads:
+            self.__queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown(wait=True)
+        return False
+
+
+def gather(futures, timeout=None):
+    """
+    Wait for several futures.
+
+    Args:
+
+    ``futures``: Iterable of ``Future`` objects.
+
+    ``timeout``: Float, seconds to wait for each future.
+
+    Returns:
+
+    List of results in the same order of futures.
+
+    """
+    return [future.result(timeout) for future in futures]
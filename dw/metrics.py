@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import bisect
+import logging
+import threading
+
+###############################################################
+# Request Hooks
+###############################################################
+class LoggingHook(object):
+    """
+    Hook that writes a line per request to a logger.
+
+    Examples:
+
+    conn.add_hook(LoggingHook(logging.getLogger('ocapi')))
+
+    """
+    def __init__(self, logger=None, level=logging.INFO):
+        """
+        Args:
+
+        ``logger``: ``logging.Logger`` object, by default the logger of this module.
+
+        ``level``: Integer, logging level of messages.
+
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, event):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        timings = ' '.join('%s=%.1fms' % (k, v * 1000) for k, v in sorted(event['timings'].iteritems()))
+        self.logger.log(
+            self.level,
+            '%s %s %s cache=%s retries=%d bytes=%d %s',
+            event['method'],
+            event['resource'],
+            event['status'],
+            event['cache'],
+            event['retries'],
+            event['bytes'],
+            timings,
+        )
+
+###############################################################
+# Metrics Registry
+###############################################################
+class _Metric(object):
+    """Values of a metric per combination of label values."""
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def _format_labels(self, key, extra=()):
+        pairs = list(zip(self.labels, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{%s}' % ','.join(
+            '%s="%s"' % (k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for k, v in pairs
+        )
+
+    def render(self):
+        """Returns metric in Prometheus text exposition format."""
+        lines = [
+            '# HELP %s %s' % (self.name, self.documentation),
+            '# TYPE %s %s' % (self.name, self.kind),
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """
+    Value that only goes up.
+
+    Examples:
+
+    requests = registry.counter('dw_requests_total', 'Requests sent.', ('resource',))
+    requests.inc(resource='products')
+
+    """
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the value of labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        """Returns the value of labels."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_value(self, key, value):
+        return ['%s%s %s' % (self.name, self._format_labels(key), repr(float(value)))]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets.
+
+    Examples:
+
+    duration = registry.histogram('dw_request_seconds', 'Request duration.', ('resource',))
+    duration.observe(0.132, resource='products')
+
+    """
+    kind = 'histogram'
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+
+        ``buckets``: Sorted upper bounds of buckets, an infinite bucket is always added.
+
+        """
+        super(Histogram, self).__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record a value for labels."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            counts['buckets'][index] += 1
+            counts['sum'] += value
+
+    def get(self, **labels):
+        """
+        Returns:
+
+        Dictionary with count and sum of values observed for labels.
+
+        """
+        with self._lock:
+            counts = self._values.get(self._key(labels))
+            if counts is None:
+                return {'count': 0, 'sum': 0.0}
+            return {'count': sum(counts['buckets']), 'sum': counts['sum']}
+
+    def _render_value(self, key, counts):
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts['buckets']):
+            total += count
+            le = '+Inf' if bound == float('inf') else repr(float(bound))
+            lines.append('%s_bucket%s %d' % (self.name, self._format_labels(key, [('le', le)]), total))
+        lines.append('%s_sum%s %s' % (self.name, self._format_labels(key), repr(counts['sum'])))
+        lines.append('%s_count%s %d' % (self.name, self._format_labels(key), total))
+        return lines
+
+
+class Registry(object):
+    """
+    Collection of metrics rendered together.
+
+    Examples:
+
+    registry = Registry()
+    conn.add_hook(MetricsHook(registry))
+    print registry.render()
+
+    """
+    def __init__(self):
+        self.__metrics = {}
+        self.__lock = threading.Lock()
+
+    def __get(self, cls, name, *args, **kwargs):
+        with self.__lock:
+            metric = self.__metrics.get(name)
+            if metric is None:
+                metric = self.__metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError('%s is already registered as %s' % (name, metric.kind))
+            return metric
+
+    def counter(self, name, documentation, labels=()):
+        """Returns ``Counter`` registered as name, created the first time."""
+        return self.__get(Counter, name, documentation, labels)
+
+    def histogram(self, name, documentation, labels=(), buckets=Histogram.DEFAULT_BUCKETS):
+        """Returns ``Histogram`` registered as name, created the first time."""
+        return self.__get(Histogram, name, documentation, labels, buckets)
+
+    def render(self):
+        """Returns all metrics in Prometheus text exposition format."""
+        with self.__lock:
+            metrics = sorted(self.__metrics.items())
+        return ''.join('%s\n' % metric.render() for _, metric in metrics)
+
+
+class MetricsHook(object):
+    """
+    Hook that records requests in a ``Registry``.
+
+    Metrics:
+
+    ``dw_requests_total``: Counter of requests by resource and status.
+
+    ``dw_cache_total``: Counter of cache lookups by resource and result, hit or miss.
+
+    ``dw_retries_total``: Counter of retries by resource.
+
+    ``dw_response_bytes_total``: Counter of bytes received by resource.
+
+    ``dw_request_duration_seconds``: Histogram of durations by resource and phase.
+
+    """
+    def __init__(self, registry=None):
+        """
+        Args:
+
+        ``registry``: ``Registry`` object, by default a new one.
+
+        """
+        self.registry = registry if registry is not None else Registry()
+        self.requests = self.registry.counter(
+            'dw_requests_total', 'OCAPI requests.', ('resource', 'status'))
+        self.cache = self.registry.counter(
+            'dw_cache_total', 'OCAPI response cache lookups.', ('resource', 'result'))
+        self.retries = self.registry.counter(
+            'dw_retries_total', 'OCAPI requests sent again.', ('resource',))
+        self.bytes = self.registry.counter(
+            'dw_response_bytes_total', 'OCAPI response bytes received.', ('resource',))
+        self.duration = self.registry.histogram(
+            'dw_request_duration_seconds', 'OCAPI request duration per phase.', ('resource', 'phase'))
+
+    def __call__(self, event):
+        resource = event['resource']
+        self.requests.inc(resource=resource, status=event['status'] or 'error')
+        if event['cache'] is not None:
+            self.cache.inc(resource=resource, result=event['cache'])
+        if event['retries']:
+            self.retries.inc(event['retries'], resource=resource)
+        if event['bytes']:
+            self.bytes.inc(event['bytes'], resource=resource)
+        for phase, seconds in event['timings'].iteritems():
+            self.duration.observe(seconds, resource=resource, phase=phase)
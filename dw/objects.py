@@ -24,7 +24,15 @@
 # Generic Object
 ###############################################################
 class Object(object):
-    """Class to represent OCAPI resources."""
+    """
+    Class to represent OCAPI resources.
+
+    Wraps decoded JSON without copying it, nested dictionaries and lists are
+    wrapped only when their attribute is accessed.
+
+    """
+    __slots__ = ('_data', '_children', '_owned')
+
     def __init__(self, params=dict()):
         """
         Convert dictionary to generic object, also can receives
@@ -55,24 +63,224 @@ class Object(object):
         ``params``: Iterable to be mapped.
 
         """
+        owned = False
         if isinstance(params, (list, tuple)):
             # Creates a dictionary named with values staring from 0...N
             # e.g my_object.['0']
-            params = dict(enumerate(params))
+            params = dict((str(key), value) for key, value in enumerate(params))
+            owned = True
+        elif not isinstance(params, dict):
+            params = {}
+            owned = True
+        elif not all(isinstance(key, basestring) for key in params):
+            params = dict((str(key), value) for key, value in params.iteritems())
+            owned = True
+
+        object.__setattr__(self, '_data', params)
+        object.__setattr__(self, '_children', None)
+        object.__setattr__(self, '_owned', owned)
+
+    def __getattr__(self, name):
+        """
+        Returns value for attribute requested, dictionaries are returned as Object
+        and lists as Array.
+
+        """
+        try:
+            value = self._data[name]
+        except KeyError:
+            raise AttributeError(name)
+        if isinstance(value, (dict, list)):
+            children = self._children
+            if children is None:
+                children = {}
+                object.__setattr__(self, '_children', children)
+            child = children.get(name)
+            if child is None:
+                child = children[name] = wrap(value)
+            return child
+        return value
+
+    def __setattr__(self, name, value):
+        """
+        Set attribute, wrapped data is copied before first change.
+
+        """
+        self.__own()
+        self._data[str(name)] = value
+        if self._children is not None:
+            self._children.pop(name, None)
+
+    def __delattr__(self, name):
+        """
+        Remove attribute.
+
+        """
+        self.__own()
+        try:
+            del self._data[name]
+        except KeyError:
+            raise AttributeError(name)
+        if self._children is not None:
+            self._children.pop(name, None)
 
-        if isinstance(params, dict):
-            # If a dictionary if found set key as attribute
-            for key, value in params.iteritems():
-                key = str(key)
-                if isinstance(value, dict):
-                    setattr(self, key, Object(value))
-                else:
-                    setattr(self, key, value)
+    def __own(self):
+        if not self._owned:
+            object.__setattr__(self, '_data', dict(self._data))
+            object.__setattr__(self, '_owned', True)
 
     def __getitem__(self, value):
         """
         Returns value for attribute requested, if attribute
-        requested does not exits then None value is returned.
+        requested does not exits then KeyError is raised.
+
+        """
+        try:
+            return self.__getattr__(value)
+        except AttributeError:
+            raise KeyError(value)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def has_key(self, key):
+        """
+        Returns True if attribute exists.
+
+        """
+        return key in self._data
+
+    @property
+    def __dict__(self):
+        """
+        Attributes as dictionary.
+
+        """
+        return dict((key, getattr(self, key)) for key in self._data)
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(str(key) for key in self._data))
+
+    def __getstate__(self):
+        state = dict(self._data)
+        for key, child in (self._children or {}).iteritems():
+            state[key] = child.__getstate__()
+        return state
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_data', state)
+        object.__setattr__(self, '_children', None)
+        object.__setattr__(self, '_owned', True)
+
+    def __repr__(self):
+        return '<Object %r>' % (self._data,)
+
+###############################################################
+# Generic Array
+###############################################################
+class Array(object):
+    """
+    Class to represent lists of OCAPI resources.
+
+    Wraps a decoded JSON list without copying it, supports len, iteration
+    and indexing, items are wrapped only once when they are accessed.
+
+    Examples:
+
+    hits = Array([{'product_id': 'foo'}])
+
+    hits[0].product_id
+
+    [hit.product_id for hit in hits]
+
+    """
+    __slots__ = ('_data', '_children')
+
+    def __init__(self, items=()):
+        """
+        Args:
+
+        ``items``: List or tuple to be mapped.
 
         """
-        return self.__dict__[value]
+        object.__setattr__(self, '_data', items)
+        object.__setattr__(self, '_children', None)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __item(self, index):
+        value = self._data[index]
+        if not isinstance(value, (dict, list)):
+            return value
+        children = self._children
+        if children is None:
+            children = [None] * len(self._data)
+            object.__setattr__(self, '_children', children)
+        child = children[index]
+        if child is None:
+            child = children[index] = wrap(value)
+        return child
+
+    def __getitem__(self, index):
+        """
+        Returns item at index, dictionaries are returned as Object and lists as Array.
+
+        """
+        if isinstance(index, slice):
+            return [self.__item(i) for i in xrange(*index.indices(len(self._data)))]
+        if index < 0:
+            index += len(self._data)
+        if not 0 <= index < len(self._data):
+            raise IndexError('list index out of range')
+        return self.__item(index)
+
+    def __iter__(self):
+        for index in xrange(len(self._data)):
+            yield self.__item(index)
+
+    def __eq__(self, other):
+        if isinstance(other, Array):
+            other = other.__getstate__()
+        return isinstance(other, (list, tuple)) and list(self.__getstate__()) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __getstate__(self):
+        state = list(self._data)
+        for index, child in enumerate(self._children or ()):
+            if child is not None:
+                state[index] = child.__getstate__()
+        return state
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_data', state)
+        object.__setattr__(self, '_children', None)
+
+    def __repr__(self):
+        return '<Array %r>' % (self._data,)
+
+
+def wrap(value):
+    """
+    Returns value wrapped as Object if it is a dictionary, as Array if it is a list.
+
+    """
+    if isinstance(value, dict):
+        return Object(value)
+    if isinstance(value, list):
+        return Array(value)
+    return value
+
+
+def clone(value):
+    """
+    Returns a copy of decoded JSON, dictionaries and lists are copied at every level.
+
+    """
+    if isinstance(value, dict):
+        return dict((key, clone(item)) for key, item in value.iteritems())
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    return value
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import re
+import json
+
+###############################################################
+# Streaming JSON
+###############################################################
+# Characters that change parser state outside strings
+_SPECIAL = re.compile(r'["{}\[\],:]')
+
+# Characters that change parser state inside strings
+_STRING = re.compile(r'["\\]')
+
+
+def iter_array(fp, key, loads=json.loads, chunk_size=65536):
+    """
+    Parse the array stored at key of a top-level JSON object while it is read,
+    every item is decoded and yielded as soon as it is complete.
+
+    Examples:
+
+    for hit in iter_array(response, 'hits'):
+        print hit['product_id']
+
+    Args:
+
+    ``fp``: File like object with ``read`` method, closed when iteration stops early.
+
+    ``key``: String, name of the array in the top-level object.
+
+    ``loads``: Function used to decode each item, if None the JSON text of the item is yielded.
+
+    ``chunk_size``: Integer, bytes read at once.
+
+    Returns:
+
+    Generator of items.
+
+    Raises:
+
+    ``ValueError``: If the document is malformed.
+
+    """
+    buf = ''
+    pos = 0
+    eof = False
+    depth = 0
+    last_string = None
+    in_target = False
+    item_start = None
+
+    finished = False
+    try:
+        while True:
+            match = _SPECIAL.search(buf, pos)
+            if match is None:
+                if eof:
+                    break
+                # Keep only text of the item being parsed
+                keep = item_start if item_start is not None else len(buf)
+                buf = buf[keep:]
+                if item_start is not None:
+                    item_start = 0
+                pos = len(buf)
+                data = fp.read(chunk_size)
+                eof = not data
+                buf += data
+                continue
+
+            pos = match.start()
+            char = buf[pos]
+            if char == '"':
+                # Find closing quote, strings may be split between chunks
+                start = pos
+                pos += 1
+                while True:
+                    end = _STRING.search(buf, pos)
+                    if end is None or (buf[end.start()] == '\\' and end.start() + 1 >= len(buf)):
+                        if eof:
+                            raise ValueError('Unterminated string')
+                        data = fp.read(chunk_size)
+                        eof = not data
+                        buf += data
+                        continue
+                    if buf[end.start()] == '\\':
+                        pos = end.start() + 2
+                        continue
+                    pos = end.start() + 1
+                    break
+                if depth == 1:
+                    last_string = buf[start:pos]
+                continue
+
+            if char in '{[':
+                depth += 1
+                if char == '[' and depth == 2 and not in_target and last_string is not None \
+                        and json.loads(last_string) == key:
+                    in_target = True
+                    item_start = pos + 1
+            elif char in '}]':
+                if in_target and depth == 2:
+                    text = buf[item_start:pos].strip()
+                    if text:
+                        yield loads(text) if loads is not None else text
+                    finished = True
+                    return
+                depth -= 1
+            elif char == ',':
+                if in_target and depth == 2:
+                    text = buf[item_start:pos].strip()
+                    if not text:
+                        raise ValueError('Expecting array item')
+                    yield loads(text) if loads is not None else text
+                    item_start = pos + 1
+                elif depth == 1:
+                    last_string = None
+            pos += 1
+        finished = True
+    finally:
+        if finished:
+            # Read until EOF so the connection can be reused
+            while fp.read(chunk_size):
+                pass
+        elif hasattr(fp, 'close'):
+            fp.close()
+
+
+class ArrayStream(object):
+    """
+    Iterator over the items of an array parsed by ``iter_array`` that owns the
+    file it reads, the file is closed when the iterator is closed or collected
+    before the end, even if iteration never started.
+
+    A generator can not do it alone, its ``finally`` clause does not run
+    if it is collected before the first item is requested.
+
+    Examples:
+
+    hits = ArrayStream(response, 'hits')
+    first = next(hits)
+    hits.close()
+
+    """
+    def __init__(self, fp, key, loads=json.loads, chunk_size=65536):
+        """
+        Args:
+
+        See ``iter_array``.
+
+        """
+        self.__fp = fp
+        self.__items = iter_array(fp, key, loads, chunk_size)
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        items = self.__items
+        if items is None:
+            raise StopIteration
+        try:
+            return next(items)
+        except BaseException:
+            # Either the end or a parse error, the file was released by iter_array
+            self.__items = None
+            raise
+
+    def close(self):
+        """
+        Stop iteration and release the file.
+
+        """
+        items, self.__items = getattr(self, '_ArrayStream__items', None), None
+        if items is not None:
+            items.close()
+            if hasattr(self.__fp, 'close'):
+                self.__fp.close()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+
+import time
+import json
+import urllib
+import hashlib
+import sqlite3
+
+from cache import Cache
+from client import Demandware
+from errors import SyncError
+from futures import Executor
+
+# Body of a product that was not modified since the last sync, raw results
+# are copies so it is recognized by its type
+NOT_MODIFIED = {'_type': 'not_modified'}
+
+###############################################################
+# Sync Index
+###############################################################
+class SyncIndex(object):
+    """
+    On disk index of synced products, keeps the content hash, ETag and
+    last fetched time of every SKU in a sqlite database.
+
+    A SyncIndex must be used only from the thread that created it.
+
+    Examples:
+
+    with SyncIndex('/var/lib/catalog/index.db') as index:
+        print len(index), index.get(['apple-ipod-classic'])
+
+    """
+    # sqlite limit of host parameters in a statement is 999
+    CHUNK_SIZE = 500
+
+    def __init__(self, path):
+        """
+        Args:
+
+        ``path``: String, database file, created if it does not exist.
+
+        """
+        self.path = path
+        self.__db = sqlite3.connect(path)
+        with self.__db:
+            self.__db.execute(
+                'CREATE TABLE IF NOT EXISTS products ('
+                'sku TEXT PRIMARY KEY, hash TEXT, etag TEXT, fetched REAL)'
+            )
+
+    def __len__(self):
+        return self.__db.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+
+    def __chunks(self, skus):
+        skus = list(skus)
+        for i in xrange(0, len(skus), self.CHUNK_SIZE):
+            yield skus[i:i + self.CHUNK_SIZE]
+
+    def skus(self):
+        """
+        Returns list of every SKU in the index.
+
+        """
+        return [row[0] for row in self.__db.execute('SELECT sku FROM products ORDER BY sku')]
+
+    def get(self, skus):
+        """
+        Returns dictionary with a tuple of hash, etag and fetched time per SKU,
+        SKUs that are not in the index are missing.
+
+        """
+        rows = {}
+        for chunk in self.__chunks(skus):
+            rows.update((row[0], row[1:]) for row in self.__db.execute(
+                'SELECT sku, hash, etag, fetched FROM products WHERE sku IN (%s)' % ','.join('?' * len(chunk)),
+                chunk,
+            ))
+        return rows
+
+    def update(self, rows):
+        """
+        Insert or replace rows of sku, hash, etag and fetched time.
+
+        """
+        with self.__db:
+            self.__db.executemany('INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)', rows)
+
+    def delete(self, skus):
+        """
+        Remove SKUs from the index.
+
+        """
+        with self.__db:
+            for chunk in self.__chunks(skus):
+                self.__db.execute(
+                    'DELETE FROM products WHERE sku IN (%s)' % ','.join('?' * len(chunk)),
+                    chunk,
+                )
+
+    def close(self):
+        self.__db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _Validators(Cache):
+    """
+    ``revalidate`` backend of the sync client, it sends the ETag of the index
+    and returns ``NOT_MODIFIED`` when the server answers 304.
+
+    """
+    def __init__(self, etags):
+        self.etags = etags
+        self.received = {}
+
+    def _sku(self, key):
+        """
+        Returns SKU of a products/(sku,) request, None if it requests several SKUs.
+
+        """
+        path = key.split('\n', 1)[0].split('?', 1)[0]
+        ids = [i for i in path.rsplit('/', 1)[-1].strip('()').split(',') if i]
+        if len(ids) == 1:
+            return urllib.unquote_plus(ids[0])
+
+    def get(self, key):
+        etag = self.etags.get(self._sku(key))
+        if etag is None:
+            return None
+        return {'etag': etag, 'last_modified': None, 'headers': {}, 'body': NOT_MODIFIED}
+
+    def set(self, key, value, ttl=None):
+        sku = self._sku(key)
+        if sku is not None:
+            self.received[sku] = value['etag']
+
+    def delete(self, key):
+        self.etags.pop(self._sku(key), None)
+
+    def clear(self):
+        self.etags.clear()
+
+###############################################################
+# Delta Sync
+###############################################################
+class DeltaSync(object):
+    """
+    Fetch products that were not fetched within ``max_age`` and emit only
+    the ones that are new, changed or removed since the last sync.
+
+    Products are compared by a hash of their content. With ``conditional``,
+    every SKU is requested alone with the ETag of the index, so unchanged
+    products are answered with 304 and not downloaded, otherwise SKUs are
+    requested in batches of ``MAX_PRODUCT_IDS``.
+
+    The index is updated once the changes of a group of products were
+    consumed, a sync that is interrupted emits them again in the next run.
+
+    Examples:
+
+    with SyncIndex('/var/lib/catalog/index.db') as index:
+        sync = DeltaSync(DW_API, index, max_age=3600)
+        for sku, product in sync.run(skus):
+            if product is None:
+                remove(sku)
+            else:
+                save(product)
+
+    """
+    def __init__(self, settings, index, max_age=0, expand=None, conditional=False,
+                 batch_size=Demandware.MAX_PRODUCT_IDS, max_workers=4, group_size=1000):
+        """
+        Args:
+
+        ``settings``: Dictionary, ``Demandware`` settings, responses are never taken from cache.
+
+        ``index``: ``SyncIndex`` object.
+
+        ``max_age``: Float, seconds since the last fetch after which a product is fetched again,
+        0 fetches every product.
+
+        ``expand``: Array of expand values, see ``Demandware.get_product``.
+
+        ``conditional``: Boolean, if True SKUs are requested alone with If-None-Match.
+
+        ``batch_size``: Integer, SKUs per request, capped to ``MAX_PRODUCT_IDS``.
+
+        ``max_workers``: Integer, number of requests in flight.
+
+        ``group_size``: Integer, SKUs fetched before their changes are emitted and saved.
+
+        """
+        self.settings = dict(settings, cache=None, batch_window=None)
+        self.index = index
+        self.max_age = max_age
+        self.expand = expand
+        self.conditional = conditional
+        self.batch_size = 1 if conditional else max(1, min(int(batch_size), Demandware.MAX_PRODUCT_IDS))
+        self.max_workers = max(1, int(max_workers))
+        self.group_size = max(1, int(group_size))
+
+        self.__etags = {}
+        self.__validators = None
+        if conditional:
+            self.__validators = _Validators(self.__etags)
+            # Stale copies served while a circuit is open would be taken as not modified
+            self.settings.update(revalidate=self.__validators, circuit_breaker=None)
+        self.__conn = None
+
+    @staticmethod
+    def digest(product):
+        """
+        Returns hash of the content of a product.
+
+        """
+        return hashlib.sha1(json.dumps(product, sort_keys=True, separators=(',', ':'))).hexdigest()
+
+    def _client(self):
+        if self.__conn is None:
+            self.__conn = Demandware(self.settings)
+        return self.__conn
+
+    def _fetch(self, batch):
+        """
+        Returns dictionary with the product of every SKU of batch that was found.
+
+        Raises:
+
+        ``SyncError``: If the batch could not be retrieved.
+
+        """
+        kwargs = {'raw': Demandware.RAW_JSON}
+        if self.expand:
+            kwargs['expand'] = list(self.expand)
+        # Always a list of SKUs, a missing product is not an error then
+        products = self._client().get_product(list(batch), **kwargs)
+        if products is None:
+            raise SyncError('Products %s could not be retrieved' % ', '.join(batch))
+        if products == NOT_MODIFIED:
+            return {batch[0]: NOT_MODIFIED}
+        return dict((product.get('id'), product) for product in products)
+
+    def stale(self, skus, now=None):
+        """
+        Returns SKUs that were never fetched or were fetched before ``max_age``.
+
+        """
+        now = time.time() if now is None else now
+        rows = self.index.get(skus)
+        return [sku for sku in skus if sku not in rows or now - rows[sku][2] >= self.max_age]
+
+    def run(self, skus=None):
+        """
+        Sync products.
+
+        Args:
+
+        ``skus``: Array of Strings that represents SKU of products, by default
+        the ones of the index.
+
+        Returns:
+
+        Generator of tuples with SKU and product as dictionary, product is None
+        if a SKU of the index is not found anymore.
+
+        Raises:
+
+        ``SyncError``: If products could not be retrieved.
+
+        """
+        if skus is None:
+            skus = self.index.skus()
+        skus = self.stale(list(skus))
+        with Executor(max_workers=self.max_workers) as executor:
+            for i in xrange(0, len(skus), self.group_size):
+                group = skus[i:i + self.group_size]
+                for change in self._sync(executor, group):
+                    yield change
+
+    def _sync(self, executor, group):
+        rows = self.index.get(group)
+        self.__etags.clear()
+        self.__etags.update((sku, row[1]) for sku, row in rows.iteritems() if row[1] is not None)
+        if self.__validators is not None:
+            self.__validators.received.clear()
+
+        batches = [group[i:i + self.batch_size] for i in xrange(0, len(group), self.batch_size)]
+        fetched = time.time()
+        found = {}
+        for products in executor.map(self._fetch, batches):
+            found.update(products)
+
+        received = self.__validators.received if self.__validators is not None else {}
+        updates = []
+        removed = []
+        for sku in group:
+            row = rows.get(sku)
+            product = found.get(sku)
+            if product is None:
+                if row is not None:
+                    removed.append(sku)
+                    yield sku, None
+                continue
+            if product is NOT_MODIFIED:
+                updates.append((sku, row[0], row[1], fetched))
+                continue
+            digest = self.digest(product)
+            if row is None or row[0] != digest:
+                yield sku, product
+            # ETag of a previous conditional run is kept if none was received
+            etag = received.get(sku)
+            if etag is None and row is not None:
+                etag = row[1]
+            updates.append((sku, digest, etag, fetched))
+
+        self.index.update(updates)
+        self.index.delete(removed)
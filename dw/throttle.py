@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import os
+import math
+import time
+import warnings
+import threading
+
+from errors import DeadlineError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+###############################################################
+# Token Buckets
+###############################################################
+class TokenBucket(object):
+    """
+    Thread safe token bucket, tokens are refilled at ``rate`` per second
+    up to ``burst``.
+
+    Examples:
+
+    bucket = TokenBucket(rate=40, burst=10)
+    bucket.acquire()
+
+    """
+    def __init__(self, rate, burst=None):
+        """
+        Args:
+
+        ``rate``: Float, tokens added per second.
+
+        ``burst``: Integer, maximum number of tokens, by default ``rate`` rounded up.
+
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, math.ceil(self.rate)))
+
+        self.__tokens = self.burst
+        self.__updated = time.time()
+        self.__lock = threading.Lock()
+
+    def _take(self, tokens):
+        """
+        Take tokens if available.
+
+        Returns:
+
+        Float, 0 if tokens were taken otherwise seconds until they are available.
+
+        """
+        with self.__lock:
+            now = time.time()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            if self.__tokens >= tokens:
+                self.__tokens -= tokens
+                return 0.0
+            return (tokens - self.__tokens) / self.rate
+
+    def acquire(self, tokens=1, deadline=None):
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+
+        ``deadline``: Float, ``time.time()`` value after which waiting is abandoned.
+
+        Returns:
+
+        Float, seconds spent waiting.
+
+        Raises:
+
+        ``DeadlineError``: If tokens would not be available before deadline.
+
+        """
+        start = None
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return time.time() - start if start is not None else 0.0
+            now = time.time()
+            if deadline is not None and now + wait >= deadline:
+                raise DeadlineError('Deadline exceeded')
+            if start is None:
+                start = now
+            time.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket shared between processes through a locked state file,
+    available where ``fcntl`` is supported.
+
+    Examples:
+
+    bucket = FileTokenBucket('/tmp/dw-%s.bucket' % client_id, rate=40)
+    conn = Demandware(dict(DW_API, throttle=Throttle(bucket=bucket)))
+
+    """
+    def __init__(self, path, rate, burst=None):
+        """
+        Args:
+
+        ``path``: String, file where state is stored, created if it does not exist.
+
+        """
+        if fcntl is None:
+            raise NotImplementedError('FileTokenBucket requires fcntl')
+        super(FileTokenBucket, self).__init__(rate, burst)
+        self.path = path
+
+    def _take(self, tokens):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            try:
+                available, updated = map(float, os.read(fd, 64).split())
+            except ValueError:
+                available, updated = self.burst, now
+            available = min(self.burst, available + max(0.0, now - updated) * self.rate)
+            wait = 0.0
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, '%.6f %.6f' % (available, now))
+            return wait
+        finally:
+            os.close(fd)
+
+###############################################################
+# Throttle
+###############################################################
+class Throttle(object):
+    """
+    Rate limit and maximum number of requests in flight, shared between
+    threads, waiting time is recorded to be reported by ``stats``.
+
+    Examples:
+
+    throttle = Throttle(rate=40, max_in_flight=8)
+    with throttle:
+        response = pool.urlopen('GET', url)
+
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None, bucket=None):
+        """
+        Args:
+
+        ``rate``: Float, maximum requests per second, None for no limit.
+
+        ``burst``: Integer, requests that can be sent at once after an idle period.
+
+        ``max_in_flight``: Integer, maximum concurrent requests, None for no limit.
+
+        ``bucket``: ``TokenBucket`` object used instead of rate and burst, e.g.
+        a ``FileTokenBucket`` shared between processes.
+
+        """
+        self.bucket = bucket
+        if bucket is None and rate:
+            self.bucket = TokenBucket(rate, burst)
+        self.max_in_flight = max_in_flight
+
+        self.__lock = threading.Lock()
+        self.__slots = threading.Condition(self.__lock)
+        self.__stats = {
+            'requests': 0,
+            'in_flight': 0,
+            'wait_time': 0.0,
+            'max_wait': 0.0,
+        }
+
+    def acquire(self, deadline=None):
+        """
+        Wait for a free slot and a token.
+
+        Args:
+
+        ``deadline``: Float, ``time.time()`` value after which waiting is abandoned.
+
+        Returns:
+
+        Float, seconds spent waiting.
+
+        Raises:
+
+        ``DeadlineError``: If no slot or token is available before deadline.
+
+        """
+        start = time.time()
+        stats = self.__stats
+        with self.__slots:
+            while self.max_in_flight and stats['in_flight'] >= self.max_in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineError('Deadline exceeded')
+                self.__slots.wait(remaining)
+            stats['in_flight'] += 1
+        try:
+            if self.bucket is not None:
+                self.bucket.acquire(deadline=deadline)
+        except BaseException:
+            self.release()
+            raise
+        wait = time.time() - start
+
+        with self.__lock:
+            stats['requests'] += 1
+            stats['wait_time'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+        return wait
+
+    def release(self):
+        """Give back the slot taken by ``acquire``."""
+        with self.__slots:
+            self.__stats['in_flight'] -= 1
+            self.__slots.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def stats(self):
+        """
+        Returns:
+
+        Dictionary with requests, in_flight, wait_time and max_wait keys, times in seconds.
+
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+def get_throttle(key, rate=None, burst=None, max_in_flight=None):
+    """
+    Throttle shared by every caller that uses the same key, created with
+    the given limits the first time it is requested. Later callers get the
+    same throttle, a ``RuntimeWarning`` is issued if they ask for other limits.
+
+    Args:
+
+    ``key``: Hashable value, e.g. a tuple with client_id and hostname.
+
+    Returns:
+
+    ``Throttle`` object.
+
+    """
+    limits = (rate, burst, max_in_flight)
+    with _throttles_lock:
+        item = _throttles.get(key)
+        if item is None:
+            item = _throttles[key] = (Throttle(rate, burst, max_in_flight), limits)
+    throttle, created = item
+    if created != limits:
+        warnings.warn(
+            'Throttle %r exists with rate=%s, burst=%s, max_in_flight=%s, '
+            'rate=%s, burst=%s, max_in_flight=%s are ignored' % ((key,) + created + limits),
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    return throttle
@@ -0,0 +1,800 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Python Demandware SDK provides access to the OCAPI services.
+# Copyright (C) 2013  Moises Brenes
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Authors:
+#   Moises Brenes <mbrenes@weareconflict.com>
+
+
+import zlib
+import time
+import errno
+import random
+import socket
+import ssl
+import base64
+import httplib
+import urllib
+import urlparse
+import threading
+from collections import deque
+from email.utils import parsedate_tz, mktime_tz
+
+from errors import DeadlineError, TransportError
+
+###############################################################
+# Content Decoding
+###############################################################
+class _Decoder(object):
+    """
+    Incremental decompression of gzip and deflate bodies.
+
+    Deflate bodies may be sent with or without zlib header, the first
+    chunk decides which format is used.
+
+    """
+    def __init__(self, encoding):
+        self.__first = encoding == 'deflate'
+        self.__data = ''
+        wbits = zlib.MAX_WBITS if encoding == 'deflate' else 16 + zlib.MAX_WBITS
+        self.__obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data):
+        if not self.__first:
+            return self.__obj.decompress(data)
+
+        self.__data += data
+        try:
+            decompressed = self.__obj.decompress(data)
+            if decompressed:
+                self.__first = False
+                self.__data = ''
+            return decompressed
+        except zlib.error:
+            # Raw deflate stream, without zlib header
+            self.__first = False
+            self.__obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            data, self.__data = self.__data, ''
+            return self.__obj.decompress(data)
+
+    def flush(self):
+        return self.__obj.flush()
+
+###############################################################
+# Retry Policy
+###############################################################
+class Retry(object):
+    """
+    Policy to retry requests that failed with a transient error.
+
+    The wait before each attempt grows exponentially with full jitter,
+    ``Retry-After`` header is honored on 429 and 503 responses.
+
+    Examples:
+
+    pool = ConnectionPool(retries=Retry(total=5, backoff_factor=0.2))
+
+    """
+    IDEMPOTENT_METHODS = frozenset((
+        'DELETE',
+        'GET',
+        'HEAD',
+        'OPTIONS',
+        'PUT',
+    ))
+
+    RETRY_STATUS = frozenset((
+        429,
+        httplib.BAD_GATEWAY,
+        httplib.SERVICE_UNAVAILABLE,
+        httplib.GATEWAY_TIMEOUT,
+    ))
+
+    RETRY_AFTER_STATUS = frozenset((
+        429,
+        httplib.SERVICE_UNAVAILABLE,
+    ))
+
+    def __init__(self, total=3, backoff_factor=0.1, backoff_max=10.0, retry_after_max=30.0,
+                 methods=IDEMPOTENT_METHODS, status=RETRY_STATUS):
+        """
+        Args:
+
+        ``total``: Integer, maximum number of retries, the request is sent at most total + 1 times.
+
+        ``backoff_factor``: Float, seconds of the first wait, it doubles on every retry.
+
+        ``backoff_max``: Float, maximum seconds to wait between attempts.
+
+        ``retry_after_max``: Float, a ``Retry-After`` longer than this is not waited,
+        the response is returned instead.
+
+        ``methods``: Set of HTTP methods that are retried.
+
+        ``status``: Set of HTTP status codes that are retried.
+
+        """
+        self.total = int(total)
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.methods = frozenset(methods)
+        self.status = frozenset(status)
+
+    def is_retry(self, method, attempt, status=None):
+        """
+        Returns True if a request should be sent again.
+
+        Args:
+
+        ``method``: String, HTTP method.
+
+        ``attempt``: Integer, number of retries already done.
+
+        ``status``: Integer, HTTP status of the response, None if the request failed.
+
+        """
+        if attempt >= self.total or method.upper() not in self.methods:
+            return False
+        return status is None or status in self.status
+
+    def get_backoff(self, attempt):
+        """Returns seconds to wait before the retry number ``attempt`` + 1."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def get_retry_after(self, value):
+        """
+        Parse ``Retry-After`` header, delay in seconds or HTTP date.
+
+        Returns:
+
+        Float, seconds to wait, None if value is missing or invalid.
+
+        """
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0.0, mktime_tz(date) - time.time())
+
+    def get_wait(self, attempt, response=None):
+        """
+        Seconds to wait before sending again a request.
+
+        Returns:
+
+        Float, None if ``Retry-After`` is longer than ``retry_after_max``.
+
+        """
+        if response is not None and response.status in self.RETRY_AFTER_STATUS:
+            retry_after = self.get_retry_after(response.getheader('retry-after'))
+            if retry_after is not None:
+                if retry_after > self.retry_after_max:
+                    return None
+                return retry_after
+        return self.get_backoff(attempt)
+
+    @classmethod
+    def from_value(cls, retries):
+        """
+        Build a policy from a setting.
+
+        Args:
+
+        ``retries``: ``Retry`` object, Integer with the number of retries,
+        None, False or 0 to disable retries.
+
+        """
+        if isinstance(retries, cls) or not retries:
+            return retries or None
+        return cls(total=retries)
+
+###############################################################
+# Keep-alive Connection Pool
+###############################################################
+class PooledResponse(object):
+    """
+    Response read from a pooled connection.
+
+    Exposes the same interface as the object returned by ``urllib2.urlopen``
+    (``getcode``, ``geturl``, ``info`` and ``read``). The connection is given
+    back to the pool as soon as the body has been read completely.
+
+    Bodies sent with gzip or deflate Content-Encoding are decompressed while
+    they are read.
+
+    """
+    def __init__(self, pool, key, conn, response, url, decode_content=True):
+        self.__pool = pool
+        self.__key = key
+        self.__conn = conn
+        self.__response = response
+        self.__url = url
+
+        self.status = response.status
+        self.reason = response.reason
+        self.bytes_read = 0
+
+        self.__decoder = None
+        encoding = (response.getheader('content-encoding') or '').strip().lower()
+        if decode_content and encoding in ('gzip', 'x-gzip', 'deflate'):
+            self.__decoder = _Decoder('deflate' if encoding == 'deflate' else 'gzip')
+
+    def getcode(self):
+        """Returns HTTP status code."""
+        return self.status
+
+    def geturl(self):
+        """Returns requested URL."""
+        return self.__url
+
+    def info(self):
+        """Returns response headers."""
+        return self.__response.msg
+
+    def getheader(self, name, default=None):
+        """Returns value for a response header."""
+        return self.__response.getheader(name, default)
+
+    def read(self, amt=None):
+        """
+        Read response body.
+
+        Args:
+
+        ``amt``: Integer, maximum number of bytes to be read from the connection,
+        if None reads until EOF.
+
+        Returns:
+
+        String, an empty string means EOF.
+
+        Raises:
+
+        ``TransportError``: If the connection failed while reading or the body
+        could not be decompressed.
+
+        """
+        decoder = self.__decoder
+        if decoder is None:
+            return self._read_raw(amt)
+        try:
+            if amt is None:
+                return decoder.decompress(self._read_raw()) + self.__flush()
+            while True:
+                data = self._read_raw(amt)
+                if not data:
+                    return self.__flush()
+                data = decoder.decompress(data)
+                if data:
+                    return data
+        except zlib.error as e:
+            self.close()
+            raise TransportError('Invalid compressed body: %s' % e)
+
+    def __flush(self):
+        decoder, self.__decoder = self.__decoder, None
+        return decoder.flush() if decoder is not None else ''
+
+    def _read_raw(self, amt=None):
+        """
+        Read response body as sent by the server.
+
+        """
+        if self.__conn is None:
+            return ''
+        try:
+            data = self.__response.read(amt)
+        except (socket.error, httplib.HTTPException) as e:
+            self.__release(reuse=False)
+            raise TransportError(str(e) or e.__class__.__name__)
+        self.bytes_read += len(data)
+        if amt is None or not data or self.__response.isclosed():
+            self.__release(reuse=not self.__response.will_close)
+        return data
+
+    def close(self):
+        """Discard any unread data and release the connection."""
+        if self.__conn is not None:
+            # A partially read body makes the connection unusable
+            self.__release(reuse=False)
+
+    def __release(self, reuse=True):
+        conn, self.__conn = self.__conn, None
+        if conn is not None:
+            self.__pool._release(self.__key, conn, reuse)
+
+
+class _HostPool(object):
+    """Idle connections and connection count for a single host."""
+    def __init__(self):
+        self.idle = deque()
+        self.size = 0
+        self.cond = threading.Condition(threading.Lock())
+
+
+class ConnectionPool(object):
+    """
+    Thread safe pool of persistent HTTP/HTTPS connections, grouped by host.
+
+    Examples:
+
+    pool = ConnectionPool(maxsize=4, idle_timeout=30)
+    response = pool.urlopen('GET', 'https://changeme.demandware.net/s/SiteGenesis/dw/shop/v13_1/products/foo')
+    body = response.read()
+
+    """
+    REDIRECT_CODES = frozenset((
+        httplib.MOVED_PERMANENTLY,
+        httplib.FOUND,
+        httplib.SEE_OTHER,
+        httplib.TEMPORARY_REDIRECT,
+    ))
+
+    MAX_REDIRECTS = 5
+
+    def __init__(self, maxsize=10, idle_timeout=60.0, block=True, retries=None,
+                 connect_timeout=None, read_timeout=None, proxies=None):
+        """
+        Args:
+
+        ``maxsize``: Integer, maximum number of connections opened per host.
+
+        ``idle_timeout``: Float, seconds that an idle connection is kept alive, None keeps it forever.
+
+        ``block``: Boolean, if True waits for a free connection when a host reached ``maxsize``,
+        otherwise opens a temporary connection that is not kept.
+
+        ``retries``: ``Retry`` object or Integer, default retry policy of requests,
+        by default requests are not retried.
+
+        ``connect_timeout``: Float, seconds to wait for a connection to be established,
+        None waits forever.
+
+        ``read_timeout``: Float, seconds to wait for data on an established connection,
+        None waits forever.
+
+        ``proxies``: Dictionary with a proxy URL per scheme, e.g. {'https': 'http://proxy:3128'},
+        by default taken from http_proxy, https_proxy and no_proxy environment variables
+        like ``urllib2.urlopen`` does, an empty dictionary disables proxies.
+
+        """
+        self.maxsize = int(maxsize)
+        self.idle_timeout = idle_timeout
+        self.block = block
+        self.retries = Retry.from_value(retries)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.proxies = proxies
+
+        self.__hosts = {}
+        self.__proxies = {}
+        self.__lock = threading.Lock()
+
+    def __host(self, key):
+        with self.__lock:
+            host = self.__hosts.get(key)
+            if host is None:
+                host = self.__hosts[key] = _HostPool()
+            return host
+
+    def _proxy(self, key):
+        """
+        Proxy used to reach a host.
+
+        Args:
+
+        ``key``: Tuple with scheme, host and port.
+
+        Returns:
+
+        Tuple with proxy host, port and Proxy-Authorization header, None if the host
+        is reached directly.
+
+        """
+        try:
+            return self.__proxies[key]
+        except KeyError:
+            pass
+        scheme, host, port = key
+        proxies = self.proxies
+        if proxies is None:
+            proxies = urllib.getproxies()
+            if urllib.proxy_bypass(host):
+                proxies = {}
+
+        proxy = None
+        url = proxies.get(scheme)
+        if url:
+            if '://' not in url:
+                url = 'http://%s' % url
+            parts = urlparse.urlsplit(url)
+            auth = None
+            if parts.username is not None:
+                credentials = '%s:%s' % (urllib.unquote(parts.username), urllib.unquote(parts.password or ''))
+                auth = 'Basic %s' % base64.b64encode(credentials)
+            proxy = (parts.hostname, parts.port or httplib.HTTP_PORT, auth)
+        self.__proxies[key] = proxy
+        return proxy
+
+    def _new_conn(self, key):
+        """
+        Open a new connection, https requests through a proxy are tunneled with CONNECT.
+
+        Args:
+
+        ``key``: Tuple with scheme, host and port.
+
+        """
+        scheme, host, port = key
+        proxy = self._proxy(key)
+        if proxy is not None:
+            proxy_host, proxy_port, auth = proxy
+            if scheme == 'https':
+                conn = httplib.HTTPSConnection(proxy_host, proxy_port)
+                conn.set_tunnel(host, port, {'Proxy-Authorization': auth} if auth else None)
+                return conn
+            return httplib.HTTPConnection(proxy_host, proxy_port)
+        if scheme == 'https':
+            return httplib.HTTPSConnection(host, port)
+        return httplib.HTTPConnection(host, port)
+
+    def __evict(self, host, now):
+        """Close connections that have been idle for too long, caller must hold the lock."""
+        if self.idle_timeout is None:
+            return
+        while host.idle and now - host.idle[0][1] > self.idle_timeout:
+            conn = host.idle.popleft()[0]
+            host.size -= 1
+            conn.close()
+
+    def _acquire(self, key, deadline=None):
+        """
+        Get an idle connection for host, or open a new one.
+
+        Args:
+
+        ``deadline``: Float, ``time.time()`` value after which waiting for a
+        connection of a full pool is abandoned.
+
+        Returns:
+
+        Tuple with connection and a boolean that indicates if it was reused.
+
+        Raises:
+
+        ``DeadlineError``: If deadline expires while waiting.
+
+        """
+        host = self.__host(key)
+        with host.cond:
+            while True:
+                now = time.time()
+                self.__evict(host, now)
+                if host.idle:
+                    # Most recently used first, it is the most likely alive
+                    return host.idle.pop()[0], True
+                if host.size < self.maxsize or not self.block:
+                    host.size += 1
+                    break
+                if deadline is None:
+                    host.cond.wait()
+                elif deadline > now:
+                    host.cond.wait(deadline - now)
+                else:
+                    raise DeadlineError('Deadline exceeded')
+        try:
+            return self._new_conn(key), False
+        except Exception:
+            with host.cond:
+                host.size -= 1
+                host.cond.notify()
+            raise
+
+    def _release(self, key, conn, reuse=True):
+        """
+        Give back a connection to the pool.
+
+        Args:
+
+        ``reuse``: Boolean, if False the connection is closed.
+
+        """
+        host = self.__host(key)
+        with host.cond:
+            if reuse and host.size <= self.maxsize:
+                host.idle.append((conn, time.time()))
+            else:
+                host.size -= 1
+                conn.close()
+            host.cond.notify()
+
+    def clear(self):
+        """Close all idle connections."""
+        with self.__lock:
+            hosts = self.__hosts.values()
+        for host in hosts:
+            with host.cond:
+                while host.idle:
+                    host.idle.pop()[0].close()
+                    host.size -= 1
+                host.cond.notify_all()
+
+    def _timeouts(self, timeout=None, deadline=None):
+        """
+        Connect and read timeouts of a request.
+
+        Args:
+
+        ``timeout``: Tuple with connect and read timeouts or Float for both,
+        None uses timeouts of the pool.
+
+        ``deadline``: Float, ``time.time()`` value after which the request is abandoned.
+
+        Returns:
+
+        Tuple with connect and read timeouts.
+
+        Raises:
+
+        ``TransportError``: If deadline already expired.
+
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, (list, tuple)):
+            timeout = (timeout, timeout)
+        if deadline is None:
+            return tuple(timeout)
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TransportError('Deadline exceeded')
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+
+    def _connect(self, key, conn, timeout=None, stats=None):
+        """
+        Open the socket of a new connection.
+
+        Args:
+
+        ``timeout``: Float, seconds to wait for the connection to be established.
+
+        ``stats``: Dictionary where dns, connect and tls durations are added.
+
+        """
+        scheme, host, port = key
+        start = time.time()
+        # Address of the proxy when the connection goes through one
+        addresses = socket.getaddrinfo(conn.host, conn.port, 0, socket.SOCK_STREAM)
+        resolved = time.time()
+
+        sock = None
+        error = socket.error('getaddrinfo returns an empty list')
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(timeout)
+                sock.connect(address)
+                break
+            except socket.error as e:
+                error = e
+                sock.close()
+                sock = None
+        if sock is None:
+            raise error
+        if getattr(conn, '_tunnel_host', None):
+            conn.sock = sock
+            conn._tunnel()
+            sock = conn.sock
+        connected = time.time()
+
+        if scheme == 'https':
+            context = getattr(conn, '_context', None)
+            if context is not None:
+                sock = context.wrap_socket(sock, server_hostname=host)
+                if not context.check_hostname and getattr(conn, '_check_hostname', False):
+                    ssl.match_hostname(sock.getpeercert(), host)
+            else:
+                sock = ssl.wrap_socket(sock, conn.key_file, conn.cert_file)
+        conn.sock = sock
+
+        if stats is not None:
+            now = time.time()
+            stats['dns'] = stats.get('dns', 0.0) + resolved - start
+            stats['connect'] = stats.get('connect', 0.0) + connected - resolved
+            if scheme == 'https':
+                stats['tls'] = stats.get('tls', 0.0) + now - connected
+
+    def _send(self, key, method, path, body, headers, timeout=None, deadline=None, stats=None):
+        """
+        Send a request, a reused connection that was closed by the server
+        is transparently replaced by a fresh one.
+
+        """
+        while True:
+            conn, reused = self._acquire(key, deadline)
+            try:
+                connect_timeout, read_timeout = self._timeouts(timeout, deadline)
+            except TransportError:
+                self._release(key, conn)
+                raise
+            try:
+                if conn.sock is None:
+                    self._connect(key, conn, connect_timeout, stats)
+                conn.sock.settimeout(read_timeout)
+                start = time.time()
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                if stats is not None:
+                    stats['ttfb'] = stats.get('ttfb', 0.0) + time.time() - start
+                return conn, response
+            except (socket.error, httplib.HTTPException) as e:
+                self._release(key, conn, reuse=False)
+                stale = isinstance(e, httplib.BadStatusLine) or \
+                    getattr(e, 'errno', None) in (errno.ECONNRESET, errno.EPIPE)
+                if not (reused and stale):
+                    raise TransportError(str(e) or e.__class__.__name__)
+
+    def _send_retry(self, key, method, path, body, headers, retries, timeout=None, deadline=None,
+                    stats=None, throttle=None):
+        """
+        Send a request, retrying it according to ``retries`` policy, retries
+        that would not start before deadline are not done.
+
+        Every attempt takes a slot of throttle, the one of the returned response is kept.
+
+        Returns:
+
+        Tuple with connection and response.
+
+        """
+        attempt = 0
+        while True:
+            if stats is not None:
+                stats['retries'] = attempt
+            if throttle is not None:
+                try:
+                    wait = throttle.acquire(deadline)
+                except DeadlineError:
+                    if attempt:
+                        # Previous attempts were sent, the host is to blame
+                        raise TransportError('Deadline exceeded')
+                    raise
+                if stats is not None:
+                    stats['queue'] = stats.get('queue', 0.0) + wait
+            try:
+                conn, response = self._send(key, method, path, body, headers, timeout, deadline, stats)
+            except BaseException as e:
+                if throttle is not None:
+                    throttle.release()
+                if not isinstance(e, TransportError):
+                    raise
+                if attempt and isinstance(e, DeadlineError):
+                    raise TransportError(str(e))
+                if retries is None or not retries.is_retry(method, attempt):
+                    raise
+                wait = retries.get_backoff(attempt)
+                if deadline is not None and time.time() + wait >= deadline:
+                    raise
+                time.sleep(wait)
+                attempt += 1
+                continue
+
+            if retries is None or not retries.is_retry(method, attempt, response.status):
+                return conn, response
+            wait = retries.get_wait(attempt, response)
+            if wait is None or (deadline is not None and time.time() + wait >= deadline):
+                return conn, response
+            try:
+                # Drain body to keep connection alive
+                response.read()
+                self._release(key, conn, reuse=not response.will_close)
+            except (socket.error, httplib.HTTPException):
+                self._release(key, conn, reuse=False)
+            finally:
+                if throttle is not None:
+                    throttle.release()
+            time.sleep(wait)
+            attempt += 1
+
+    def urlopen(self, method, url, body=None, headers=None, decode_content=True, retries=None,
+                timeout=None, deadline=None, stats=None, throttle=None):
+        """
+        Execute a request through a pooled connection.
+
+        Args:
+
+        ``method``: String, HTTP method.
+
+        ``url``: String, absolute URL.
+
+        ``body``: String, request payload.
+
+        ``headers``: Dictionary, request headers.
+
+        ``decode_content``: Boolean, if True gzip and deflate bodies are decompressed.
+
+        ``retries``: ``Retry`` object or Integer, overrides the retry policy of the pool,
+        False disables retries.
+
+        ``timeout``: Tuple with connect and read timeouts or Float for both, overrides
+        timeouts of the pool.
+
+        ``deadline``: Float, ``time.time()`` value after which the request, including
+        retries, redirections and waits for a pooled connection or a throttle slot,
+        is abandoned.
+
+        ``stats``: Dictionary where retries count and seconds spent in queue, dns, connect,
+        tls and ttfb (time to first byte) phases are stored.
+
+        ``throttle``: ``dw.throttle.Throttle`` object, every attempt, retry or redirection
+        waits for a slot and a token. The slot of the returned response is kept and must be
+        given back by the caller with ``throttle.release()``, it is given back here if a
+        ``TransportError`` is raised.
+
+        Returns:
+
+        ``PooledResponse`` object.
+
+        Raises:
+
+        ``TransportError``: If the request could not be delivered or it is redirected
+        more than ``MAX_REDIRECTS`` times.
+
+        ``DeadlineError``: If deadline expires while the first attempt waits for a pooled
+        connection or a throttle slot, the request was not sent.
+
+        """
+        headers = dict(headers or {})
+        retries = self.retries if retries is None else Retry.from_value(retries)
+        for _ in xrange(self.MAX_REDIRECTS + 1):
+            parts = urlparse.urlsplit(url)
+            scheme = parts.scheme.lower()
+            port = parts.port or (httplib.HTTPS_PORT if scheme == 'https' else httplib.HTTP_PORT)
+            key = (scheme, parts.hostname, port)
+            path = parts.path or '/'
+            if parts.query:
+                path = '%s?%s' % (path, parts.query)
+            proxy = self._proxy(key) if scheme == 'http' else None
+            if proxy is not None:
+                # Plain requests are forwarded by the proxy, https ones are tunneled
+                path = '%s://%s%s' % (scheme, parts.netloc, path)
+                if proxy[2]:
+                    headers['Proxy-Authorization'] = proxy[2]
+
+            conn, response = self._send_retry(
+                key, method, path, body, headers, retries, timeout, deadline, stats, throttle
+            )
+            response = PooledResponse(self, key, conn, response, url, decode_content)
+
+            location = response.getheader('location')
+            if response.status not in self.REDIRECT_CODES or method != 'GET' or not location:
+                return response
+            # Drain body to keep connection alive before following redirection
+            try:
+                response.read()
+            finally:
+                if throttle is not None:
+                    throttle.release()
+            url = urlparse.urljoin(url, location)
+        raise TransportError('Too many redirects')
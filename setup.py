@@ -16,10 +16,18 @@ setup(
     license = 'GPL',
     description = ('Python Demandware SDK provides access to the OCAPI services.'),
     long_description = open('README').read(),
-    packages = find_packages(),
+    packages = find_packages(exclude=['benchmarks', 'benchmarks.*']),
     data_files = [],
     test_suite = 'nose.collector',
     tests_require = ['nose',],
+    extras_require = {
+        'speedups': ['ujson',],
+    },
+    entry_points = {
+        'console_scripts': [
+            'dw-export = dw.export:main',
+        ],
+    },
     keywords = [
         'dw',
         'demandware',
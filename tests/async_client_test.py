@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from dw.async_client import AsyncDemandware
+from dw.futures import Future
+from dw.transport import ConnectionPool
+from tests.transport_test import Handler, LocalServerTestCase
+
+###############################################################
+# AsyncDemandwareTest
+###############################################################
+class AsyncDemandwareTest(LocalServerTestCase):
+    """Unit Test for AsyncDemandware class, resources are served by a local server."""
+    def setUp(self):
+        super(AsyncDemandwareTest, self).setUp()
+        self.pool = ConnectionPool()
+        self.conn = AsyncDemandware(self.settings(pool=self.pool), max_workers=4)
+
+    def tearDown(self):
+        self.conn.close()
+        self.pool.clear()
+        super(AsyncDemandwareTest, self).tearDown()
+
+    def test_gather(self):
+        """Several methods run concurrently and results keep their order."""
+        futures = [
+            self.conn.get_product('foo'),
+            self.conn.get_product('bar'),
+            self.conn.search_product('shirt'),
+            self.conn.search_category('root', 1),
+        ]
+        self.assertTrue(all(isinstance(f, Future) for f in futures))
+
+        paths = [r.path.split('?')[0] for r in self.conn.gather(*futures)]
+        self.assertEqual([p.rsplit('/', 2)[1:] for p in paths], [
+            ['products', 'foo'],
+            ['products', 'bar'],
+            ['v13_1', 'product_search'],
+            ['categories', 'root'],
+        ])
+
+    def test_session(self):
+        """Worker threads share the cookie session."""
+        self.conn.get_product('session').result()
+        self.conn.gather(*[self.conn.get_product('sku-%d' % i) for i in xrange(8)])
+
+        self.assertEqual(Handler.cookies[0], None)
+        self.assertEqual(Handler.cookies[1:], ['dwsid=%s' % Handler.SESSION] * 8)
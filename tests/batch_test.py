@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from unittest import TestCase
+
+from dw.batch import Batcher
+from dw.client import Demandware
+from dw.futures import Executor, gather
+from benchmarks.server import MockServer, PlainConnectionPool
+
+###############################################################
+# BatcherTest
+###############################################################
+class BatcherTest(TestCase):
+    """Unit Test for Batcher class."""
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, keys):
+        with self.lock:
+            self.calls.append(list(keys))
+        return dict((key, key.upper()) for key in keys if key != 'missing')
+
+    def test_window(self):
+        """Loads within the window are resolved with one call."""
+        batcher = Batcher(self.fetch, window=0.05, max_size=24)
+        futures = [batcher.load(key) for key in ('foo', 'bar', 'foo', 'missing')]
+
+        self.assertEqual(gather(futures, timeout=1), ['FOO', 'BAR', 'FOO', None])
+        self.assertEqual(self.calls, [['foo', 'bar', 'missing']])
+
+    def test_max_size(self):
+        """A full batch is sent without waiting for the window."""
+        batcher = Batcher(self.fetch, window=10, max_size=3)
+        futures = [batcher.load(key) for key in ('a', 'b', 'c')]
+
+        self.assertEqual(gather(futures, timeout=1), ['A', 'B', 'C'])
+        self.assertEqual(self.calls, [['a', 'b', 'c']])
+
+    def test_exception(self):
+        """Exceptions of the batch function are raised by every load."""
+        batcher = Batcher(lambda keys: 1 / 0, window=0.01)
+        future = batcher.load('foo')
+
+        self.assertRaises(ZeroDivisionError, future.result, 1)
+
+###############################################################
+# ClientBatchTest
+###############################################################
+class ClientBatchTest(TestCase):
+    """Unit Test for batched get_product calls of Demandware, resources are served by MockServer."""
+    def setUp(self):
+        self.server = MockServer(seed=0).start()
+        self.pool = PlainConnectionPool()
+
+    def tearDown(self):
+        self.pool.clear()
+        self.server.stop()
+
+    def settings(self, **params):
+        return self.server.settings(pool=self.pool, **params)
+
+    def test_window(self):
+        """Concurrent single product lookups become one products/(...) request."""
+        conn = Demandware(self.settings(batch_window=0.05, history=10))
+        ids = ['sku-%06d' % i for i in xrange(8)] + ['missing-1']
+        with Executor(max_workers=len(ids)) as executor:
+            products = gather([executor.submit(conn.get_product, sku) for sku in ids], timeout=5)
+
+        self.assertEqual([p.id for p in products[:-1]], ids[:-1])
+        self.assertEqual(products[-1], None)
+        self.assertEqual(self.server.requests, 1)
+        url = conn.get_history(as_dict=True)[0]['request']['url']
+        self.assertTrue('/products/(' in url)
+
+    def test_expand(self):
+        """Lookups with other expand values are sent in other batches."""
+        conn = Demandware(self.settings(batch_window=0.05))
+        with Executor(max_workers=4) as executor:
+            futures = [
+                executor.submit(conn.get_product, 'foo'),
+                executor.submit(conn.get_product, 'bar'),
+                executor.submit(conn.get_product, 'foo', expand=['images']),
+                executor.submit(conn.get_product, 'bar', expand=['images']),
+            ]
+            products = gather(futures, timeout=5)
+
+        self.assertEqual([hasattr(p, 'image_groups') for p in products], [False, False, True, True])
+        self.assertEqual(self.server.requests, 2)
+
+    def test_raw(self):
+        """Raw lookups of the same SKU get their own dictionaries, arrayify is honored."""
+        conn = Demandware(self.settings(batch_window=0.05, raw=True))
+        with Executor(max_workers=3) as executor:
+            futures = [
+                executor.submit(conn.get_product, 'foo'),
+                executor.submit(conn.get_product, 'foo'),
+                executor.submit(conn.get_product, 'foo', arrayify=True),
+            ]
+            first, second, third = gather(futures, timeout=5)
+
+        self.assertEqual(first, second)
+        self.assertFalse(first is second)
+        self.assertEqual(third, [first])
+        self.assertEqual(self.server.requests, 1)
+
+    def test_pristine(self):
+        """Lookups with values set for the call are not batched."""
+        conn = Demandware(self.settings(batch_window=10, history=10))
+        conn.set_get('locale', 'de-DE')
+        self.assertEqual(conn.get_product('foo').id, 'foo')
+
+        call = conn.get_history(as_dict=True)[0]['request']
+        self.assertTrue('/products/foo?' in call['url'])
+        self.assertEqual(call['get']['locale'], 'de-DE')
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import warnings
+from unittest import TestCase
+
+from dw.breaker import CircuitBreaker, get_breaker
+
+###############################################################
+# CircuitBreakerTest
+###############################################################
+class CircuitBreakerTest(TestCase):
+    """Unit Test for CircuitBreaker class."""
+    def test_failure_rate(self):
+        """Opens once failure rate is reached and fails fast."""
+        breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, reset_timeout=60)
+        for success in (True, False, True):
+            self.assertTrue(breaker.allow())
+            breaker.record(success)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_slow_calls(self):
+        """Opens once slow call rate is reached."""
+        breaker = CircuitBreaker(slow_call_duration=1.0, slow_call_rate=0.5, min_calls=2)
+        breaker.record(True, 0.1)
+        breaker.record(True, 2.0)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_half_open(self):
+        """Probes after reset_timeout, closes if they succeed and opens again otherwise."""
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=0.01, half_open_calls=1)
+        breaker.record(False)
+        time.sleep(0.02)
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        breaker.record(True)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_shared(self):
+        """Breakers are shared by key."""
+        breaker = get_breaker(('foo', 'breaker_test'))
+
+        self.assertTrue(get_breaker(('foo', 'breaker_test')) is breaker)
+
+    def test_shared_kwargs(self):
+        """Asking for other kwargs of a shared breaker warns, the first kwargs are kept."""
+        breaker = get_breaker(('foo', 'breaker_test_kwargs'), min_calls=1)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertTrue(get_breaker(('foo', 'breaker_test_kwargs'), min_calls=5) is breaker)
+            get_breaker(('foo', 'breaker_test_kwargs'), min_calls=1)
+
+        self.assertEqual([w.category for w in caught], [RuntimeWarning])
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dw.cache import MemoryCache, FileCache
+
+###############################################################
+# MemoryCacheTest
+###############################################################
+class MemoryCacheTest(TestCase):
+    """Unit Test for MemoryCache class."""
+    def make_cache(self, maxsize):
+        return MemoryCache(maxsize)
+
+    def test_get_set(self):
+        """Stores and removes values."""
+        cache = self.make_cache(2)
+        cache.set('foo', {'bar': 1})
+
+        self.assertEqual(cache.get('foo'), {'bar': 1})
+        self.assertEqual(cache.get('missing'), None)
+
+        cache.delete('foo')
+        self.assertEqual(cache.get('foo'), None)
+
+    def test_ttl(self):
+        """Expired values are not returned."""
+        cache = self.make_cache(2)
+        cache.set('foo', 'bar', ttl=0.01)
+        time.sleep(0.02)
+
+        self.assertEqual(cache.get('foo'), None)
+
+    def test_lru(self):
+        """Least recently used values are evicted first."""
+        cache = self.make_cache(2)
+        cache.set('a', 1)
+        time.sleep(0.01)
+        cache.set('b', 2)
+        time.sleep(0.01)
+        cache.get('a')
+        time.sleep(0.01)
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_clear(self):
+        """Removes all values."""
+        cache = self.make_cache(2)
+        cache.set('a', 1)
+        cache.clear()
+
+        self.assertEqual(cache.get('a'), None)
+
+###############################################################
+# FileCacheTest
+###############################################################
+class FileCacheTest(MemoryCacheTest):
+    """Unit Test for FileCache class."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def make_cache(self, maxsize):
+        return FileCache(self.path, maxsize)
+
+    def test_evict_ratio(self):
+        """Eviction leaves room for several keys, so the directory is not listed on every write."""
+        cache = self.make_cache(10)
+        for i in xrange(11):
+            cache.set('key-%d' % i, i)
+        self.assertEqual(len(os.listdir(self.path)), 9)
+
+        listed = []
+        listdir = os.listdir
+        os.listdir = lambda path: listed.append(path) or listdir(path)
+        try:
+            cache.set('key-11', 11)
+        finally:
+            os.listdir = listdir
+        self.assertEqual(listed, [])
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from dw.client import Demandware
+from dw.errors import TransportError
+from benchmarks.server import MockServer
+
+###############################################################
+# ClientBulkTest
+###############################################################
+class ClientBulkTest(TestCase):
+    """Unit Test for get_products_bulk of Demandware, resources are served by MockServer."""
+    def setUp(self):
+        self.server = MockServer(seed=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_products(self):
+        """Products keep the order of ids, duplicated and missing SKUs included."""
+        conn = Demandware(self.server.settings())
+        ids = ['sku-000003', 'missing-1', 'sku-000001', 'sku-000003', 'sku-000002']
+        products, missing = conn.get_products_bulk(ids, chunk_size=2)
+
+        self.assertEqual([p.id for p in products], ['sku-000003', 'sku-000001', 'sku-000003', 'sku-000002'])
+        self.assertEqual(missing, ['missing-1'])
+        # Four unique SKUs in chunks of two
+        self.assertEqual(self.server.requests, 2)
+
+    def test_raw(self):
+        """Products are dictionaries in raw mode."""
+        conn = Demandware(self.server.settings())
+        products, missing = conn.get_products_bulk(['sku-000001'], raw=True)
+
+        self.assertEqual(products[0]['id'], 'sku-000001')
+        self.assertEqual(missing, [])
+
+    def test_request_values(self):
+        """Values set before the call are sent with every chunk and not with later calls."""
+        conn = Demandware(self.server.settings(history=10))
+        conn.set_get('locale', 'de-DE')
+        conn.set_header('Accept-Language', 'de-DE')
+        conn.get_products_bulk(['sku-000001', 'sku-000002', 'sku-000003'], chunk_size=1)
+        conn.search_category('root', levels=1)
+
+        calls = conn.get_history(as_dict=True)
+        self.assertEqual([c['request']['get'].get('locale') for c in calls], ['de-DE'] * 3 + [None])
+        self.assertEqual([c['request']['headers'].get('Accept-Language') for c in calls],
+                         ['de-DE'] * 3 + [None])
+
+    def test_failed(self):
+        """Chunks that can not be retrieved raise TransportError instead of being missing."""
+        server = MockServer(error_rate=1.0, seed=0).start()
+        try:
+            conn = Demandware(server.settings(retries=False))
+            self.assertRaises(TransportError, conn.get_products_bulk, ['sku-000001', 'sku-000002'])
+        finally:
+            server.stop()
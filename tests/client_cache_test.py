@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+
+from dw.cache import MemoryCache
+from dw.client import Demandware
+from dw.futures import Executor
+from benchmarks.server import MockServer
+from tests.transport_test import Handler, LocalServerTestCase
+
+###############################################################
+# ClientCacheTest
+###############################################################
+class ClientCacheTest(LocalServerTestCase):
+    """Unit Test for the response cache of Demandware, resources are served by a local server."""
+    def test_cache_hit(self):
+        """Cached responses are returned without a request."""
+        conn = Demandware(self.settings(cache=MemoryCache()))
+        self.assertEqual(conn.get_product('foo').path, conn.get_product('foo').path)
+        self.assertEqual(sum(Handler.hits.values()), 1)
+
+    def test_headers(self):
+        """Responses are not shared by calls with other request headers."""
+        conn = Demandware(self.settings(cache=MemoryCache()))
+        for token in ('customer-A', 'customer-B', 'customer-A'):
+            conn.set_header('Authorization', 'Bearer %s' % token)
+            conn.get_product('foo')
+        conn.get_product('foo')
+
+        self.assertEqual(sum(Handler.hits.values()), 3)
+
+    def test_raw_copy(self):
+        """Changes to a raw result are not seen by later cache hits."""
+        conn = Demandware(self.settings(cache=MemoryCache(), raw=True))
+        product = conn.get_product('foo')
+        product['path'] = 'changed'
+        cached = conn.get_product('foo')
+        cached['path'] = 'changed'
+
+        self.assertNotEqual(conn.get_product('foo')['path'], 'changed')
+        self.assertEqual(sum(Handler.hits.values()), 1)
+
+###############################################################
+# ClientRevalidateTest
+###############################################################
+class ClientRevalidateTest(LocalServerTestCase):
+    """Unit Test for conditional requests of Demandware, resources are served by a local server."""
+    def test_validators(self):
+        """ETag and Last-Modified of a response are sent with the next request."""
+        store = MemoryCache()
+        conn = Demandware(self.settings(revalidate=store, debug=True))
+        first = conn.get_product('etag-1')
+        self.assertEqual(Handler.conditional, [(None, None)])
+        self.assertFalse(conn.get_response(as_dict=True)['info'].get('revalidated', False))
+
+        second = conn.get_product('etag-1')
+        self.assertEqual(Handler.conditional[-1], (Handler.ETAG, Handler.LAST_MODIFIED))
+        self.assertTrue(conn.get_response(as_dict=True)['info']['revalidated'])
+        self.assertEqual(second.path, first.path)
+
+    def test_not_validated(self):
+        """Responses without validators are not stored."""
+        store = MemoryCache()
+        conn = Demandware(self.settings(revalidate=store))
+        conn.get_product('foo')
+        conn.get_product('foo')
+
+        self.assertEqual(len(store), 0)
+        self.assertEqual(sum(Handler.hits.values()), 2)
+
+    def test_session(self):
+        """Responses bound to the session are not stored, they are not served to other sessions."""
+        server = MockServer(seed=0).start()
+        try:
+            store = MemoryCache()
+            conn = Demandware(server.settings(revalidate=store, coalesce=True))
+            self.assertEqual(conn.get_basket().currency, 'USD')
+            self.assertEqual(len(store), 0)
+            conn.get_product('foo')
+            self.assertEqual(len(store), 1)
+        finally:
+            server.stop()
+
+
+###############################################################
+# ClientCoalesceTest
+###############################################################
+class ClientCoalesceTest(LocalServerTestCase):
+    """Unit Test for coalesced requests of Demandware, resources are served by a local server."""
+    def test_deadline(self):
+        """Deadline bounds the wait for an identical request in flight."""
+        conn = Demandware(self.settings(coalesce=True))
+        with Executor(max_workers=1) as executor:
+            future = executor.submit(conn.get_product, 'slow')
+            time.sleep(0.05)
+            start = time.time()
+            self.assertEqual(conn.get_product('slow', deadline=0.05), None)
+            self.assertTrue(time.time() - start < 0.15)
+            self.assertTrue(future.result() is not None)
+
+        self.assertEqual(sum(Handler.hits.values()), 1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from dw.client import Demandware
+from benchmarks.server import MockServer
+
+###############################################################
+# ClientHistoryTest
+###############################################################
+class ClientHistoryTest(TestCase):
+    """Unit Test for the history of calls of Demandware, resources are served by MockServer."""
+    def setUp(self):
+        self.server = MockServer(seed=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_history(self):
+        """Keeps a bounded, truncated and sampled history of calls."""
+        conn = Demandware(self.server.settings())
+        conn.get_product('foo')
+        self.assertEqual(conn.get_history(), [])
+
+        conn = Demandware(self.server.settings(history=2, history_body_limit=10))
+        for sku in ('foo', 'bar', 'baz'):
+            conn.get_product(sku)
+        calls = conn.get_history(as_dict=True)
+        urls = [call['request']['url'].split('?')[0] for call in calls]
+        self.assertEqual([url.rsplit('/', 1)[1] for url in urls], ['bar', 'baz'])
+        self.assertEqual(len(calls[-1]['response']['body']), 13)
+        self.assertTrue(calls[-1]['response']['body'].endswith('...'))
+        self.assertEqual(conn.get_history()[-1].response.info.code, 200)
+
+        conn.clear_history()
+        self.assertEqual(conn.get_history(), [])
+
+        conn = Demandware(self.server.settings(history=10, history_sample_rate=0))
+        conn.get_product('foo')
+        self.assertEqual(conn.get_history(), [])
+
+    def test_bodies(self):
+        """Undecoded bodies are sliced and streamed bodies are not kept."""
+        conn = Demandware(self.server.settings(history=10, history_body_limit=10, raw='bytes'))
+        body = conn.get_product('foo')
+        self.assertEqual(conn.get_history(as_dict=True)[-1]['response']['body'], body[:10] + '...')
+
+        conn = Demandware(self.server.settings(history=10, history_body_limit=None))
+        list(conn.search_product('shirt', stream=True))
+        self.assertEqual(conn.get_history(as_dict=True)[-1]['response']['body'], None)
+
+    def test_redacted(self):
+        """Passwords, authorization headers and session cookies are not kept."""
+        conn = Demandware(self.server.settings(history=10))
+        self.assertTrue(conn.login('customer@example.com', 'secret'))
+        conn.set_header('Authorization', 'Bearer token')
+        conn.get_product('foo')
+
+        login, product = conn.get_history(as_dict=True)
+        self.assertEqual(login['request']['post'], {'username': 'customer@example.com', 'password': '***'})
+        self.assertEqual(login['response']['headers']['set-cookie'], '***')
+        self.assertEqual(product['request']['headers']['Authorization'], '***')
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from dw.client import Demandware
+from dw.objects import Object
+from tests.transport_test import LocalServerTestCase
+
+###############################################################
+# ClientRawTest
+###############################################################
+class ClientRawTest(LocalServerTestCase):
+    """Unit Test for response modes of Demandware, resources are served by a local server."""
+    def setUp(self):
+        super(ClientRawTest, self).setUp()
+        self.objects = []
+        self.init = Object.__init__
+        objects = self.objects
+        init = self.init
+
+        def counted(obj, *args, **kwargs):
+            objects.append(obj)
+            init(obj, *args, **kwargs)
+        Object.__init__ = counted
+
+    def tearDown(self):
+        Object.__init__ = self.init
+        super(ClientRawTest, self).tearDown()
+
+    def test_objects(self):
+        """By default responses are returned as objects."""
+        conn = Demandware(self.settings())
+        product = conn.get_product('foo')
+
+        self.assertTrue(isinstance(product, Object))
+        self.assertTrue(product.path.startswith('/s/SiteGenesis/dw/shop/v13_1/products/foo'))
+
+    def test_raw_client(self):
+        """Raw mode of the client returns decoded JSON without building objects."""
+        for raw in (True, Demandware.RAW_JSON):
+            conn = Demandware(self.settings(raw=raw))
+            product = conn.get_product('foo')
+            self.assertEqual(type(product), dict)
+            self.assertTrue(product['path'].startswith('/s/SiteGenesis/dw/shop/v13_1/products/foo'))
+
+        conn = Demandware(self.settings(raw=Demandware.RAW_BYTES))
+        body = conn.get_product('foo')
+        self.assertEqual(type(body), str)
+        self.assertTrue(body.startswith('{"path": "/s/SiteGenesis/dw/shop/v13_1/products/foo'))
+        self.assertEqual(self.objects, [])
+
+    def test_raw_call(self):
+        """Response mode of a call overrides the one of the client."""
+        conn = Demandware(self.settings())
+        self.assertEqual(type(conn.get_product('foo', raw=True)), dict)
+        self.assertEqual(type(conn.search_product('foo', raw=Demandware.RAW_JSON)), dict)
+        self.assertEqual(type(conn.search_category('foo', raw=Demandware.RAW_BYTES)), str)
+        self.assertEqual(self.objects, [])
+
+        conn = Demandware(self.settings(raw=True))
+        self.assertTrue(isinstance(conn.get_product('foo', raw=False), Object))
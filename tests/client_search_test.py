@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from dw.client import Demandware
+from dw.errors import TransportError
+from benchmarks.server import MockServer, PlainConnectionPool
+
+###############################################################
+# ClientSearchTest
+###############################################################
+class ClientSearchTest(TestCase):
+    """Unit Test for iter_search_products of Demandware, resources are served by MockServer."""
+    def setUp(self):
+        self.server = MockServer(search_total=30, seed=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_pages(self):
+        """Hits of every page are iterated once."""
+        conn = Demandware(self.server.settings())
+        hits = list(conn.iter_search_products('shirt', page_size=7, prefetch=2))
+
+        self.assertEqual([h.product_id for h in hits], ['sku-%06d' % i for i in xrange(30)])
+
+    def test_failed_page(self):
+        """A page that can not be retrieved raises TransportError instead of ending the iteration."""
+        pool = PlainConnectionPool()
+        conn = Demandware(self.server.settings(pool=pool, retries=False))
+        hits = conn.iter_search_products('shirt', page_size=10, prefetch=0)
+        for _ in xrange(10):
+            hits.next()
+        self.server.stop()
+        pool.clear()
+
+        self.assertRaises(TransportError, list, hits)
+
+    def test_failed_first_page(self):
+        """A failing host does not look like a search without hits."""
+        server = MockServer(error_rate=1.0, seed=0).start()
+        try:
+            conn = Demandware(server.settings(retries=False))
+            self.assertRaises(TransportError, list, conn.iter_search_products('shirt'))
+        finally:
+            server.stop()
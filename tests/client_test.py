@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import json
+import threading
 from unittest import TestCase
 
 from dw.client import Demandware
-from dw.objects import Object
+from dw.objects import Array, Object
 from dw.errors import ParameterMissedError, ParameterInvalidError
 from pprint import pprint
 
@@ -88,6 +89,20 @@ class DemandwareTest(TestCase):
             self.SETTINGS_BAD_INVALID
         )
 
+    def test_thread_isolation(self):
+        """Verify that request data set in a thread does not leak to others."""
+        conn = Demandware(self.SETTINGS_OK_VALID)
+        conn.set_get('count', self.search[0]['count'])
+
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(conn.get('count')))
+        thread.start()
+        thread.join()
+
+        # Compare values
+        self.assertEqual(seen, [None])
+        self.assertEqual(conn.get('count'), self.search[0]['count'])
+
     def test_get_product_single(self):
         """Verify requests for single products."""
         conn = Demandware(self.SETTINGS_OK_VALID)
@@ -121,6 +136,16 @@ class DemandwareTest(TestCase):
         # Compare attribute
         self.assertEqual(products[0].name, self.products[0]['name'])
 
+    def test_get_products_bulk(self):
+        """Verify requests for multiple products split in chunks."""
+        conn = Demandware(self.SETTINGS_OK_VALID)
+        ids = [p['id'] for p in self.products] + ['missing-product']
+        products, missing = conn.get_products_bulk(ids, chunk_size=1)
+
+        # Compare response
+        self.assertEqual([p.name for p in products], [p['name'] for p in self.products])
+        self.assertEqual(missing, ['missing-product'])
+
     def test_get_search_products(self):
         """Verify requests that search products."""
         conn = Demandware(self.SETTINGS_OK_VALID)
@@ -128,7 +153,7 @@ class DemandwareTest(TestCase):
 
         # Compare response
         self.assertEqual(hasattr(search, 'hits'), True)
-        self.assertTrue(isinstance(search.hits, list))
+        self.assertTrue(isinstance(search.hits, Array))
         self.assertNotEqual(len(search.hits), 0)
 
     def test_get_search_products_with_count(self):
@@ -141,9 +166,18 @@ class DemandwareTest(TestCase):
 
         # Compare response
         self.assertEqual(hasattr(search, 'hits'), True)
-        self.assertTrue(isinstance(search.hits, list))
+        self.assertTrue(isinstance(search.hits, Array))
         self.assertEqual(len(search.hits), 1)
 
+    def test_iter_search_products(self):
+        """Verify iteration over all pages of a search."""
+        conn = Demandware(self.SETTINGS_OK_VALID)
+        search = conn.search_product(self.search[1]['query'])
+        hits = list(conn.iter_search_products(self.search[1]['query'], page_size=self.search[1]['count'], prefetch=2))
+
+        # Compare response
+        self.assertEqual(len(hits), search.total)
+
     def test_get_category_single(self):
         """Verify requests that looking for a category."""
         conn = Demandware(self.SETTINGS_OK_VALID)
@@ -151,7 +185,7 @@ class DemandwareTest(TestCase):
 
         # Compare response
         self.assertEqual(hasattr(category, 'categories'), True)
-        self.assertTrue(isinstance(category.categories, list))
+        self.assertTrue(isinstance(category.categories, Array))
         self.assertNotEqual(len(category.categories), 0)
 
     def test_loginwith_correct_credentials(self):
@@ -265,7 +299,7 @@ class DemandwareTest(TestCase):
 
         # Compare response
         self.assertEqual(hasattr(search, 'hits'), True)
-        self.assertTrue(isinstance(search.hits, list))
+        self.assertTrue(isinstance(search.hits, Array))
         self.assertNotEqual(len(search.hits), 0)
         # Compare attribute
         self.assert_('price' in search.hits[0])
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from dw.codec import dumps_prefix, get_codec
+
+###############################################################
+# CodecTest
+###############################################################
+class CodecTest(TestCase):
+    """Unit Test for JSON codecs."""
+    def test_default(self):
+        """Encodes and decodes with the fastest installed module."""
+        codec = get_codec()
+        data = {'id': 'foo', 'hits': [{'price': 1.5}]}
+
+        self.assertEqual(codec.loads(codec.dumps(data)), data)
+
+    def test_invalid(self):
+        """Reports invalid documents as ValueError."""
+        self.assertRaises(ValueError, get_codec().loads, '{"foo":')
+
+    def test_missing(self):
+        """Raises ImportError for modules not installed."""
+        self.assertRaises(ImportError, get_codec, 'missing_json_module')
+
+    def test_dumps_prefix(self):
+        """Encodes values only up to the limit."""
+        self.assertEqual(dumps_prefix({'foo': 'bar'}, 20), '{"foo": "bar"}')
+        self.assertEqual(dumps_prefix({'foo': 'bar'}, 5), '{"foo...')
+
+        # Items after the limit are not encoded, object() would raise TypeError
+        self.assertEqual(dumps_prefix(['foo'] * 1000 + [object()], 10), '["foo", "f...')
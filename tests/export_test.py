@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dw.client import Demandware
+from dw.export import CatalogExport, main
+from benchmarks.server import MockServer
+
+###############################################################
+# CatalogExportTest
+###############################################################
+class CatalogExportTest(TestCase):
+    """Unit Test for CatalogExport class, the catalog is served by MockServer."""
+    def setUp(self):
+        self.server = MockServer(search_total=30, variations=2, images=1).start()
+        self.output = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.output)
+
+    def export(self, **params):
+        params.setdefault('levels', 1)
+        params.setdefault('max_depth', 1)
+        params.setdefault('shard_size', 8)
+        params.setdefault('page_size', 7)
+        return CatalogExport(self.server.settings(), self.output, **params)
+
+    def read(self):
+        products = []
+        for name in sorted(os.listdir(self.output)):
+            if name.endswith('.ndjson'):
+                with open(os.path.join(self.output, name)) as fp:
+                    products.extend(json.loads(line)['id'] for line in fp)
+        return products
+
+    def test_categories(self):
+        """Walks the tree with several requests when it is deeper than levels."""
+        export = self.export(levels=1, max_depth=2)
+        categories = export.categories(Demandware(self.server.settings()))
+        self.assertEqual(len(categories), 1 + 8 + 64)
+        self.assertEqual(categories[:3], ['root', 'root-0', 'root-1'])
+
+    def test_run(self):
+        """Writes every product once across shards."""
+        summary = self.export(processes=0).run()
+        self.assertEqual(summary, {'shards': 4, 'written': 4, 'products': 30, 'missing': []})
+        self.assertEqual(self.read(), ['sku-%06d' % i for i in xrange(30)])
+        with open(os.path.join(self.output, 'manifest.json')) as fp:
+            self.assertEqual(json.load(fp)['categories'], 9)
+
+    def test_resume(self):
+        """Only shards that do not exist are written again."""
+        self.export(processes=0).run()
+        os.remove(os.path.join(self.output, 'products-00002.ndjson'))
+
+        requests = self.server.requests
+        summary = self.export(processes=0, shard_size=100).run()
+        self.assertEqual(summary['written'], 1)
+        self.assertEqual(summary['products'], 8)
+        self.assertEqual(self.server.requests - requests, 1)
+        self.assertEqual(self.read(), ['sku-%06d' % i for i in xrange(30)])
+
+    def test_processes(self):
+        """Searches and shards are shared by worker processes."""
+        summary = self.export(processes=2).run()
+        self.assertEqual(summary['products'], 30)
+        self.assertEqual(self.read(), ['sku-%06d' % i for i in xrange(30)])
+
+    def test_main(self):
+        """Runs from the command line with settings from a JSON file."""
+        settings = os.path.join(self.output, 'settings.json')
+        with open(settings, 'w') as fp:
+            json.dump(dict(self.server.settings(), pool=None), fp)
+        # Secure is never used by an export, so a plain connection pool is not needed
+        code = main([settings, os.path.join(self.output, 'catalog'), '--levels', '1',
+                     '--max-depth', '0', '--processes', '0'])
+        self.assertEqual(code, 0)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from unittest import TestCase
+
+from dw.futures import Executor, Future, SingleFlight, TimeoutError, gather
+
+###############################################################
+# ExecutorTest
+###############################################################
+class ExecutorTest(TestCase):
+    """Unit Test for Executor and Future classes."""
+    def test_map_keeps_order(self):
+        """Results are returned in the order of arguments."""
+        with Executor(max_workers=4) as executor:
+            results = executor.map(lambda n: time.sleep(0.01 * (5 - n)) or n * n, range(5))
+
+        self.assertEqual(results, [0, 1, 4, 9, 16])
+
+    def test_exception(self):
+        """Exceptions are raised again when result is requested."""
+        with Executor(max_workers=1) as executor:
+            future = executor.submit(int, 'foo')
+
+        self.assertRaises(ValueError, future.result)
+        self.assertTrue(isinstance(future.exception(), ValueError))
+
+    def test_timeout(self):
+        """Raises TimeoutError if result is not ready."""
+        future = Future()
+
+        self.assertRaises(TimeoutError, future.result, 0.01)
+
+    def test_callbacks(self):
+        """Callbacks run when the future finishes."""
+        calls = []
+        future = Future()
+        future.add_done_callback(lambda f: calls.append(f.result()))
+        future.set_result('foo')
+        future.add_done_callback(lambda f: calls.append(f.result()))
+
+        self.assertEqual(calls, ['foo', 'foo'])
+        self.assertEqual(gather([future]), ['foo'])
+
+###############################################################
+# SingleFlightTest
+###############################################################
+class SingleFlightTest(TestCase):
+    """Unit Test for SingleFlight class."""
+    def test_shared(self):
+        """Concurrent calls for the same key run once."""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return 'foo'
+
+        with Executor(max_workers=4) as executor:
+            leader = executor.submit(flight.do, 'key', fetch)
+            started.wait()
+            followers = [executor.submit(flight.do, 'key', fetch) for _ in xrange(3)]
+
+        self.assertEqual(leader.result(), ('foo', False))
+        self.assertEqual(gather(followers), [('foo', True)] * 3)
+        self.assertEqual(len(calls), 1)
+
+        # Once finished, a new call runs again
+        self.assertEqual(flight.do('key', fetch), ('foo', False))
+        self.assertEqual(len(calls), 2)
+
+    def test_deadline(self):
+        """Followers stop waiting for the shared call at deadline."""
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def fetch():
+            started.set()
+            time.sleep(0.2)
+            return 'foo'
+
+        with Executor(max_workers=1) as executor:
+            leader = executor.submit(flight.do, 'key', fetch)
+            started.wait()
+            start = time.time()
+            self.assertRaises(TimeoutError, flight.do_until, start + 0.05, 'key', fetch)
+            self.assertTrue(time.time() - start < 0.15)
+            self.assertEqual(leader.result(), ('foo', False))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from unittest import TestCase
+
+from dw.metrics import LoggingHook, MetricsHook, Registry
+
+EVENT = {
+    'resource': 'products',
+    'method': 'GET',
+    'url': 'http://localhost/s/SiteGenesis/dw/shop/v13_1/products/foo',
+    'status': 200,
+    'reason': None,
+    'cache': 'miss',
+    'coalesced': False,
+    'revalidated': False,
+    'stale': False,
+    'retries': 1,
+    'bytes': 512,
+    'timings': {'ttfb': 0.02, 'download': 0.003, 'total': 0.03},
+}
+
+###############################################################
+# RegistryTest
+###############################################################
+class RegistryTest(TestCase):
+    """Unit Test for Registry, Counter and Histogram classes."""
+    def test_counter(self):
+        """Counters add values per labels."""
+        registry = Registry()
+        counter = registry.counter('foo_total', 'Foo.', ('name',))
+        counter.inc(name='bar')
+        counter.inc(2, name='bar')
+
+        self.assertTrue(registry.counter('foo_total', 'Foo.', ('name',)) is counter)
+        self.assertEqual(counter.get(name='bar'), 3)
+        self.assertEqual(registry.render(), '\n'.join([
+            '# HELP foo_total Foo.',
+            '# TYPE foo_total counter',
+            'foo_total{name="bar"} 3.0',
+            '',
+        ]))
+        self.assertRaises(ValueError, registry.histogram, 'foo_total', 'Foo.')
+
+    def test_histogram(self):
+        """Histograms count values in cumulative buckets."""
+        registry = Registry()
+        histogram = registry.histogram('foo_seconds', 'Foo.', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.get(), {'count': 4, 'sum': 2.65})
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[2:], [
+            'foo_seconds_bucket{le="0.1"} 2',
+            'foo_seconds_bucket{le="1.0"} 3',
+            'foo_seconds_bucket{le="+Inf"} 4',
+            'foo_seconds_sum 2.65',
+            'foo_seconds_count 4',
+        ])
+
+###############################################################
+# HookTest
+###############################################################
+class HookTest(TestCase):
+    """Unit Test for LoggingHook and MetricsHook classes."""
+    def test_metrics_hook(self):
+        """Records requests, cache lookups, retries, bytes and durations."""
+        hook = MetricsHook()
+        hook(EVENT)
+        hook(dict(EVENT, status=None, cache=None, retries=0, bytes=0))
+
+        self.assertEqual(hook.requests.get(resource='products', status=200), 1)
+        self.assertEqual(hook.requests.get(resource='products', status='error'), 1)
+        self.assertEqual(hook.cache.get(resource='products', result='miss'), 1)
+        self.assertEqual(hook.retries.get(resource='products'), 1)
+        self.assertEqual(hook.bytes.get(resource='products'), 512)
+        self.assertEqual(hook.duration.get(resource='products', phase='ttfb')['count'], 2)
+
+    def test_logging_hook(self):
+        """Writes a line per request."""
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.getLogger('dw.tests.metrics')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+        LoggingHook(logger)(EVENT)
+        LoggingHook(logger, level=logging.DEBUG)(EVENT)
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(
+            records[0].getMessage(),
+            'GET products 200 cache=miss retries=1 bytes=512 download=3.0ms total=30.0ms ttfb=20.0ms',
+        )
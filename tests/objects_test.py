@@ -1,9 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import pickle
 from unittest import TestCase
 
-from dw.objects import Object
+from dw.objects import Array, Object
 
 ###############################################################
 # ObjectTest
@@ -68,3 +69,44 @@ class ObjectTest(TestCase):
         self.assertEqual(o.get_list[0].has_key('foo'), True)
         self.assertEqual(o.get_tuple[0].has_key('foo'), True)
         self.assertEqual(hasattr(o.get_dict, 'foo'), True)
+
+    def test_nested_list(self):
+        """Wraps lists of dictionaries as Array of objects."""
+        o = Object({'hits': [{'foo': 'bar'}, {'foo': 'baz'}, 'qux']})
+
+        # Check attributes
+        self.assertTrue(isinstance(o.hits, Array))
+        self.assertEqual(len(o.hits), 3)
+        self.assertEqual([hit.foo for hit in o.hits[:2]], ['bar', 'baz'])
+        self.assertEqual(o.hits[-1], 'qux')
+        self.assertTrue(o.hits[0] is o.hits[0])
+        self.assertTrue('foo' in o.hits[0])
+        self.assertEqual(o.hits, [{'foo': 'bar'}, {'foo': 'baz'}, 'qux'])
+        self.assertRaises(IndexError, o.hits.__getitem__, 3)
+
+    def test_lazy(self):
+        """Wraps nested dictionaries on access, without changing source."""
+        source = {'foo': {'bar': 'baz'}}
+        o = Object(source)
+
+        # Check attributes
+        self.assertTrue(o.foo is o.foo)
+        self.assertEqual(o['foo'].bar, 'baz')
+        self.assertRaises(KeyError, o.__getitem__, 'missing')
+
+        o.foo.bar = 'qux'
+        o.extra = True
+
+        self.assertEqual(o.foo.bar, 'qux')
+        self.assertEqual(hasattr(o, 'extra'), True)
+        self.assertEqual(source, {'foo': {'bar': 'baz'}})
+
+    def test_pickle(self):
+        """Pickled objects keep changes."""
+        o = Object(self.mixed_attrs)
+        o.get_dict.foo = 'baz'
+        o = pickle.loads(pickle.dumps(o, pickle.HIGHEST_PROTOCOL))
+
+        # Check attributes
+        self.assertEqual(o.get_dict.foo, 'baz')
+        self.assertEqual(o.foo, 'bar')
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+from dw.client import Demandware
+from benchmarks.server import MockServer
+
+###############################################################
+# MockServerTest
+###############################################################
+class MockServerTest(TestCase):
+    """Unit Test for MockServer class, resources are requested through Demandware."""
+    def setUp(self):
+        self.server = MockServer(search_total=30, seed=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_products(self):
+        """Serves single and multiple products."""
+        conn = Demandware(self.server.settings())
+
+        self.assertEqual(conn.get_product('sku-000001').id, 'sku-000001')
+        self.assertEqual(conn.get_product('missing-1'), None)
+        self.assertEqual([p.id for p in conn.get_product(['foo', 'missing-1', 'bar'])], ['foo', 'bar'])
+        product = conn.get_product('foo', expand=[Demandware.EXPAND_IMAGES])
+        self.assertEqual(len(product.image_groups), 4)
+
+    def test_search_and_categories(self):
+        """Serves paginated product search and nested categories."""
+        conn = Demandware(self.server.settings())
+
+        self.assertEqual(conn.search_product('shirt').total, 30)
+        self.assertEqual(len(list(conn.iter_search_products('shirt', page_size=7))), 30)
+        self.assertEqual(conn.search_category('mens', levels=2).categories[0].categories[0].id, 'mens-0-0')
+
+    def test_account_and_basket(self):
+        """Serves secure resources over plain HTTP."""
+        conn = Demandware(self.server.settings())
+
+        self.assertTrue(conn.login('customer@example.com', 'secret'))
+        self.assertEqual(conn.get_user().customer_no, '00001')
+        self.assertEqual(conn.get_basket().currency, 'USD')
+        self.assertTrue(conn.logout())
+
+    def test_errors_and_revalidation(self):
+        """Injects errors and answers conditional requests."""
+        conn = Demandware(self.server.settings(revalidate=True, debug=True))
+        conn.get_product('foo')
+        self.assertTrue(conn.get_product('foo') is not None)
+        self.assertTrue(conn.get_response(as_dict=True)['info']['revalidated'])
+
+        self.server.stop()
+        self.server = MockServer(error_rate=1.0).start()
+        conn = Demandware(self.server.settings(retries=2, debug=True))
+        self.assertEqual(conn.get_product('foo'), None)
+        self.assertEqual(conn.get_response(as_dict=True)['info']['code'], 503)
+        self.assertEqual(self.server.requests, 3)
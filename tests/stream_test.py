@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+from StringIO import StringIO
+from unittest import TestCase
+
+from dw.client import Demandware
+from dw.stream import ArrayStream, iter_array
+from tests.transport_test import LocalServerTestCase
+
+###############################################################
+# StreamTest
+###############################################################
+class StreamTest(TestCase):
+    """Unit Test for streaming JSON parser."""
+    document = {
+        'count': 5,
+        'hits': [
+            {'name': 'x,y]}"\\"', 'values': [1, {'c': '['}]},
+            5,
+            'foo\\"',
+            [],
+            {},
+        ],
+        'total': 5,
+        'data': [1],
+    }
+
+    def test_items(self):
+        """Yields items of the requested array, whatever the chunk size."""
+        data = json.dumps(self.document)
+        for chunk_size in (1, 2, 7, 65536):
+            hits = list(iter_array(StringIO(data), 'hits', chunk_size=chunk_size))
+
+            self.assertEqual(hits, self.document['hits'])
+
+    def test_top_level_only(self):
+        """Ignores arrays nested in other values."""
+        data = json.dumps({'query': 'hits', 'refinements': {'hits': [1]}, 'hits': [2]})
+
+        self.assertEqual(list(iter_array(StringIO(data), 'hits', chunk_size=3)), [2])
+        self.assertEqual(list(iter_array(StringIO(data), 'missing')), [])
+
+    def test_undecoded(self):
+        """Yields JSON text of items when loads is None."""
+        data = json.dumps({'data': [{'id': 'foo'}, 1]})
+
+        self.assertEqual(list(iter_array(StringIO(data), 'data', loads=None)), ['{"id": "foo"}', '1'])
+
+    def test_malformed(self):
+        """Raises ValueError for malformed documents."""
+        self.assertRaises(ValueError, list, iter_array(StringIO('{"hits": [1,,2]}'), 'hits'))
+        self.assertRaises(ValueError, list, iter_array(StringIO('{"hits": ["foo'), 'hits'))
+
+###############################################################
+# ArrayStreamTest
+###############################################################
+class File(StringIO):
+    """File that records if it was closed."""
+    closed_early = False
+
+    def close(self):
+        self.closed_early = self.tell() < self.len
+        StringIO.close(self)
+
+
+class ArrayStreamTest(TestCase):
+    """Unit Test for ArrayStream class."""
+    data = json.dumps({'hits': [1, 2, 3], 'total': 3})
+
+    def test_items(self):
+        """Yields items like iter_array and reads the file to the end."""
+        fp = File(self.data)
+        self.assertEqual(list(ArrayStream(fp, 'hits')), [1, 2, 3])
+        self.assertFalse(fp.closed_early)
+
+    def test_dropped(self):
+        """File is closed when the stream is dropped, even before iteration."""
+        fp = File(self.data)
+        ArrayStream(fp, 'hits', chunk_size=4)
+        self.assertTrue(fp.closed_early)
+
+        fp = File(self.data)
+        stream = ArrayStream(fp, 'hits', chunk_size=4)
+        next(stream)
+        del stream
+        self.assertTrue(fp.closed_early)
+
+    def test_close(self):
+        """Closed streams stop iteration."""
+        stream = ArrayStream(File(self.data), 'hits')
+        stream.close()
+        self.assertEqual(list(stream), [])
+
+
+class ClientStreamTest(LocalServerTestCase):
+    """Unit Test for streamed calls of Demandware, resources are served by a local server."""
+    def test_dropped(self):
+        """Connections of streams dropped without iterating are given back to the pool."""
+        conn = Demandware(self.settings(pool_maxsize=1))
+        conn.search_product('foo', stream=True)
+        conn.get_product(['foo', 'bar'], stream=True)
+
+        self.assertTrue(conn.get_product('foo', deadline=1) is not None)
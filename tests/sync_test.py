@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dw.errors import SyncError
+from dw.sync import SyncIndex, DeltaSync
+from benchmarks.server import MockServer
+
+###############################################################
+# SyncIndexTest
+###############################################################
+class SyncIndexTest(TestCase):
+    """Unit Test for SyncIndex class."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.index = SyncIndex(os.path.join(self.path, 'index.db'))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.path)
+
+    def test_rows(self):
+        """Rows are replaced, deleted and kept on disk."""
+        self.index.update([('a', 'h1', None, 1.0), ('b', 'h2', '"e"', 2.0)])
+        self.index.update([('a', 'h3', None, 3.0)])
+        self.assertEqual(self.index.get(['a', 'b', 'c']), {'a': ('h3', None, 3.0), 'b': ('h2', '"e"', 2.0)})
+
+        self.index.delete(['b'])
+        self.index.close()
+        self.index = SyncIndex(os.path.join(self.path, 'index.db'))
+        self.assertEqual(self.index.skus(), ['a'])
+        self.assertEqual(len(self.index), 1)
+
+    def test_chunks(self):
+        """Lookups of many SKUs are split in several statements."""
+        skus = ['sku-%d' % i for i in xrange(SyncIndex.CHUNK_SIZE * 2 + 1)]
+        self.index.update((sku, 'h', None, 0.0) for sku in skus)
+        self.assertEqual(len(self.index.get(skus)), len(skus))
+
+###############################################################
+# DeltaSyncTest
+###############################################################
+class DeltaSyncTest(TestCase):
+    """Unit Test for DeltaSync class, products are served by MockServer."""
+    def setUp(self):
+        self.server = MockServer(variations=2, images=1).start()
+        self.path = tempfile.mkdtemp()
+        self.index = SyncIndex(os.path.join(self.path, 'index.db'))
+        self.skus = ['sku-%06d' % i for i in xrange(30)]
+
+    def tearDown(self):
+        self.index.close()
+        self.server.stop()
+        shutil.rmtree(self.path)
+
+    def sync(self, skus=None, **params):
+        sync = DeltaSync(self.server.settings(), self.index, group_size=10, **params)
+        return list(sync.run(skus))
+
+    def test_changes(self):
+        """Only new, changed and removed products are emitted."""
+        changes = self.sync(self.skus)
+        self.assertEqual([sku for sku, product in changes], self.skus)
+        self.assertEqual(changes[3][1]['id'], 'sku-000003')
+        self.assertEqual(self.sync(self.skus), [])
+
+        self.index.update([('sku-000003', 'changed', None, 0.0), ('missing-1', 'h', None, 0.0)])
+        self.assertEqual(self.sync(), [('missing-1', None), ('sku-000003', changes[3][1])])
+        self.assertEqual(len(self.index), 30)
+
+    def test_max_age(self):
+        """Products fetched within max_age are not requested."""
+        self.sync(self.skus)
+        requests = self.server.requests
+        changes = self.sync(self.skus + ['sku-000099'], max_age=3600)
+        self.assertEqual([sku for sku, product in changes], ['sku-000099'])
+        self.assertEqual(self.server.requests - requests, 1)
+
+    def test_conditional(self):
+        """Products are requested alone with the ETag of the index."""
+        self.sync(self.skus[:5], conditional=True)
+        etags = [row[1] for row in self.index.get(self.skus[:5]).values()]
+        self.assertTrue(all(etag is not None for etag in etags))
+
+        requests = self.server.requests
+        self.assertEqual(self.sync(self.skus[:5], conditional=True), [])
+        self.assertEqual(self.server.requests - requests, 5)
+
+        self.index.update([('sku-000001', 'changed', None, 0.0)])
+        self.assertEqual([sku for sku, product in self.sync(conditional=True)], ['sku-000001'])
+
+    def test_conditional_etags_kept(self):
+        """A run that is not conditional keeps ETags of the index."""
+        self.sync(self.skus[:5], conditional=True)
+        etags = [row[1] for row in self.index.get(self.skus[:5]).values()]
+        self.sync(self.skus[:5])
+
+        self.assertEqual([row[1] for row in self.index.get(self.skus[:5]).values()], etags)
+
+    def test_failed(self):
+        """Products that can not be retrieved raise SyncError."""
+        server = MockServer(error_rate=1.0, seed=0).start()
+        try:
+            sync = DeltaSync(server.settings(retries=False), self.index)
+            self.assertRaises(SyncError, list, sync.run(self.skus[:5]))
+        finally:
+            server.stop()
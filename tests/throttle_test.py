@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import warnings
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from dw.client import Demandware
+from dw.errors import TransportError
+from dw.futures import Executor
+from dw.throttle import FileTokenBucket, Throttle, TokenBucket, get_throttle
+from tests.transport_test import Handler, LocalServerTestCase
+
+###############################################################
+# TokenBucketTest
+###############################################################
+class TokenBucketTest(TestCase):
+    """Unit Test for TokenBucket and FileTokenBucket classes."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_rate(self):
+        """Tokens beyond burst are given at rate per second."""
+        bucket = TokenBucket(rate=100, burst=5)
+        start = time.time()
+        waits = [bucket.acquire() for _ in xrange(15)]
+
+        self.assertEqual(waits[:5], [0.0] * 5)
+        self.assertTrue(time.time() - start >= 0.09)
+
+    def test_deadline(self):
+        """Waits that would end after deadline are not done."""
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.acquire()
+        start = time.time()
+
+        self.assertRaises(TransportError, bucket.acquire, deadline=start + 0.1)
+        self.assertTrue(time.time() - start < 0.1)
+
+    def test_file_shared(self):
+        """Buckets using the same file share tokens."""
+        path = os.path.join(self.path, 'bucket')
+        first = FileTokenBucket(path, rate=100, burst=2)
+        second = FileTokenBucket(path, rate=100, burst=2)
+        start = time.time()
+        for _ in xrange(5):
+            first.acquire()
+            second.acquire()
+
+        self.assertTrue(time.time() - start >= 0.07)
+
+###############################################################
+# ThrottleTest
+###############################################################
+class ThrottleTest(TestCase):
+    """Unit Test for Throttle class."""
+    def test_max_in_flight(self):
+        """Concurrent calls never exceed max_in_flight."""
+        throttle = Throttle(max_in_flight=2)
+        lock = threading.Lock()
+        state = {'current': 0, 'peak': 0}
+
+        def work(_):
+            with throttle:
+                with lock:
+                    state['current'] += 1
+                    state['peak'] = max(state['peak'], state['current'])
+                time.sleep(0.01)
+                with lock:
+                    state['current'] -= 1
+
+        with Executor(max_workers=6) as executor:
+            executor.map(work, range(12))
+
+        stats = throttle.stats()
+        self.assertEqual(state['peak'], 2)
+        self.assertEqual(stats['requests'], 12)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertTrue(stats['wait_time'] > 0)
+
+    def test_deadline(self):
+        """Waiting for a free slot is abandoned at deadline."""
+        throttle = Throttle(max_in_flight=1)
+        throttle.acquire()
+        start = time.time()
+
+        self.assertRaises(TransportError, throttle.acquire, start + 0.1)
+        self.assertTrue(time.time() - start < 0.5)
+        self.assertEqual(throttle.stats()['in_flight'], 1)
+        throttle.release()
+        throttle.acquire(time.time() + 0.1)
+        self.assertEqual(throttle.stats()['requests'], 2)
+
+    def test_shared(self):
+        """Throttles are shared by key."""
+        throttle = get_throttle(('foo', 'throttle_test'), rate=10)
+
+        self.assertTrue(get_throttle(('foo', 'throttle_test'), rate=10) is throttle)
+        self.assertFalse(get_throttle(('bar', 'throttle_test'), rate=10) is throttle)
+
+    def test_shared_limits(self):
+        """Asking for other limits of a shared throttle warns, the first limits are kept."""
+        throttle = get_throttle(('foo', 'throttle_test_limits'), rate=10)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertTrue(get_throttle(('foo', 'throttle_test_limits'), rate=1) is throttle)
+            get_throttle(('foo', 'throttle_test_limits'), rate=10)
+
+        self.assertEqual([w.category for w in caught], [RuntimeWarning])
+        self.assertEqual(throttle.bucket.rate, 10)
+
+###############################################################
+# ClientThrottleTest
+###############################################################
+class ClientThrottleTest(LocalServerTestCase):
+    """Unit Test for throttled calls of Demandware, resources are served by a local server."""
+    def test_retries(self):
+        """Retries wait for the throttle like the first attempt."""
+        conn = Demandware(self.settings(max_in_flight=1, retries=3))
+        self.assertEqual(conn.get_product('throttled'), None)
+
+        self.assertEqual(sum(Handler.hits.values()), 4)
+        self.assertEqual(conn.get_throttle_stats()['requests'], 4)
+        self.assertEqual(conn.get_throttle_stats()['in_flight'], 0)
+
+    def test_deadline(self):
+        """Deadline bounds the wait for a throttle slot held by another call."""
+        conn = Demandware(self.settings(max_in_flight=1, client_id='throttle_deadline'))
+        with Executor(max_workers=1) as executor:
+            future = executor.submit(conn.get_product, 'slow')
+            time.sleep(0.05)
+            start = time.time()
+            self.assertEqual(conn.get_product('foo', deadline=0.05), None)
+            self.assertTrue(time.time() - start < 0.15)
+            self.assertTrue(future.result() is not None)
+
+    def test_deadline_not_recorded(self):
+        """Calls that expire waiting for a throttle slot do not open the circuit breaker."""
+        conn = Demandware(self.settings(max_in_flight=1, circuit_breaker={'min_calls': 2},
+                                        client_id='throttle_breaker'))
+        with Executor(max_workers=1) as executor:
+            future = executor.submit(conn.get_product, 'slow')
+            time.sleep(0.05)
+            for _ in xrange(2):
+                self.assertEqual(conn.get_product('foo', deadline=0.05), None)
+            self.assertTrue(future.result() is not None)
+
+        self.assertTrue(conn.get_product('foo') is not None)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import zlib
+import time
+import threading
+import SocketServer
+import BaseHTTPServer
+from unittest import TestCase
+
+from dw.transport import ConnectionPool, Retry
+from dw.errors import TransportError
+from dw.throttle import Throttle
+
+###############################################################
+# Local HTTP server
+###############################################################
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Keep-alive handler that counts opened connections."""
+    protocol_version = 'HTTP/1.1'
+
+    connections = 0
+    hits = {}
+    conditional = []
+    cookies = []
+
+    ETAG = '"v1"'
+    LAST_MODIFIED = 'Tue, 15 Nov 1994 12:45:26 GMT'
+    SESSION = 'abc123'
+
+    def setup(self):
+        Handler.connections += 1
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Handler.hits[self.path] = Handler.hits.get(self.path, 0) + 1
+        Handler.cookies.append(self.headers.get('Cookie'))
+        if self.path.startswith('/unavailable') and Handler.hits[self.path] < 3:
+            # Fails twice, Retry-After is given in the path
+            body = 'unavailable'
+            self.send_response(503)
+            self.send_header('Retry-After', self.path.split('/')[-1])
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if '/throttled' in self.path:
+            # Always rate limited
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if '/redirect' in self.path:
+            # Redirected to itself forever
+            self.send_response(302)
+            self.send_header('Location', self.path)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if '/slow' in self.path:
+            time.sleep(0.2)
+
+        validators = []
+        if '/etag' in self.path:
+            # Validated resources, 304 is answered to conditional requests that match
+            since = self.headers.get('If-Modified-Since')
+            match = self.headers.get('If-None-Match')
+            Handler.conditional.append((match, since))
+            validators = [('ETag', self.ETAG), ('Last-Modified', self.LAST_MODIFIED)]
+            if match == self.ETAG or (match is None and since == self.LAST_MODIFIED):
+                self.send_response(304)
+                for key, value in validators:
+                    self.send_header(key, value)
+                self.end_headers()
+                return
+
+        body = '{"path": "%s"}' % self.path
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if '/session' in self.path:
+            self.send_header('Set-Cookie', 'dwsid=%s; Path=/' % self.SESSION)
+        for key, value in validators:
+            self.send_header(key, value)
+        if self.path.startswith('/gzip'):
+            compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            self.send_header('Content-Encoding', 'gzip')
+        elif self.path.startswith('/deflate'):
+            compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            self.send_header('Content-Encoding', 'deflate')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Serves every connection in its own thread, so idle keep-alive connections do not block."""
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients close connections with unread data on purpose
+        pass
+
+
+class LocalServerTestCase(TestCase):
+    """Base of tests that send requests to a local server running Handler."""
+    def setUp(self):
+        Handler.connections = 0
+        Handler.hits = {}
+        Handler.conditional = []
+        Handler.cookies = []
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def settings(self, **params):
+        """Returns Demandware settings pointing to the local server, updated with params."""
+        settings = {
+            'client_id': 'aaaaaaaaaaaaaaaaaaaaaaaaaaaaaa',
+            'hostname': '127.0.0.1:%d' % self.server.server_port,
+            'site': 'SiteGenesis',
+            'version': 'v13_1',
+        }
+        settings.update(params)
+        return settings
+
+###############################################################
+# ConnectionPoolTest
+###############################################################
+class ConnectionPoolTest(LocalServerTestCase):
+    """Unit Test for ConnectionPool class."""
+
+    def test_keep_alive(self):
+        """Reuses a single connection for sequential requests."""
+        pool = ConnectionPool(maxsize=2)
+        for i in xrange(3):
+            response = pool.urlopen('GET', '%s/products/%d' % (self.url, i))
+            self.assertEqual(response.getcode(), 200)
+            self.assertEqual(response.read(), '{"path": "/products/%d"}' % i)
+        pool.clear()
+
+        self.assertEqual(Handler.connections, 1)
+
+    def test_idle_eviction(self):
+        """Closes connections idle longer than idle_timeout."""
+        pool = ConnectionPool(maxsize=2, idle_timeout=0.01)
+        pool.urlopen('GET', self.url).read()
+        time.sleep(0.05)
+        pool.urlopen('GET', self.url).read()
+        pool.clear()
+
+        self.assertEqual(Handler.connections, 2)
+
+    def test_decode_content(self):
+        """Decompresses gzip and deflate bodies while they are read."""
+        pool = ConnectionPool(maxsize=1)
+        for path in ('/gzip', '/deflate'):
+            response = pool.urlopen('GET', self.url + path)
+            self.assertEqual(response.read(), '{"path": "%s"}' % path)
+
+            response = pool.urlopen('GET', self.url + path)
+            chunks = list(iter(lambda: response.read(4), ''))
+            self.assertEqual(''.join(chunks), '{"path": "%s"}' % path)
+        pool.clear()
+
+        self.assertEqual(Handler.connections, 1)
+
+    def test_unreachable_host(self):
+        """Reports connection failures as TransportError."""
+        self.server.server_close()
+        pool = ConnectionPool()
+
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url)
+
+    def test_retry_status(self):
+        """Retries 503 responses honoring Retry-After and keeps the connection."""
+        pool = ConnectionPool(retries=Retry(total=2))
+        response = pool.urlopen('GET', self.url + '/unavailable/0')
+        self.assertEqual(response.getcode(), 200)
+        self.assertEqual(response.read(), '{"path": "/unavailable/0"}')
+        pool.clear()
+
+        self.assertEqual(Handler.hits['/unavailable/0'], 3)
+        self.assertEqual(Handler.connections, 1)
+
+    def test_retry_exhausted(self):
+        """Returns the last response once retries are exhausted or Retry-After is too long."""
+        pool = ConnectionPool(retries=1)
+        response = pool.urlopen('GET', self.url + '/unavailable/0')
+        self.assertEqual((response.getcode(), response.read()), (503, 'unavailable'))
+        self.assertEqual(Handler.hits['/unavailable/0'], 2)
+
+        response = pool.urlopen('GET', self.url + '/unavailable/3600', retries=Retry(retry_after_max=1))
+        self.assertEqual((response.getcode(), response.read()), (503, 'unavailable'))
+        self.assertEqual(Handler.hits['/unavailable/3600'], 1)
+
+        response = pool.urlopen('GET', self.url + '/unavailable/0/off', retries=False)
+        self.assertEqual((response.getcode(), response.read()), (503, 'unavailable'))
+        pool.clear()
+
+    def test_retry_unreachable_host(self):
+        """Connection failures are retried before TransportError is raised."""
+        self.server.server_close()
+        pool = ConnectionPool(retries=Retry(total=2, backoff_factor=0.01))
+        attempts = []
+        send = pool._send
+        pool._send = lambda *args: attempts.append(1) or send(*args)
+
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url)
+        self.assertEqual(len(attempts), 3)
+
+    def test_retry_throttle(self):
+        """Every attempt takes a slot of the throttle."""
+        pool = ConnectionPool(retries=Retry(total=3))
+        throttle = Throttle(max_in_flight=1)
+        response = pool.urlopen('GET', self.url + '/throttled', throttle=throttle)
+        self.assertEqual(response.getcode(), 429)
+        self.assertEqual(throttle.stats()['requests'], 4)
+        self.assertEqual(throttle.stats()['in_flight'], 1)
+        response.read()
+        throttle.release()
+
+        pool.clear()
+        self.server.server_close()
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url, throttle=throttle)
+        self.assertEqual(throttle.stats()['in_flight'], 0)
+
+    def test_redirect_loop(self):
+        """Raises TransportError after MAX_REDIRECTS, every slot of the throttle is given back."""
+        pool = ConnectionPool()
+        throttle = Throttle(max_in_flight=1)
+
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url + '/redirect', throttle=throttle)
+        self.assertEqual(Handler.hits['/redirect'], ConnectionPool.MAX_REDIRECTS + 1)
+        self.assertEqual(throttle.stats()['in_flight'], 0)
+
+    def test_read_timeout(self):
+        """Raises TransportError when the server does not answer in time."""
+        pool = ConnectionPool(read_timeout=0.05)
+
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url + '/slow')
+        response = pool.urlopen('GET', self.url + '/slow', timeout=(None, 1))
+        self.assertEqual(response.read(), '{"path": "/slow"}')
+
+    def test_deadline(self):
+        """Deadline bounds the request and its retries."""
+        pool = ConnectionPool(retries=Retry(total=5, backoff_factor=1))
+        start = time.time()
+
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url + '/slow', deadline=start + 0.05)
+        self.assertTrue(time.time() - start < 0.2)
+        self.assertRaises(TransportError, pool.urlopen, 'GET', self.url, deadline=start)
+
+    def test_deadline_full_pool(self):
+        """Deadline bounds the wait for a connection of a full pool."""
+        pool = ConnectionPool(maxsize=1)
+        response = pool.urlopen('GET', self.url + '/products/1')
+        start = time.time()
+
+        self.assertRaises(
+            TransportError, pool.urlopen, 'GET', self.url + '/products/2', deadline=start + 0.1
+        )
+        self.assertTrue(time.time() - start < 0.5)
+        response.read()
+        self.assertEqual(pool.urlopen('GET', self.url + '/products/2', deadline=time.time() + 1).read(),
+                         '{"path": "/products/2"}')
+
+    def test_proxy(self):
+        """Sends plain requests to the proxy with absolute URLs."""
+        pool = ConnectionPool(proxies={'http': self.url})
+        response = pool.urlopen('GET', 'http://shop.example.com/products/foo')
+        self.assertEqual(response.read(), '{"path": "http://shop.example.com/products/foo"}')
+        pool.clear()
+
+        # Local server does not accept CONNECT
+        pool = ConnectionPool(proxies={'https': self.url})
+        self.assertRaises(TransportError, pool.urlopen, 'GET', 'https://shop.example.com/products/foo')
+
+    def test_proxy_environment(self):
+        """Proxies are taken from environment like urllib2 does."""
+        environ = dict(os.environ)
+        try:
+            os.environ['http_proxy'] = self.url
+            os.environ['no_proxy'] = 'direct.example.com'
+            pool = ConnectionPool()
+            self.assertEqual(pool._proxy(('http', 'shop.example.com', 80)),
+                             ('127.0.0.1', self.server.server_port, None))
+            self.assertEqual(pool._proxy(('http', 'direct.example.com', 80)), None)
+            self.assertEqual(ConnectionPool(proxies={})._proxy(('http', 'shop.example.com', 80)), None)
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+
+###############################################################
+# RetryTest
+###############################################################
+class RetryTest(TestCase):
+    """Unit Test for Retry class."""
+    def test_is_retry(self):
+        """Only idempotent methods and transient status are retried."""
+        retry = Retry(total=2)
+
+        self.assertTrue(retry.is_retry('GET', 0))
+        self.assertTrue(retry.is_retry('GET', 1, 503))
+        self.assertFalse(retry.is_retry('GET', 2, 503))
+        self.assertFalse(retry.is_retry('GET', 0, 404))
+        self.assertFalse(retry.is_retry('POST', 0, 503))
+
+    def test_backoff(self):
+        """Waits grow exponentially up to backoff_max."""
+        retry = Retry(backoff_factor=0.5, backoff_max=1.0)
+        for attempt in xrange(5):
+            wait = retry.get_backoff(attempt)
+            self.assertTrue(0 <= wait <= min(1.0, 0.5 * 2 ** attempt))
+
+    def test_retry_after(self):
+        """Retry-After is parsed as seconds or HTTP date."""
+        retry = Retry()
+
+        self.assertEqual(retry.get_retry_after('120'), 120.0)
+        self.assertEqual(retry.get_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertEqual(retry.get_retry_after('soon'), None)